@@ -0,0 +1,158 @@
+#    Copyright 2021 Nicolas Riquet
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
+This module contains the aggregator used by GitDelver to compute the common rollups of the files history (churn, complexity
+deltas, author counts) per file, per author and per month while the repository is traversed, so that the raw datasets do not
+have to be re-read for them. It consumes the records yielded by Delver.iter_rows and works in every output mode.
+"""
+
+from collections import namedtuple
+from typing import List, Tuple
+
+# Named tuples for the rows of the aggregate datasets. Their fields are the columns of the datasets.
+FileAggregate = namedtuple("FileAggregate", ["FileId", "FilePath", "NbModifications", "NbAuthors", "NbLinesAdded", "NbLinesDeleted",
+                                             "Complexity", "ComplexityDelta", "FirstDate", "LastDate"])
+
+AuthorAggregate = namedtuple("AuthorAggregate", ["Author", "NbCommits", "NbModifications", "NbModifiedFiles", "NbLinesAdded",
+                                                 "NbLinesDeleted", "ComplexityDelta", "FirstDate", "LastDate"])
+
+MonthAggregate = namedtuple("MonthAggregate", ["Month", "NbCommits", "NbModifications", "NbModifiedFiles", "NbAuthors",
+                                               "NbLinesAdded", "NbLinesDeleted", "ComplexityDelta"])
+
+
+class Aggregator:
+    """
+    Incremental per file, per author and per month accumulators. Every accumulator is a small list updated in place:
+    memory only depends on the number of files, authors and months, not on the number of modifications.
+    """
+
+    def __init__(self):
+        """
+        Constructor.
+        """
+
+        # FileId -> [path, modifications, authors, lines added, lines deleted, last complexity, complexity delta, first date, last date]
+        self._files = {}
+
+        # Author -> [commits, modifications, file ids, lines added, lines deleted, complexity delta, first date, last date]
+        self._authors = {}
+
+        # Month -> [commits, modifications, file ids, authors, lines added, lines deleted, complexity delta]
+        self._months = {}
+
+        # File records of the commit being traversed. They are aggregated when the commit record arrives, since the commit
+        # attributes (author, date, sampling weight) are not repeated in the file records in normalized output mode.
+        self._pending_files = []
+
+
+    def add(self, record: Tuple):
+        """
+        Takes a record yielded by Delver.iter_rows. Only the file and commit records are used.
+        """
+
+        fields = record._fields
+
+        if "ChangeType" in fields:
+            self._pending_files.append(record)
+        elif "NbModifiedFiles" in fields:
+            self._add_commit(record)
+            self._pending_files = []
+
+
+    def _add_commit(self, commit: Tuple):
+        """
+        Aggregates a commit and its pending file records.
+        """
+
+        # In sampling mode, the sums are scaled by the sampling weight so that they estimate the values of the full history.
+        weight = getattr(commit, "SamplingWeight", 1)
+        author = commit.Author
+        date = commit.Date
+        month = date.strftime("%Y-%m")
+
+        author_accumulator = self._authors.get(author)
+
+        if author_accumulator is None:
+            author_accumulator = self._authors[author] = [0, 0, set(), 0, 0, 0, date, date]
+
+        month_accumulator = self._months.get(month)
+
+        if month_accumulator is None:
+            month_accumulator = self._months[month] = [0, 0, set(), set(), 0, 0, 0]
+
+        author_accumulator[0] += weight
+        author_accumulator[6] = min(author_accumulator[6], date)
+        author_accumulator[7] = max(author_accumulator[7], date)
+
+        month_accumulator[0] += weight
+        month_accumulator[3].add(author)
+
+        for file in self._pending_files:
+            added_lines = file.NbLinesAdded * weight
+            deleted_lines = file.NbLinesDeleted * weight
+
+            file_accumulator = self._files.get(file.FileId)
+
+            if file_accumulator is None:
+                file_accumulator = self._files[file.FileId] = [file.FilePath, 0, set(), 0, 0, None, 0, date, date]
+
+            # Deleted files have no complexity: their delta cancels the complexity of their last version. The change type
+            # is still a ModificationType value in the records of Delver.run (see Delver._derive_columns).
+            is_deleted = getattr(file.ChangeType, "name", file.ChangeType) == "DELETE"
+            complexity = file.Complexity if file.Complexity is not None or not is_deleted else 0
+
+            complexity_delta = complexity - (file_accumulator[5] or 0) if complexity is not None else 0
+
+            file_accumulator[0] = file.FilePath if file.FilePath is not None else file_accumulator[0]
+            file_accumulator[1] += weight
+            file_accumulator[2].add(author)
+            file_accumulator[3] += added_lines
+            file_accumulator[4] += deleted_lines
+            file_accumulator[5] = complexity if complexity is not None else file_accumulator[5]
+            file_accumulator[6] += complexity_delta
+            file_accumulator[7] = min(file_accumulator[7], date)
+            file_accumulator[8] = max(file_accumulator[8], date)
+
+            author_accumulator[1] += weight
+            author_accumulator[2].add(file.FileId)
+            author_accumulator[3] += added_lines
+            author_accumulator[4] += deleted_lines
+            author_accumulator[5] += complexity_delta
+
+            month_accumulator[1] += weight
+            month_accumulator[2].add(file.FileId)
+            month_accumulator[4] += added_lines
+            month_accumulator[5] += deleted_lines
+            month_accumulator[6] += complexity_delta
+
+
+    def tables(self) -> List[Tuple[str, List, List]]:
+        """
+        Returns the aggregate datasets as (name, rows, columns) tables: files_aggregates, authors_aggregates and months_aggregates.
+        """
+
+        files_rows = [FileAggregate(file_id, path, modifications, len(authors), added, deleted, complexity, delta, first, last)
+                      for file_id, (path, modifications, authors, added, deleted, complexity, delta, first, last)
+                      in sorted(self._files.items())]
+
+        authors_rows = [AuthorAggregate(author, commits, modifications, len(file_ids), added, deleted, delta, first, last)
+                        for author, (commits, modifications, file_ids, added, deleted, delta, first, last) in self._authors.items()]
+
+        months_rows = [MonthAggregate(month, commits, modifications, len(file_ids), len(authors), added, deleted, delta)
+                       for month, (commits, modifications, file_ids, authors, added, deleted, delta) in sorted(self._months.items())]
+
+        return [("files_aggregates", files_rows, list(FileAggregate._fields)),
+                ("authors_aggregates", authors_rows, list(AuthorAggregate._fields)),
+                ("months_aggregates", months_rows, list(MonthAggregate._fields))]
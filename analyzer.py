@@ -0,0 +1,667 @@
+#    Copyright 2021 Nicolas Riquet
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
+This module contains the per-file analysis done by GitDelver (methods, changed methods, NLOC, complexity and SATD).
+The analysis works on plain data extracted from the files modified by a commit, which makes it possible to dispatch it
+to a pool of worker processes when a commit modifies many files.
+"""
+
+import os, queue, time, utilities
+import multiprocessing as mp
+from bisect import bisect_left
+from multiprocessing.pool import Pool
+from collections import namedtuple
+from functools import partial
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Named tuple holding the metrics of a method as computed by Lizard.
+MethodMetrics = namedtuple("MethodMetrics", ["name", "long_name", "filename", "parameters", "nloc", "complexity",
+                                             "start_line", "end_line"])
+
+# Named tuple holding the result of running Lizard on one revision of a file: its methods, NLOC and complexity.
+ParsedSource = namedtuple("ParsedSource", ["methods", "nloc", "complexity"])
+
+# Named tuple holding the data needed to analyze a single modified file: the name of the file, its source code after
+# and before the modification, and the raw diff. When a revision has already been parsed, "parsed" / "parsed_before"
+# hold the previous results and the corresponding source code is not needed.
+FileAnalysisTask = namedtuple("FileAnalysisTask", ["filename", "source_code", "source_code_before", "diff",
+                                                   "parsed", "parsed_before"], defaults=[None, None])
+
+# Prefix of the errors of the files that Lizard failed to analyze. Unlike the files exceeding the analysis budget (which are
+# not analyzed at all), their SATD is still detected.
+LIZARD_ERROR_PREFIX = "Lizard error"
+
+# Named tuple holding the result of the analysis of a single modified file. "error" is empty when the analysis succeeded,
+# otherwise it holds the reason why the file could not be analyzed. "changed_methods" holds (method, change type) pairs
+# (see changed_methods). "SATD_detected" is False for the files skipped before their diff is parsed (see is_skipped_early).
+FileAnalysisResult = namedtuple("FileAnalysisResult", ["methods", "nb_methods_changed", "nloc", "complexity",
+                                                       "contains_SATD", "SATD_line", "error", "changed_methods",
+                                                       "SATD_detected"], defaults=[True])
+
+# Result of the files skipped before their diff is parsed: no methods, metrics or SATD.
+SKIPPED_FILE_RESULT = FileAnalysisResult([], 0, None, None, False, "", "", [], False)
+
+# Interval, in seconds, at which the pool checks that none of its worker processes died while waiting for a result.
+_CRASH_POLLING_INTERVAL = 0.5
+
+# Marker of the binary files in the diffs produced by git.
+_BINARY_DIFF_MARKER = b"Binary files"
+
+
+def parse_diff(diff: str) -> Dict[str, List[Tuple[int, str]]]:
+    """
+    Returns a dictionary with the added and deleted lines of a diff. The line numbers are computed the same way as
+    PyDriller's ModifiedFile.diff_parsed so that the results are identical.
+    """
+
+    modified_lines = {"added": [], "deleted": []}
+
+    count_deletions = 0
+    count_additions = 0
+
+    for line in diff.split("\n"):
+        line = line.rstrip()
+        count_deletions += 1
+        count_additions += 1
+
+        if line.startswith("@@"):
+            tokens = line.split(" ")
+            count_deletions = int(tokens[1].split(",")[0].replace("-", "")) - 1
+            count_additions = int(tokens[2].split(",")[0]) - 1
+
+        if line.startswith("-"):
+            modified_lines["deleted"].append((count_deletions, line[1:]))
+            count_additions -= 1
+
+        if line.startswith("+"):
+            modified_lines["added"].append((count_additions, line[1:]))
+            count_deletions -= 1
+
+        if line == r"\ No newline at end of file":
+            count_deletions -= 1
+            count_additions -= 1
+
+    return modified_lines
+
+
+def decode_source(content: Optional[bytes]) -> Optional[str]:
+    """
+    Decodes the content of a blob the same way as PyDriller's ModifiedFile.source_code. Returns None for empty content.
+    """
+
+    if not content:
+        return None
+
+    return content.decode("utf-8", "ignore")
+
+
+def _analyze_methods(filename: str, source_code: str) -> ParsedSource:
+    """
+    Runs Lizard on source_code and returns the list of methods, the NLOC and the complexity of the file.
+    """
+
+    # Lizard is imported on first use to keep the startup of GitDelver and of its worker processes fast.
+    import lizard
+
+    analysis = lizard.analyze_file.analyze_source_code(filename, source_code)
+
+    methods = [MethodMetrics(func.name, func.long_name, func.filename, func.parameters, func.nloc,
+                             func.cyclomatic_complexity, func.start_line, func.end_line)
+               for func in analysis.function_list]
+
+    return ParsedSource(methods, analysis.nloc, analysis.CCN)
+
+
+def _method_key(method: MethodMetrics) -> Tuple:
+    """
+    Returns the key identifying a method across the revisions of a file.
+    """
+
+    return (method.name, method.long_name, tuple(method.parameters))
+
+
+def changed_line_ranges(lines: List[Tuple[int, str]]) -> Tuple[List[int], List[int]]:
+    """
+    Merges the numbers of the changed lines of one side of a diff into sorted, disjoint ranges of consecutive lines
+    (typically one per hunk). Returns the first lines and the last lines of the ranges.
+    """
+
+    starts, ends = [], []
+
+    for line_number in sorted(line[0] for line in lines):
+        if ends and line_number <= ends[-1] + 1:
+            ends[-1] = max(ends[-1], line_number)
+        else:
+            starts.append(line_number)
+            ends.append(line_number)
+
+    return starts, ends
+
+
+def touched_methods(methods: List[MethodMetrics], lines: List[Tuple[int, str]]) -> List[MethodMetrics]:
+    """
+    Returns the methods containing at least one of the changed lines. Each method only needs a binary search among the
+    ranges of changed lines, which scales with (methods + ranges) x log(ranges) instead of methods x lines.
+    """
+
+    starts, ends = changed_line_ranges(lines)
+
+    if not starts:
+        return []
+
+    touched = []
+
+    for method in methods:
+        # First range ending at or after the start of the method: the method is touched if this range starts before its end.
+        index = bisect_left(ends, method.start_line)
+
+        if index < len(ends) and starts[index] <= method.end_line:
+            touched.append(method)
+
+    return touched
+
+
+def changed_methods(methods: List[MethodMetrics], methods_before: List[MethodMetrics],
+                    diff_parsed: Dict[str, List[Tuple[int, str]]]) -> List[Tuple[MethodMetrics, str]]:
+    """
+    Returns the methods touched by the added lines (after the modification) or by the deleted lines (before the
+    modification), as (method, change type) pairs: "ADD" for a method that did not exist before the modification,
+    "DELETE" for a method that no longer exists after it (with its metrics before the modification) and "MODIFY" otherwise.
+    A method changed on both sides is only returned once. The methods come in the order of the file after the modification,
+    followed by the deleted methods.
+    """
+
+    changed_keys = {_method_key(method) for method in touched_methods(methods, diff_parsed["added"])}
+
+    changed_keys.update(_method_key(method) for method in touched_methods(methods_before, diff_parsed["deleted"]))
+
+    keys_before = {_method_key(method) for method in methods_before}
+    keys_after = set()
+    result = []
+
+    for method in methods:
+        key = _method_key(method)
+
+        if key in changed_keys and key not in keys_after:
+            keys_after.add(key)
+            result.append((method, "MODIFY" if key in keys_before else "ADD"))
+
+    for method in methods_before:
+        key = _method_key(method)
+
+        if key in changed_keys and key not in keys_after:
+            keys_after.add(key)
+            result.append((method, "DELETE"))
+
+    return result
+
+
+
+def analyze_file(task: FileAnalysisTask, SATD_keywords: List[str]) -> FileAnalysisResult:
+    """
+    Analyzes a single modified file: methods, number of changed methods, NLOC, complexity and SATD.
+    Files whose methods cannot be analyzed are reported through the "error" attribute of the result.
+    """
+
+    diff_parsed = parse_diff(task.diff)
+
+    contains_SATD, SATD_line = utilities.is_SATD(SATD_keywords, diff_parsed)
+
+    methods, nloc, complexity = [], None, None
+
+    try:
+        if task.parsed is not None:
+            methods, nloc, complexity = task.parsed
+        elif task.source_code:
+            methods, nloc, complexity = _analyze_methods(task.filename, task.source_code)
+
+        methods_before = []
+
+        if task.parsed_before is not None:
+            methods_before = task.parsed_before.methods
+        elif task.source_code_before:
+            methods_before = _analyze_methods(task.filename, task.source_code_before).methods
+
+        methods_changed = changed_methods(methods, methods_before, diff_parsed)
+    except Exception as ex:
+        # RecursionError bug in Lizard library for some (obfuscated / uglified) JavaScript files.
+        return _error_result("{} ({})".format(LIZARD_ERROR_PREFIX, type(ex).__name__), contains_SATD, SATD_line)
+
+    return FileAnalysisResult(methods, len(methods_changed), nloc, complexity, contains_SATD, SATD_line, "", methods_changed)
+
+
+def _error_result(reason: str, contains_SATD: bool = False, SATD_line: str = "") -> FileAnalysisResult:
+    """
+    Returns the result of a file that could not be analyzed for the given reason.
+    """
+
+    return FileAnalysisResult([], 0, None, None, contains_SATD, SATD_line, reason, [])
+
+
+def is_SATD_detected(result: FileAnalysisResult) -> bool:
+    """
+    Tells if the SATD of an analyzed file was detected, which is the case unless the file exceeded the analysis budget or
+    was skipped before its diff was parsed.
+    """
+
+    return result.SATD_detected and (not result.error or result.error.startswith(LIZARD_ERROR_PREFIX))
+
+
+def with_SATD(result: FileAnalysisResult, added_lines: Optional[List[str]], SATD_keywords: List[str]) -> FileAnalysisResult:
+    """
+    Returns the result of the analysis of a file with its SATD detected with other keywords, from the lines added to the
+    file. added_lines is None if the SATD of the file is not detected (see is_SATD_detected).
+    """
+
+    if added_lines is None:
+        return result
+
+    contains_SATD, SATD_line = utilities.is_SATD(SATD_keywords, {"added": [(None, line) for line in added_lines]})
+
+    return result._replace(contains_SATD=contains_SATD, SATD_line=SATD_line)
+
+
+def exceeds_budget(task: FileAnalysisTask, max_file_size: int, max_line_length: int) -> Optional[str]:
+    """
+    Returns the reason why the source code of task should not be analyzed (too large or containing overly long lines,
+    typically minified or generated code), or None if it can be analyzed. A limit set to 0 is not checked.
+    """
+
+    for source_code in (task.source_code, task.source_code_before):
+        if not source_code:
+            continue
+
+        if max_file_size > 0 and len(source_code) > max_file_size:
+            return "File too large ({} characters)".format(len(source_code))
+
+        if max_line_length > 0:
+            line_length = max(len(line) for line in source_code.split("\n"))
+
+            if line_length > max_line_length:
+                return "Line too long ({} characters)".format(line_length)
+
+    return None
+
+
+def is_skipped_early(raw_diff: bytes, language_supported: bool, is_generated: bool, max_diff_size: int) -> bool:
+    """
+    Tells if a modified file should get a row with its line counts only, without decoding or parsing its diff nor reading
+    its source code: binary files (marked as such in the diff by git), generated files (e.g. lockfiles or minified code)
+    and unsupported files whose raw diff exceeds max_diff_size bytes (typically checked-in data or assets). The limit is
+    not checked if set to 0.
+    """
+
+    if raw_diff.startswith(_BINARY_DIFF_MARKER) or is_generated:
+        return True
+
+    return not language_supported and max_diff_size > 0 and len(raw_diff) > max_diff_size
+
+
+def diff_line_counts(raw_diff: bytes) -> Tuple[int, int]:
+    """
+    Returns the numbers of added and deleted lines of a raw diff without decoding it, counted like PyDriller's
+    ModifiedFile.added_lines and deleted_lines.
+    """
+
+    raw_diff = b"\n" + raw_diff.replace(b"\r", b"")
+
+    return raw_diff.count(b"\n+"), raw_diff.count(b"\n-")
+
+
+class ParsedRevisions:
+    """
+    Rolling state holding, for every file path, the last parsed revision of the file along with its blob SHA. It is
+    carried along the traversal so that the "before" revision of a modification, which is usually the "after" revision
+    of the previous modification of the same file, does not have to be read from Git and parsed again.
+    """
+
+    def __init__(self):
+        """
+        Constructor.
+        """
+
+        self._revisions = {}
+
+
+    def get(self, path: Optional[str], filename: str, blob_sha: Optional[str]) -> Optional[ParsedSource]:
+        """
+        Returns the parsed revision of the file located at path if it matches blob_sha and was parsed under the same
+        file name (Lizard picks its language reader from it), else returns None.
+        """
+
+        revision = self._revisions.get(path)
+
+        if revision is None or blob_sha is None or revision[0] != blob_sha or revision[1] != filename:
+            return None
+
+        return revision[2]
+
+
+    def update(self, old_path: Optional[str], new_path: Optional[str], filename: str, blob_sha: Optional[str],
+               parsed: Optional[ParsedSource]):
+        """
+        Records the parsed revision of a modified file under its new path. The entry of the old path is dropped
+        when the file is renamed or deleted.
+        """
+
+        if old_path is not None and old_path != new_path:
+            self._revisions.pop(old_path, None)
+
+        if new_path is None or blob_sha is None or parsed is None:
+            self._revisions.pop(new_path, None)
+        else:
+            self._revisions[new_path] = (blob_sha, filename, parsed)
+
+
+    def clear(self):
+        """
+        Drops all the parsed revisions. The files are parsed again when they are next modified.
+        """
+
+        self._revisions.clear()
+
+
+# Queue through which a worker process of a FileAnalysisPool reports its PID and the tasks it starts (see _init_worker).
+_worker_events = None
+
+
+def _init_worker(worker_events: mp.SimpleQueue):
+    """
+    Initializer of the worker processes of a FileAnalysisPool: reports the PID of the new worker process, as a
+    (PID, None) event.
+    """
+
+    global _worker_events
+
+    _worker_events = worker_events
+    _worker_events.put((os.getpid(), None))
+
+
+def _analyze_batch(analyze: Callable[[FileAnalysisTask], FileAnalysisResult],
+                   indexed_tasks: List[Tuple[int, FileAnalysisTask]]) -> List[Tuple[int, FileAnalysisResult]]:
+    """
+    Analyzes a batch of (index, task) pairs in a worker process and returns the (index, result) pairs. Before analyzing
+    a task, the worker process reports that it starts as a (PID, index) event.
+    """
+
+    indexed_results = []
+
+    for index, task in indexed_tasks:
+        _worker_events.put((os.getpid(), index))
+        indexed_results.append((index, analyze(task)))
+
+    return indexed_results
+
+
+class _WorkerCrash(Exception):
+    """
+    Raised when a worker process of a FileAnalysisPool died while its results were waited for.
+    """
+
+
+class _TaskTimeout(Exception):
+    """
+    Raised when a task of a FileAnalysisPool runs longer than the timeout. Holds the index of the task.
+    """
+
+    def __init__(self, index: int):
+        super().__init__(index)
+        self.index = index
+
+
+class FileAnalysisPool:
+    """
+    Reusable pool of worker processes analyzing the files modified by a commit. The results are returned in the
+    same order as the tasks. With a single process and no timeout, the files are analyzed in the calling process.
+    """
+
+    def __init__(self, SATD_keywords: List[str], nb_processes: int = 1, timeout: int = 0,
+                 max_file_size: int = 0, max_line_length: int = 0):
+        """
+        Constructor.
+
+        Takes the keywords used to detect SATD, the number of worker processes, the maximum number of seconds
+        allowed for analyzing a single file, the maximum number of characters of a file and the maximum number
+        of characters of a line. A limit set to 0 is disabled.
+        """
+
+        self.SATD_keywords = SATD_keywords
+        self.nb_processes = nb_processes
+        self.timeout = timeout
+        self.max_file_size = max_file_size
+        self.max_line_length = max_line_length
+
+        self._pool = None
+
+
+    def map(self, tasks: List[FileAnalysisTask]) -> List[FileAnalysisResult]:
+        """
+        Analyzes all the tasks and returns the results in the original order. Files exceeding the size limits are
+        not analyzed at all. Tasks are sent to the workers in batches to limit the inter-process communication overhead
+        (see _map_batched). A file whose analysis kills its worker process is reported as an error.
+        """
+
+        results = [None] * len(tasks)
+        indexes = []
+
+        for index, task in enumerate(tasks):
+            reason = exceeds_budget(task, self.max_file_size, self.max_line_length)
+
+            if reason is None:
+                indexes.append(index)
+            else:
+                results[index] = _error_result(reason)
+
+        tasks_to_analyze = [tasks[index] for index in indexes]
+
+        analyze = partial(analyze_file, SATD_keywords=self.SATD_keywords)
+
+        if self.timeout == 0 and (self.nb_processes <= 1 or len(tasks_to_analyze) <= 1):
+            analysis_results = [analyze(task) for task in tasks_to_analyze]
+        else:
+            analysis_results = self._map_batched(analyze, tasks_to_analyze)
+
+        for index, result in zip(indexes, analysis_results):
+            results[index] = result
+
+        return results
+
+
+    def _map_batched(self, analyze: Callable[[FileAnalysisTask], FileAnalysisResult],
+                     tasks: List[FileAnalysisTask]) -> List[FileAnalysisResult]:
+        """
+        Analyzes the tasks in the worker processes and returns the results in order. The tasks are sent to the workers in
+        batches to limit the inter-process communication overhead, and every worker process reports the tasks it starts,
+        so that the timeout (if any) of a task is counted from the moment a worker process picks it up. When a task exceeds
+        it, the workers are killed and the tasks without result are submitted again to fresh workers. When a worker process
+        dies, the tasks that were running are analyzed again alone to find the one that caused the crash, and the other
+        tasks are submitted again.
+        """
+
+        results = [None] * len(tasks)
+
+        while True:
+            pending_indexes = [index for index, result in enumerate(results) if result is None]
+
+            if len(pending_indexes) == 0:
+                return results
+
+            pool = self._get_pool()
+
+            # The events of the previous tasks are read before their indexes are reused.
+            self._read_worker_events()
+            self._running_tasks.clear()
+
+            batch_size = max(1, len(pending_indexes) // (max(1, self.nb_processes) * 4))
+
+            # The pool puts every completed batch (or the exception it raised) in the queue.
+            completed_batches = queue.Queue()
+            nb_batches = 0
+
+            for start in range(0, len(pending_indexes), batch_size):
+                batch = [(index, tasks[index]) for index in pending_indexes[start:start + batch_size]]
+                pool.apply_async(_analyze_batch, (analyze, batch), callback=completed_batches.put,
+                                 error_callback=completed_batches.put)
+                nb_batches += 1
+
+            try:
+                for index, result in self._iter_results(completed_batches, nb_batches, results):
+                    results[index] = result
+            except _TaskTimeout as task_timeout:
+                self._terminate()
+                results[task_timeout.index] = _error_result("Analysis timeout ({} seconds)".format(self.timeout))
+            except _WorkerCrash:
+                running_indexes = [index for index, start_time in self._running_tasks.values() if results[index] is None]
+
+                self._terminate()
+
+                for index in running_indexes:
+                    results[index] = self._analyze_alone(analyze, tasks[index])
+
+
+    def _iter_results(self, completed_batches: queue.Queue, nb_batches: int, results: List[FileAnalysisResult]):
+        """
+        Yields the (index, result) pairs of the batches submitted to the pool as they complete. Raises _TaskTimeout if a
+        task runs longer than the timeout (if any), and _WorkerCrash if a worker process dies in the meantime. results holds
+        the results received so far, telling which of the tasks started by the workers are still running.
+        """
+
+        for _ in range(nb_batches):
+            while True:
+                try:
+                    indexed_results = completed_batches.get(timeout=_CRASH_POLLING_INTERVAL)
+                    self._read_worker_events()
+                    break
+                except queue.Empty:
+                    pass
+
+                if self._worker_crashed():
+                    raise _WorkerCrash()
+
+                if self.timeout > 0:
+                    now = time.monotonic()
+
+                    for index, start_time in self._running_tasks.values():
+                        if results[index] is None and now - start_time >= self.timeout:
+                            raise _TaskTimeout(index)
+
+            if isinstance(indexed_results, BaseException):
+                raise indexed_results
+
+            yield from indexed_results
+
+
+    def _analyze_alone(self, analyze: Callable[[FileAnalysisTask], FileAnalysisResult], task: FileAnalysisTask) -> FileAnalysisResult:
+        """
+        Analyzes a task while no other task is running, so that a crash of the worker process can only be caused by it.
+        """
+
+        try:
+            return self._wait(self._get_pool().apply_async(analyze, (task,)), self.timeout)
+        except mp.TimeoutError:
+            self._terminate()
+            return _error_result("Analysis timeout ({} seconds)".format(self.timeout))
+        except _WorkerCrash:
+            self._terminate()
+            return _error_result("Analysis process crashed")
+
+
+    def _wait(self, async_result, timeout: int):
+        """
+        Waits for an asynchronous result of the pool and returns it. Raises mp.TimeoutError if it does not complete within
+        timeout seconds (0 waits indefinitely), and _WorkerCrash if a worker process died in the meantime (e.g. killed by
+        the OOM killer): the pool replaces the dead workers, but the tasks they were running never complete.
+        """
+
+        deadline = time.monotonic() + timeout if timeout > 0 else None
+
+        while not async_result.ready():
+            interval = _CRASH_POLLING_INTERVAL if deadline is None else max(0, min(_CRASH_POLLING_INTERVAL, deadline - time.monotonic()))
+            async_result.wait(interval)
+
+            if async_result.ready():
+                break
+
+            if self._worker_crashed():
+                raise _WorkerCrash()
+
+            if deadline is not None and time.monotonic() >= deadline:
+                raise mp.TimeoutError()
+
+        return async_result.get()
+
+
+    def _read_worker_events(self):
+        """
+        Reads the events reported by the worker processes (see _init_worker and _analyze_indexed_task): the PIDs of the
+        started worker processes and, for each worker process, the last task it started with the time at which it was
+        read. The events are read at least every _CRASH_POLLING_INTERVAL seconds while results are waited for, which is
+        the precision of the timeout.
+        """
+
+        while not self._worker_events.empty():
+            pid, index = self._worker_events.get()
+
+            self._worker_pids.add(pid)
+
+            if index is not None:
+                self._running_tasks[pid] = (index, time.monotonic())
+
+
+    def _worker_crashed(self) -> bool:
+        """
+        Tells if a worker process of the pool died. Every worker process reports its PID when it starts and the pool
+        replaces the dead ones, so more PIDs than worker processes means that one of them was replaced. The pool being
+        started without limit on the number of tasks per worker, this only happens when a worker process dies.
+        """
+
+        self._read_worker_events()
+
+        return len(self._worker_pids) > max(1, self.nb_processes)
+
+
+    def _get_pool(self) -> Pool:
+        """
+        Returns the pool of worker processes, starting it if needed.
+        """
+
+        if self._pool is None:
+            self._worker_events = mp.SimpleQueue()
+            self._worker_pids = set()
+            self._running_tasks = {}
+            self._pool = Pool(max(1, self.nb_processes), initializer=_init_worker, initargs=(self._worker_events,))
+
+        return self._pool
+
+
+    def _terminate(self):
+        """
+        Kills the worker processes immediately, including the ones still running an analysis.
+        """
+
+        self._pool.terminate()
+        self._pool.join()
+        self._pool = None
+
+
+    def close(self):
+        """
+        Shuts down the worker processes, if any.
+        """
+
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
@@ -0,0 +1,108 @@
+#    Copyright 2021 Nicolas Riquet
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
+This module contains the author dictionary used by GitDelver to replace author names by compact integer identifiers.
+Author identities are mapped to their canonical values with the .mailmap file of the repository and can optionally be
+merged by email address, so that one person using several spellings gets a single identifier.
+"""
+
+from typing import Callable, List, Tuple
+
+
+def git_mailmap(repository_path: str) -> Callable[[str, str], Tuple[str, str]]:
+    """
+    Returns a function mapping an author name and email to their canonical values according to the .mailmap file of the
+    repository (through "git check-mailmap"). The input values are returned unchanged if git cannot map them.
+    """
+
+    from git import Git
+
+    git = Git(repository_path)
+
+    def check_mailmap(name: str, email: str) -> Tuple[str, str]:
+        try:
+            output = git.check_mailmap("{} <{}>".format(name, email))
+        except Exception:
+            return name, email
+
+        canonical_name, _, canonical_email = output.rpartition(" <")
+
+        return canonical_name, canonical_email.rstrip(">")
+
+    return check_mailmap
+
+
+class AuthorDictionary:
+    """
+    Per-run dictionary assigning an integer identifier to every distinct author. Each raw identity (name and email)
+    is only mapped once, so the .mailmap lookups do not depend on the number of commits.
+    """
+
+    def __init__(self, check_mailmap: Callable[[str, str], Tuple[str, str]] = None, merge_by_email: bool = False):
+        """
+        Constructor.
+
+        Takes the function mapping identities to their canonical values (no mapping if None) and a boolean telling if
+        authors sharing the same email address (case insensitive) should get the same identifier.
+        """
+
+        self.check_mailmap = check_mailmap
+        self.merge_by_email = merge_by_email
+
+        self._ids_by_identity = {}
+        self._ids_by_key = {}
+        self._authors = []
+        self._nb_authors_reported = 0
+
+
+    def get_id(self, name: str, email: str) -> int:
+        """
+        Returns the identifier of the author with the given name and email, creating it if needed.
+        """
+
+        author_id = self._ids_by_identity.get((name, email))
+
+        if author_id is not None:
+            return author_id
+
+        canonical_name, canonical_email = self.check_mailmap(name, email) if self.check_mailmap is not None else (name, email)
+
+        key = (canonical_email or "").lower() if self.merge_by_email else (canonical_name, canonical_email)
+
+        author_id = self._ids_by_key.get(key)
+
+        if author_id is None:
+            author_id = len(self._authors)
+            self._ids_by_key[key] = author_id
+            self._authors.append((author_id, canonical_name, canonical_email))
+
+        self._ids_by_identity[(name, email)] = author_id
+
+        return author_id
+
+
+    def pop_new_authors(self) -> List[Tuple[int, str, str]]:
+        """
+        Returns the authors (identifier, canonical name and email) created since the previous call.
+        """
+
+        new_authors = self._authors[self._nb_authors_reported:]
+        self._nb_authors_reported = len(self._authors)
+
+        return new_authors
+
+
+    def __len__(self) -> int:
+        return len(self._authors)
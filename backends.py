@@ -0,0 +1,332 @@
+#    Copyright 2021 Nicolas Riquet
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
+This module contains the repository backends used by the delver to walk the commits of a repository, diff them and read
+the blobs of the modified files:
+
+* RepositoryBackend.PYDRILLER: PyDriller on top of GitPython. Diffs, branch queries and blob reads run git subprocesses.
+* RepositoryBackend.PYGIT2: libgit2 through pygit2 (optional dependency), in-process. It is much faster on repositories with
+  many small commits, where the cost of spawning git processes dominates.
+
+Both backends yield commits exposing the attributes of PyDriller commits used by the delver, so the datasets are identical.
+The pygit2 backend even reuses the PyDriller modified files, built on top of an adapter mimicking the GitPython diffs.
+
+Both backends can restrict the traversal to the first-parent chain of HEAD ("git rev-list --first-parent") and leave the
+merge commits out of it ("git rev-list --no-merges"), so the skipped commits are never diffed.
+"""
+
+import io
+import utilities
+from datetime import datetime
+from typing import Iterator, List, Set
+
+
+def open_repository(repository_path: str, backend = utilities.RepositoryBackend.PYDRILLER, first_parent: bool = False,
+                    skip_merges: bool = False):
+    """
+    Returns the repository object of a backend. Its traverse_commits method yields the commits from the oldest to the newest,
+    only following the first parent of the merge commits if first_parent is set, and leaving the merge commits out if
+    skip_merges is set.
+    """
+
+    if backend == utilities.RepositoryBackend.PYGIT2:
+        return Pygit2Repository(repository_path, first_parent, skip_merges)
+
+    if first_parent:
+        return FirstParentRepository(repository_path, skip_merges)
+
+    from pydriller import Repository
+
+    return Repository(path_to_repo=repository_path, num_workers = 1, only_no_merge = skip_merges)
+
+
+class FirstParentRepository:
+    """
+    PyDriller repository traversed along the first-parent chain of HEAD, which PyDriller's Repository does not support.
+    """
+
+    def __init__(self, repository_path: str, skip_merges: bool = False):
+        """
+        Constructor.
+        """
+
+        from pydriller import Git
+
+        self.repository_path = repository_path
+        self.skip_merges = skip_merges
+
+        # Fails early, like PyDriller's Repository, if the path is not a repository.
+        Git(repository_path).clear()
+
+
+    def traverse_commits(self) -> Iterator:
+        """
+        Yields the PyDriller commits of the first-parent chain of HEAD, from the oldest to the newest.
+        """
+
+        from pydriller import Git
+
+        git = Git(self.repository_path)
+
+        try:
+            yield from git.get_list_commits("HEAD", first_parent = True, no_merges = self.skip_merges)
+        finally:
+            git.clear()
+
+
+class Pygit2Repository:
+    """
+    Repository traversed in-process with pygit2, in the order of PyDriller ("git rev-list --reverse HEAD").
+    """
+
+    def __init__(self, repository_path: str, first_parent: bool = False, skip_merges: bool = False):
+        """
+        Constructor.
+        """
+
+        try:
+            import pygit2
+        except ImportError as ex:
+            raise ImportError("The PYGIT2 repository backend requires the pygit2 package (pip install pygit2)") from ex
+
+        self.repository_path = repository_path
+        self.first_parent = first_parent
+        self.skip_merges = skip_merges
+        self._repository = pygit2.Repository(repository_path)
+
+
+    def traverse_commits(self) -> Iterator["Pygit2Commit"]:
+        """
+        Yields the commits reachable from HEAD (or its first-parent chain), from the oldest to the newest.
+        """
+
+        from pygit2.enums import SortMode
+
+        if self._repository.head_is_unborn:
+            return
+
+        branch_tips = self._branch_tips()
+
+        walker = self._repository.walk(self._repository.head.target, SortMode.REVERSE)
+
+        if self.first_parent:
+            walker.simplify_first_parent()
+
+        for commit in walker:
+            if self.skip_merges and len(commit.parent_ids) > 1:
+                continue
+
+            yield Pygit2Commit(self._repository, commit, branch_tips)
+
+
+    def _branch_tips(self) -> List:
+        """
+        Returns the (name, tip) pairs of the local branches, plus HEAD when it is detached (named like "git branch" does).
+        """
+
+        branch_tips = [(name, self._repository.branches.local[name].target) for name in self._repository.branches.local]
+
+        if self._repository.head_is_detached:
+            head = self._repository[self._repository.head.target]
+            branch_tips.append(("(HEAD detached at {})".format(head.short_id), head.id))
+
+        return branch_tips
+
+
+class Pygit2Commit:
+    """
+    Commit of a Pygit2Repository, exposing the same attributes as a PyDriller commit.
+    """
+
+    def __init__(self, repository, commit, branch_tips: List):
+        """
+        Constructor.
+
+        Takes the pygit2 repository and commit, and the (name, tip) pairs of the branches.
+        """
+
+        self._repository = repository
+        self._commit = commit
+        self._branch_tips = branch_tips
+        self._diff_cache = None
+
+        self.hash = str(commit.id)
+
+
+    @property
+    def msg(self) -> str:
+        return self._commit.message.strip()
+
+
+    @property
+    def author(self):
+        from pydriller.domain.developer import Developer
+
+        return Developer(self._commit.author.name, self._commit.author.email)
+
+
+    @property
+    def author_date(self) -> datetime:
+        from git.objects.util import from_timestamp
+
+        author = self._commit.author
+
+        # Same time zone object as GitPython (a tzoffset storing the offset west of UTC, in seconds), so that the dates of
+        # both backends end up in identical dataframe columns.
+        return from_timestamp(author.time, -author.offset * 60)
+
+
+    @property
+    def parents(self) -> List[str]:
+        return [str(parent_id) for parent_id in self._commit.parent_ids]
+
+
+    @property
+    def merge(self) -> bool:
+        return len(self._commit.parent_ids) > 1
+
+
+    @property
+    def branches(self) -> Set[str]:
+        """
+        Local branches containing the commit ("git branch --contains"). Like PyDriller, {""} if there is none.
+        """
+
+        commit_id = self._commit.id
+
+        branches = {name for name, tip in self._branch_tips if tip == commit_id or self._repository.descendant_of(tip, commit_id)}
+
+        return branches if branches else {""}
+
+
+    @property
+    def insertions(self) -> int:
+        return self._diff().stats.insertions
+
+
+    @property
+    def deletions(self) -> int:
+        return self._diff().stats.deletions
+
+
+    @property
+    def lines(self) -> int:
+        stats = self._diff().stats
+
+        return stats.insertions + stats.deletions
+
+
+    @property
+    def files(self) -> int:
+        return self._diff().stats.files_changed
+
+
+    @property
+    def modified_files(self) -> List:
+        """
+        Files modified by the commit, as PyDriller modified files. Like PyDriller, the list is empty for merge commits.
+        """
+
+        from pydriller.domain.commit import ModifiedFile
+
+        if self.merge:
+            return []
+
+        return [ModifiedFile(diff=_Pygit2Diff(self._repository, patch)) for patch in self._diff()]
+
+
+    def _diff(self):
+        """
+        Returns the diff with the first parent (with the empty tree for the root commit), with rename detection like git.
+        """
+
+        from pygit2.enums import DiffFind
+
+        if self._diff_cache is None:
+            if self._commit.parents:
+                self._diff_cache = self._repository.diff(self._commit.parents[0], self._commit)
+            else:
+                self._diff_cache = self._commit.tree.diff_to_tree(swap=True)
+
+            self._diff_cache.find_similar(DiffFind.FIND_RENAMES)
+
+        return self._diff_cache
+
+
+class _Pygit2Blob:
+    """
+    Adapter giving a libgit2 blob the attributes of a GitPython blob used by PyDriller and the delver.
+    """
+
+    def __init__(self, repository, blob_id):
+        self._repository = repository
+        self._blob_id = blob_id
+        self.hexsha = str(blob_id)
+
+
+    @property
+    def data_stream(self) -> io.BytesIO:
+        return io.BytesIO(self._repository[self._blob_id].data)
+
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, _Pygit2Blob) and self.hexsha == other.hexsha
+
+
+    def __hash__(self) -> int:
+        return hash(self.hexsha)
+
+
+class _Pygit2Diff:
+    """
+    Adapter giving a libgit2 patch the attributes of a GitPython diff used by the PyDriller modified files.
+    """
+
+    def __init__(self, repository, patch):
+        from pygit2.enums import DeltaStatus
+
+        delta = patch.delta
+
+        self.new_file = delta.status == DeltaStatus.ADDED
+        self.deleted_file = delta.status == DeltaStatus.DELETED
+        self.renamed_file = delta.status == DeltaStatus.RENAMED
+
+        self.a_blob = _Pygit2Blob(repository, delta.old_file.id) if not self.new_file else None
+        self.b_blob = _Pygit2Blob(repository, delta.new_file.id) if not self.deleted_file else None
+
+        self.diff = _patch_body(patch.data)
+
+        # GitPython takes the paths from the "---" and "+++" lines, which git omits for binary files and for patches
+        # without hunk (e.g. added or deleted empty files), unlike libgit2: their paths then come from the "diff --git"
+        # line, so both paths are set.
+        paths_from_header = self.diff == b"" or self.diff.startswith(b"Binary files")
+
+        self.a_path = delta.old_file.path if not self.new_file or paths_from_header else None
+        self.b_path = delta.new_file.path if not self.deleted_file or paths_from_header else None
+
+
+def _patch_body(patch: bytes) -> bytes:
+    """
+    Returns the body of a patch in git format without its header, which is what GitPython exposes: the text from the first
+    hunk header (or from the "Binary files ... differ" line). Empty if the patch has no body (e.g. mode change).
+    """
+
+    lines = patch.splitlines(keepends=True)
+
+    for index, line in enumerate(lines):
+        if line.startswith(b"@@") or line.startswith(b"Binary files"):
+            return b"".join(lines[index:])
+
+    return b""
@@ -0,0 +1,105 @@
+#    Copyright 2021 Nicolas Riquet
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
+This module contains a small benchmark of GitDelver. It measures the startup costs (module import, start of the worker
+processes) and the time needed to mine a repository with each repository backend (the pygit2 backend only if pygit2 is
+installed), and prints the results on the console.
+
+Usage: python benchmark.py [path to a repository]. The small test repository is used if no path is given.
+"""
+
+import os, sys, subprocess, importlib.util
+import utilities
+from pathlib import Path
+from timeit import default_timer as timer
+from typing import Callable
+
+
+def _time_import(statement: str) -> float:
+    """
+    Returns the number of seconds needed by a fresh Python interpreter to execute statement (typically an import).
+    """
+
+    start = timer()
+    subprocess.run([sys.executable, "-c", statement], check=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+
+    return timer() - start
+
+
+def _time_worker_startup(create_pool: Callable, nb_processes: int) -> float:
+    """
+    Returns the number of seconds needed to create a pool of worker processes and run one empty job on each worker.
+    """
+
+    start = timer()
+
+    with create_pool(nb_processes) as pool:
+        list(pool.map(_noop_job, range(nb_processes)))
+
+    return timer() - start
+
+
+def _noop_job(_: int) -> None:
+    """
+    Empty job importing the modules used by a repository job.
+    """
+
+    import delver, pydriller, pandas
+
+
+def _time_mining(repo_path: str, **delver_params) -> float:
+    """
+    Returns the number of seconds needed to mine repo_path with a delver created with delver_params.
+    """
+
+    from delver import Delver
+
+    start = timer()
+    Delver(repo_path, nb_commits_before_checkpoint = 0, **delver_params).run()
+
+    return timer() - start
+
+
+if __name__ == "__main__":
+    """
+    This is the starting point of the GitDelver benchmark.
+    """
+
+    from concurrent.futures import ProcessPoolExecutor
+    from functools import partial
+    import multiprocessing as mp
+    import gitdelver
+
+    repo_path = sys.argv[1] if len(sys.argv) > 1 else str(Path(__file__).parent.joinpath("tests", "test_repos", "small_repo"))
+
+    utilities._log("Benchmarking GitDelver on {}.".format(repo_path))
+
+    utilities._log("Startup: interpreter alone {:.3f}s, 'import delver' {:.3f}s, 'import delver' + PyDriller + Pandas {:.3f}s.".format(
+                   _time_import("pass"), _time_import("import delver"), _time_import("import delver, pydriller, pandas")))
+
+    spawn_pool = partial(ProcessPoolExecutor, mp_context=mp.get_context("spawn"))
+
+    gitdelver_pool = partial(ProcessPoolExecutor, mp_context=gitdelver._mp_context())
+
+    utilities._log("Worker startup (4 workers): spawned workers {:.3f}s, GitDelver workers {:.3f}s.".format(
+                   _time_worker_startup(spawn_pool, 4), _time_worker_startup(gitdelver_pool, 4)))
+
+    backends = [backend for backend in utilities.RepositoryBackend
+                if backend != utilities.RepositoryBackend.PYGIT2 or importlib.util.find_spec("pygit2") is not None]
+    
+    for analysis_mode in utilities.AnalysisMode:
+        for backend in backends:
+            utilities._log("Mining in mode {} with backend {}: {:.3f}s.".format(analysis_mode.name, backend.name,
+                           _time_mining(repo_path, analysis_mode = analysis_mode, repository_backend = backend)))
@@ -0,0 +1,85 @@
+#    Copyright 2021 Nicolas Riquet
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
+This module contains the branch set dictionary used by GitDelver to replace the list of branches containing a commit
+by a compact integer identifier, and the filter limiting branch membership to the branches matching a ref pattern.
+In repositories with thousands of release branches, the rows then no longer repeat multi-kilobyte branch lists.
+"""
+
+from fnmatch import fnmatchcase
+from typing import Callable, FrozenSet, Iterable, List, Tuple
+
+
+def branch_filter(branch_pattern: str) -> Callable[[Iterable[str]], FrozenSet[str]]:
+    """
+    Returns a function keeping only the branches matching branch_pattern: glob patterns separated by "|"
+    (e.g. "main|release/*"). All the branches are kept if the pattern is empty.
+    """
+
+    patterns = [pattern.strip() for pattern in branch_pattern.split("|") if pattern.strip()]
+
+    def filter_branches(branches: Iterable[str]) -> FrozenSet[str]:
+        if not patterns:
+            return frozenset(branches)
+
+        return frozenset(branch for branch in branches if any(fnmatchcase(branch, pattern) for pattern in patterns))
+
+    return filter_branches
+
+
+class BranchSetDictionary:
+    """
+    Per-run dictionary assigning an integer identifier to every distinct set of branches.
+    """
+
+    def __init__(self):
+        """
+        Constructor.
+        """
+
+        self._ids_by_branch_set = {}
+        self._branch_sets = []
+        self._nb_branch_sets_reported = 0
+
+
+    def get_id(self, branches: FrozenSet[str]) -> int:
+        """
+        Returns the identifier of the set of branches, creating it if needed.
+        """
+
+        branch_set_id = self._ids_by_branch_set.get(branches)
+
+        if branch_set_id is None:
+            branch_set_id = len(self._branch_sets)
+            self._ids_by_branch_set[branches] = branch_set_id
+            self._branch_sets.append((branch_set_id, "\n".join(sorted(branches)), len(branches)))
+
+        return branch_set_id
+
+
+    def pop_new_branch_sets(self) -> List[Tuple[int, str, int]]:
+        """
+        Returns the branch sets (identifier, newline-separated sorted branches and number of branches) created since
+        the previous call.
+        """
+
+        new_branch_sets = self._branch_sets[self._nb_branch_sets_reported:]
+        self._nb_branch_sets_reported = len(self._branch_sets)
+
+        return new_branch_sets
+
+
+    def __len__(self) -> int:
+        return len(self._branch_sets)
@@ -16,7 +16,8 @@
 This module contains the configuration parameters used when GitDelver is launched.
 """
 
-from utilities import AnalysisMode
+from utilities import AnalysisMode, AnalysisProfile, MergeCommits, MethodsOutput, RepositoryBackend, RepositoryPreparation, \
+                      SamplingMode
 
 config_params = {
     # File system path to either a single Git repository to be analyzed or a folder
@@ -40,6 +41,105 @@ config_params = {
     # AnalysisMode.COMMITS_FILES_METHODS: produces the 'commits_history', 'files_history' and the 'methods_history' datasets. This is the default mode but it takes more time.
     "analysis_mode": AnalysisMode.COMMITS_FILES,
     
+    # Methods produced in the 'methods_history' dataset (AnalysisMode.COMMITS_FILES_METHODS) for every modified file.
+    # MethodsOutput.ALL_METHODS: all the methods of the file after the modification (full snapshot). This is the default mode.
+    # MethodsOutput.CHANGED_METHODS: only the methods changed by the modification. A one-line change to a big file then
+    # produces one row instead of one per method, which shrinks the dataset, the memory usage and the write time.
+    "methods_output": MethodsOutput.ALL_METHODS,
+    
+    # With MethodsOutput.CHANGED_METHODS, set this to True to add a 'MethodChangeType' column (ADD, DELETE or MODIFY) to
+    # the 'methods_history' dataset. Deleted methods are reported with their metrics before the modification.
+    "method_change_types": False,
+    
+    # In normalized output mode, the 'files_history' and 'methods_history' datasets do not repeat the commit attributes
+    # (Repository, Branches, NbBranches, Author, DateTime, Date, HourOfDay) on every row: they only reference their commit
+    # through the CommitId column, the commit attributes being stored once in 'commits_history'. This greatly reduces
+    # the output size for methods-heavy runs. The usual view can be rebuilt with the 'denormalize' function of delver.py.
+    "normalized_output": False,
+    
+    # When author IDs are enabled, the 'Author' column of the datasets contains a compact integer identifier instead of the
+    # author name, and the identifiers are described in the 'authors' dataset (AuthorId, Name, Email). Identities are mapped
+    # with the .mailmap file of the repository, so that one person using several names or emails gets a single identifier.
+    "author_ids": False,
+    
+    # When author IDs are enabled, also give the same identifier to all the authors sharing an email address (case insensitive).
+    "merge_authors_by_email": False,
+    
+    # GitDelver can analyze only a sample of the commits, which gives approximate statistics on huge histories in minutes.
+    # SamplingMode.ALL_COMMITS: analyzes all the commits. This is the default mode.
+    # SamplingMode.EVERY_NTH_COMMIT: analyzes one commit every sampling_size commits.
+    # SamplingMode.RANDOM_COMMITS: analyzes about one commit in sampling_size, drawn at random with sampling_seed.
+    # SamplingMode.COMMITS_PER_MONTH: analyzes sampling_size commits per month, drawn at random with sampling_seed.
+    # In the sampling modes, the datasets have an additional 'SamplingWeight' column holding the number of commits
+    # represented by each sampled commit, to be used as a weight when computing statistics.
+    "sampling_mode": SamplingMode.ALL_COMMITS,
+    "sampling_size": 10,
+    "sampling_seed": 0,
+    
+    # Set this to True to also produce the 'files_aggregates', 'authors_aggregates' and 'months_aggregates' datasets
+    # (churn, complexity deltas and author counts per file, per author and per month). They are computed during the
+    # traversal and written at the end, so the common rollups do not require re-reading the full datasets.
+    "aggregates": False,
+    
+    # When branch set IDs are enabled, the 'Branches' column of the datasets contains a compact integer identifier instead of
+    # the list of branches containing the commit, and the identifiers are described in the 'branch_sets' dataset
+    # (BranchSetId, Branches, NbBranches). This keeps the rows small in repositories with thousands of branches.
+    "branch_set_ids": False,
+    
+    # Glob patterns separated by "|" limiting the branches taken into account in the 'Branches' and 'NbBranches' columns
+    # (e.g. "main|release/*"). All the branches are taken into account if empty.
+    "branch_pattern": "",
+    
+    # Snapshot mode: set this to glob patterns separated by "|" (e.g. "v*" or "v*|main") to mine the tags and branches matching
+    # them instead of the history. GitDelver then analyzes every file of every matching snapshot, each unique file content
+    # being analyzed only once, and produces the 'snapshots', 'snapshots_files' and (in AnalysisMode.COMMITS_FILES_METHODS)
+    # 'snapshots_methods' datasets. Leave empty to mine the history.
+    "snapshot_refs": "",
+    
+    # Set this to True to only traverse the first-parent chain of HEAD (the mainline, "git log --first-parent"): the commits
+    # made on merged branches are left out, and the merge commits summarize them. This avoids mining the history of the
+    # branches twice in repositories with heavy merge workflows.
+    "first_parent": False,
+    
+    # How merge commits are mined. Whatever the mode, merge commits have no rows in the files and methods datasets.
+    # MergeCommits.SUMMARIZE: a 'commits_history' row with Merge set to True and the modified files and line counts
+    # against the first parent. This is the default mode.
+    # MergeCommits.SKIP: merge commits are left out of the traversal, so they are never diffed and have no rows at all.
+    "merge_commits": MergeCommits.SUMMARIZE,
+    
+    # Set this to True to also store the raw facts extracted from each repository (commit metadata, numstat, Lizard results
+    # and the lines added to the files) in a compact '<repository>_facts.jsonl.gz' file of the CSV output folder.
+    # 'python gitdelver.py reanalyze' then recomputes all the datasets from these stores at disk speed, without Git or Lizard,
+    # e.g. after changing the SATD or bug fix keywords or the test file heuristic.
+    "facts_store": False,
+    
+    # Analysis profiles evaluated in a single traversal of each repository. Each profile has a name, its own SATD and bug fix
+    # keywords and its own keep_unsupported_files setting, e.g.
+    # AnalysisProfile("strict", ["#todo", "//todo"], ["fix", "bug"], False). Git and Lizard run once per commit for all the
+    # profiles, and each profile produces its own datasets, suffixed with its name (e.g. 'commits_history_strict').
+    # The SATD_keywords, bugfix_keywords and keep_unsupported_files parameters are then ignored. Leave empty to produce the
+    # usual datasets. Profiles cannot be used in snapshot mode.
+    "profiles": [],
+    
+    # Library used to walk the commits, diff them and read the files. Both backends produce identical datasets.
+    # RepositoryBackend.PYDRILLER: PyDriller on top of GitPython, which runs git subprocesses. This is the default backend.
+    # RepositoryBackend.PYGIT2: libgit2 through pygit2 (pip install pygit2), in-process. It is much faster on repositories
+    # with many small commits, where the cost of spawning git processes dominates.
+    "repository_backend": RepositoryBackend.PYDRILLER,
+    
+    # Preparation stage run before mining each repository. Git answers the object lookups and ancestry queries of GitDelver
+    # much faster when the repository has an up-to-date commit-graph and well-packed objects, which mirrors often lack.
+    # RepositoryPreparation.NONE: no preparation. This is the default value.
+    # RepositoryPreparation.CHECK: only reports whether the repository has a commit-graph and a multi-pack-index, its numbers
+    # of packs and loose objects and the duration of a probe running typical git queries.
+    # RepositoryPreparation.WRITE: writes the commit-graph and the multi-pack-index of the repository, and reports the
+    # duration of the preparation and of the probe before and after it.
+    # RepositoryPreparation.REPACK: like WRITE, after repacking all the objects of the repository into a single pack.
+    # Set prepare_copy to True to prepare and mine a temporary mirror of each repository (created in the system temporary
+    # folder) instead of modifying the repository itself.
+    "repository_preparation": RepositoryPreparation.NONE,
+    "prepare_copy": False,
+    
     # GitDelver uses Python multiprocessing for analyzing multiple repositories at once.
     # Nowadays, most computers have at least 4 virtual CPUs, so this is the default value.
     # You can set it to less or more in function of your needs. GitDelver will check that
@@ -47,6 +147,60 @@ config_params = {
     # available vitrtual CPUs.
     "nb_processes": 4,
     
+    # In bulk mode, this parameter limits the number of processes reading repositories with git at the same time,
+    # independently of nb_processes, to avoid I/O storms on shared storage. The limit is shared by the checks GitDelver
+    # runs on each repository before dispatching it to a delving process and by the delving processes themselves, which
+    # only run git (preparing the repository, listing the branches of a commit, diffing it and reading its files) while
+    # holding one of the slots. The analysis of the files, which is CPU-bound, is not limited by this parameter.
+    "nb_git_processes": 4,
+    
+    # In bulk mode, GitDelver fingerprints each repository (tips of all its refs plus the configuration parameters that
+    # influence the datasets, e.g. analysis_mode, keywords, keep_unsupported_files). A repository whose fingerprint did not
+    # change since its last successful analysis is skipped and its existing CSV files are reused. The fingerprints are
+    # stored in the 'gitdelver_cache.json' file of the CSV output folder. Set this to False to always analyze all repositories.
+    "use_result_cache": True,
+    
+    # Work queue used to mine a folder of repositories with several machines (e.g. sharing an NFS mount): run
+    # "python gitdelver.py submit" once to add a job per repository, then "python gitdelver.py work" on every machine
+    # ("python gitdelver.py status" reports the progress). Leave empty if you do not use the work queue.
+    "queue_folder_path": r"",
+    
+    # A worker renews the lease of its job while processing it. If a worker dies, its job is claimed again by another worker
+    # once the lease is older than queue_lease_duration seconds. A job is reported as failed after queue_max_attempts attempts.
+    "queue_lease_duration": 600,
+    "queue_max_attempts": 3,
+    
+    # Each delver can analyze the files modified by a commit (methods, NLOC, complexity, SATD) in parallel
+    # using a pool of worker processes, which helps a lot for big commits touching many source files.
+    # Set this to 1 to analyze the files sequentially. GitDelver limits the value so that
+    # nb_processes x nb_analysis_processes does not exceed the number of available virtual CPUs.
+    "nb_analysis_processes": 1,
+    
+    # Per-file analysis budget. Some files (typically minified or generated JavaScript) can keep Lizard busy for
+    # minutes or forever. Files larger than max_analyzed_file_size characters or containing a line longer than
+    # max_analyzed_line_length characters are not analyzed, and the analysis of a file is killed after
+    # analysis_timeout seconds (counted from the moment a worker process starts analyzing it, to about half a second).
+    # These files are reported in the 'analysis_errors' dataset along with the reason. With a timeout, the files are
+    # always analyzed in worker processes (sent to them in batches), even when nb_analysis_processes is 1.
+    # Set a parameter to 0 to disable the corresponding limit.
+    "analysis_timeout": 60,
+    "max_analyzed_file_size": 1000000,
+    "max_analyzed_line_length": 5000,
+    
+    # Glob patterns separated by "|" matching the paths or names of the generated files (e.g. lockfiles or minified code).
+    # Like the binary files, and the unsupported files whose raw diff exceeds max_unsupported_diff_size bytes when
+    # keep_unsupported_files is True, these files get a row with their line counts only: their diff is neither decoded nor
+    # parsed, and they are not analyzed (no methods, NLOC, complexity or SATD). In snapshot mode, the generated files are
+    # not analyzed either. It is empty by default, so that the files are analyzed like the other ones; note that some of
+    # them are in supported languages (e.g. minified JavaScript), so setting it changes the files and methods datasets.
+    # For instance: "*.min.js|*.min.css|*.js.map|*.css.map|package-lock.json|npm-shrinkwrap.json|yarn.lock|pnpm-lock.yaml|
+    # composer.lock|Gemfile.lock|Cargo.lock|poetry.lock|Pipfile.lock|go.sum".
+    "generated_files": "",
+    
+    # Maximum size, in bytes, of the raw diff of an unsupported file reported when keep_unsupported_files is True. Unlike
+    # max_analyzed_file_size, which counts the characters of the analyzed source code, it is checked before the diff is
+    # decoded. Set it to 0 to disable the limit.
+    "max_unsupported_diff_size": 1000000,
     
     # This parameter tells the GitDelver to write the current results to disk and free up memory once a certain amount
     # of commits have been processed. The tool will resume its analyses afterwards and will 
@@ -55,6 +209,18 @@ config_params = {
     # The default value is 50 commits.
     "nb_commits_before_checkpoint": 50,
     
+    # Long analyses make the delver and its file analysis processes grow steadily. This parameter sets the maximum
+    # memory (resident set size, in MB) of each of these processes, checked after every commit. When a file analysis
+    # process exceeds it, the file analysis processes are restarted. When the delver exceeds it, its caches are released
+    # and the current results are written to disk as on a checkpoint (not if nb_commits_before_checkpoint is 0); it is
+    # then only checked again once its memory grew by a tenth of the limit. Only available on Linux. Set it well above
+    # the memory used at startup. If the parameter is set to 0, the memory is not watched.
+    "max_worker_memory": 0,
+    
+    # This parameter tells the GitDelver to restart the file analysis processes after a certain amount of commits,
+    # which gives their memory back to the system. If the parameter is set to 0, they are never restarted.
+    "worker_max_commits": 1000,
+    
     # This parameter sets the volume of feedback information provided by GitDelver. The analysis
     # operation can take dozens of minutes for big repositories, so it is advised to set
     # this to True in order to monitor its progression.
@@ -20,21 +20,178 @@ for further analysis in Jupyter notebooks.
 
 The delver is designed to be called either by the GitDelver console program or directly from any other module using Pandas dataframes
 (e.g., Jupyer notebooks).
+
+PyDriller and Pandas are heavy to import, so they are only imported on first use: this keeps the startup of the worker processes
+fast and spares Pandas to the users who do not need dataframes.
 """
 
-import utilities
-from config import config_params
-from pydriller import Repository 
-import pandas as pd
+import gc, utilities
+from backends import open_repository
+from authors import AuthorDictionary, git_mailmap
+from sampling import CommitSampler
+from file_identities import FileIdentities
+from aggregates import Aggregator
+from branch_sets import BranchSetDictionary, branch_filter
+from snapshots import list_snapshots, snapshot_files
+from watchdog import MemoryWatchdog
+from facts import FactsRepository, FactsWriter, facts_store_path, stored_analysis
+from analyzer import FileAnalysisPool, FileAnalysisTask, ParsedRevisions, ParsedSource, SKIPPED_FILE_RESULT, decode_source, \
+                     diff_line_counts, is_SATD_detected, is_skipped_early, parse_diff, with_SATD
 from pathlib import Path
 from collections import namedtuple
+from contextlib import nullcontext
 from datetime import datetime
-from typing import Callable, List
+from typing import Callable, Iterator, List, Optional, Tuple, Union
 
 # Named tuple for storing the produced datasets. It has two attributes :
 # the name of the dataset and a Pandas dataframe.
 DataSet = namedtuple("DataSet", ["name", "dataframe"])
 
+# Named tuples for the records yielded by Delver.iter_rows. Their fields are the columns of the corresponding datasets.
+CommitRecord = namedtuple("CommitRecord", ["Repository", "Branches", "NbBranches", "CommitId", "Message", "Author", "DateTime", "Date",
+                                           "HourOfDay", "Merge", "BugFix", "SATD", "NbModifiedFiles", "ModifiedFiles",
+                                           "NbModifiedProdSourceFiles", "NbModifiedTestSourceFiles", "NbModifications",
+                                           "NbInsertions", "NbDeletions"])
+
+FileRecord = namedtuple("FileRecord", ["Repository", "Branches", "NbBranches", "FileId", "OldFilePath", "FilePath", "FileName", "FileExtension",
+                                       "FileType", "ChangeType", "NbMethods", "NbMethodsChanged", "NLOC", "Complexity",
+                                       "NlocDivByNbMethods", "ComplexDivByNbMethods", "SATD", "SATDLine", "NbLinesAdded",
+                                       "NbLinesDeleted", "CommitId", "Author", "DateTime", "Date", "HourOfDay"])
+
+MethodRecord = namedtuple("MethodRecord", ["Repository", "Branches", "NbBranches", "FileId", "OldFilePath", "FilePath", "FileName", "FileType",
+                                           "MethodName", "NbParams", "NLOC", "Complexity", "CommitId", "Author", "DateTime", "Date",
+                                           "HourOfDay"])
+
+AnalysisErrorRecord = namedtuple("AnalysisErrorRecord", ["Repository", "SkippedModificationFilePath", "SkippedModificationFileName",
+                                                         "CommitId", "Reason"])
+
+# Record of the branch sets dataset, only produced when branch set identifiers are enabled. The "Branches" column of the
+# other datasets then contains the BranchSetId instead of the list of branches.
+BranchSetRecord = namedtuple("BranchSetRecord", ["BranchSetId", "Branches", "NbBranches"])
+
+# Record of the authors dataset, only produced when author identifiers are enabled. The "Author" column of the other
+# datasets then contains the AuthorId instead of the author name.
+AuthorRecord = namedtuple("AuthorRecord", ["AuthorId", "Name", "Email"])
+
+# Commit attributes repeated in every file and method record. In normalized output mode, the file and method records only
+# reference their commit through the "CommitId" key and these attributes are stored once, in the commits dataset.
+COMMIT_ATTRIBUTES = ["Repository", "Branches", "NbBranches", "Author", "DateTime", "Date", "HourOfDay"]
+
+NormalizedFileRecord = namedtuple("NormalizedFileRecord", [field for field in FileRecord._fields if field not in COMMIT_ATTRIBUTES])
+
+NormalizedMethodRecord = namedtuple("NormalizedMethodRecord", [field for field in MethodRecord._fields if field not in COMMIT_ATTRIBUTES])
+
+# Records produced in sampling mode. The "SamplingWeight" column holds the number of commits represented by the sampled commit.
+# In normalized output mode, the weight is a commit attribute only stored in the commits dataset.
+SAMPLING_WEIGHT = "SamplingWeight"
+
+SampledCommitRecord = namedtuple("SampledCommitRecord", CommitRecord._fields + (SAMPLING_WEIGHT,))
+
+SampledFileRecord = namedtuple("SampledFileRecord", FileRecord._fields + (SAMPLING_WEIGHT,))
+
+SampledMethodRecord = namedtuple("SampledMethodRecord", MethodRecord._fields + (SAMPLING_WEIGHT,))
+
+# Records of the methods dataset when only the changed methods are produced along with their change type. The "MethodChangeType"
+# column ("ADD", "DELETE" or "MODIFY") follows the metrics of the method.
+METHOD_CHANGE_TYPE = "MethodChangeType"
+
+
+def _with_method_change_type(fields: Tuple[str, ...]) -> List[str]:
+    """
+    Returns the fields of a method record with the "MethodChangeType" field inserted after the "Complexity" field.
+    """
+
+    index = fields.index("Complexity") + 1
+
+    return list(fields[:index]) + [METHOD_CHANGE_TYPE] + list(fields[index:])
+
+
+ChangedMethodRecord = namedtuple("ChangedMethodRecord", _with_method_change_type(MethodRecord._fields))
+
+NormalizedChangedMethodRecord = namedtuple("NormalizedChangedMethodRecord", _with_method_change_type(NormalizedMethodRecord._fields))
+
+SampledChangedMethodRecord = namedtuple("SampledChangedMethodRecord", _with_method_change_type(SampledMethodRecord._fields))
+
+CHANGED_METHOD_RECORD_TYPES = {MethodRecord: ChangedMethodRecord, NormalizedMethodRecord: NormalizedChangedMethodRecord,
+                               SampledMethodRecord: SampledChangedMethodRecord}
+
+# In snapshot mode, number of files of a snapshot read and analyzed at once per file analysis process. The files are
+# processed in chunks of this size, so that the memory holding their sources does not grow with the size of the tree.
+SNAPSHOT_FILES_PER_PROCESS = 32
+
+# Records produced in snapshot mode: one per snapshot (tag or branch), then one per file and method of every snapshot.
+SnapshotRecord = namedtuple("SnapshotRecord", ["Repository", "Snapshot", "CommitId", "DateTime", "Date", "NbFiles", "NbMethods",
+                                               "NLOC", "Complexity"])
+
+SnapshotFileRecord = namedtuple("SnapshotFileRecord", ["Repository", "Snapshot", "FilePath", "FileName", "FileExtension", "FileType",
+                                                       "BlobId", "NbMethods", "NLOC", "Complexity", "NlocDivByNbMethods",
+                                                       "ComplexDivByNbMethods"])
+
+SnapshotMethodRecord = namedtuple("SnapshotMethodRecord", ["Repository", "Snapshot", "FilePath", "FileName", "FileType", "MethodName",
+                                                           "NbParams", "NLOC", "Complexity"])
+
+Record = Union[CommitRecord, FileRecord, MethodRecord, NormalizedFileRecord, NormalizedMethodRecord, AnalysisErrorRecord, AuthorRecord,
+               BranchSetRecord, SampledCommitRecord, SampledFileRecord, SampledMethodRecord, ChangedMethodRecord,
+               NormalizedChangedMethodRecord, SampledChangedMethodRecord, SnapshotRecord, SnapshotFileRecord, SnapshotMethodRecord]
+
+
+def denormalize(datasets: List[DataSet]) -> List[DataSet]:
+    """
+    Rebuilds the denormalized view of datasets produced in normalized output mode: the commit attributes stored in the
+    commits dataset are joined back into the files and methods datasets, whose columns are restored in their usual order.
+    With analysis profiles, the datasets of each profile (sharing the same "_<profile name>" suffix) are denormalized
+    separately. Datasets that are not normalized are returned as is.
+    """
+    
+    dataframes = {dataset.name: dataset.dataframe for dataset in datasets}
+    
+    # Suffixes of the profiles ("" without profiles), taken from the names of the commits datasets.
+    suffixes = [dataset.name[len("commits_history"):] for dataset in datasets if dataset.name.startswith("commits_history")]
+    
+    if len(suffixes) == 0:
+        raise ValueError("Cannot denormalize datasets without a commits_history dataset")
+    
+    # Commit attributes and denormalized columns of every files and methods dataset, by dataset name.
+    denormalizations = {}
+    
+    for suffix in suffixes:
+        commits = dataframes["commits_history" + suffix]
+        
+        if SAMPLING_WEIGHT in commits.columns:
+            commit_attributes = commits[["CommitId"] + COMMIT_ATTRIBUTES + [SAMPLING_WEIGHT]]
+            files_columns, methods_columns = list(SampledFileRecord._fields), list(SampledMethodRecord._fields)
+        else:
+            commit_attributes = commits[["CommitId"] + COMMIT_ATTRIBUTES]
+            files_columns, methods_columns = list(FileRecord._fields), list(MethodRecord._fields)
+        
+        methods = dataframes.get("methods_history" + suffix)
+        
+        if methods is not None and METHOD_CHANGE_TYPE in methods.columns:
+            methods_columns = _with_method_change_type(tuple(methods_columns))
+        
+        denormalizations["files_history" + suffix] = (commit_attributes, files_columns)
+        denormalizations["methods_history" + suffix] = (commit_attributes, methods_columns)
+    
+    denormalized_datasets = []
+    
+    for dataset in datasets:
+        if dataset.name in denormalizations and "Author" not in dataset.dataframe.columns:
+            commit_attributes, denormalized_columns = denormalizations[dataset.name]
+            dataframe = dataset.dataframe.merge(commit_attributes, on="CommitId", how="left")
+            dataset = DataSet(dataset.name, dataframe[denormalized_columns])
+        
+        denormalized_datasets.append(dataset)
+    
+    return denormalized_datasets
+
+
+def _blob_sha(blob) -> Optional[str]:
+    """
+    Returns the SHA of a GitPython blob (or of its pygit2 backend counterpart), or None if there is no blob (added or deleted file).
+    """
+
+    return blob.hexsha if blob is not None else None
+
 
 class Delver:
     """
@@ -43,20 +200,72 @@ class Delver:
     
     def __init__(self, repository_path: str, csv_output_folder_path: str = "", keep_unsupported_files: bool = False,
                  analysis_mode = utilities.AnalysisMode.COMMITS_FILES, nb_commits_before_checkpoint: int = 50,
-                 log: Callable[[str], None] = None, verbose: bool = True):
+                 log: Callable[[str], None] = None, verbose: bool = True, nb_analysis_processes: int = 1,
+                 analysis_timeout: int = 0, max_analyzed_file_size: int = 0, max_analyzed_line_length: int = 0,
+                 SATD_keywords: List[str] = None, bugfix_keywords: List[str] = None, normalized_output: bool = False,
+                 author_ids: bool = False, merge_authors_by_email: bool = False,
+                 sampling_mode = utilities.SamplingMode.ALL_COMMITS, sampling_size: int = 10, sampling_seed: int = 0,
+                 aggregates: bool = False, branch_set_ids: bool = False, branch_pattern: str = "",
+                 repository_backend = utilities.RepositoryBackend.PYDRILLER, methods_output = utilities.MethodsOutput.ALL_METHODS,
+                 method_change_types: bool = False, snapshot_refs: str = "", first_parent: bool = False,
+                 merge_commits = utilities.MergeCommits.SUMMARIZE, facts_store: bool = False, facts_path: str = "",
+                 profiles: List[utilities.AnalysisProfile] = None, generated_files: str = "", max_worker_memory: int = 0,
+                 worker_max_commits: int = 0, max_unsupported_diff_size: int = 0, git_slot = None):
         """
         Constructor.
         
         Takes the path to the repository to be analyzed, the path where the CSV files are to be generated,
         a boolean telling if unsupported files should be reported, an analysis mode,
-        a logging function for reporting feedback, and a boolean telling if verbose mode should be used.
+        a logging function for reporting feedback, a boolean telling if verbose mode should be used,
+        the number of processes used to analyze the files modified by a commit in parallel, and the per-file
+        analysis budget: a timeout in seconds, a maximum number of characters per file and per line (0 disables a limit),
+        the keywords used to detect SATD and bug fixes (the default ones from config.py are used if not set),
+        a boolean telling if the file and method records should only reference their commit (see denormalize),
+        a boolean telling if authors should be replaced by integer identifiers (resolved with the .mailmap file of the
+        repository and stored in the authors dataset), a boolean telling if authors sharing an email should be merged,
+        the sampling mode, size and seed used to analyze only a subset of the commits (see sampling.py), and a boolean telling
+        if the per file, per author and per month aggregate datasets should be produced (see aggregates.py), a boolean telling
+        if the lists of branches should be replaced by identifiers (stored in the branch_sets dataset) and the pattern limiting
+        the branches taken into account (e.g. "main|release/*", all branches if empty), the backend walking the commits
+        (see backends.py), the methods produced in the methods dataset (all the methods of the modified files or only the
+        changed ones), a boolean telling if the change type of the changed methods should be produced, and the pattern of the
+        tags and branches to be mined in snapshot mode instead of the history (e.g. "v*", see iter_snapshot_rows), a boolean
+        telling if only the first-parent chain of HEAD should be traversed, how merge commits should be mined
+        (summarized or skipped), a boolean telling if the raw facts extracted from the repository should be stored next to
+        the CSV files (see facts.py), and the path to a raw-facts store to be re-analyzed instead of mining the repository.
+        When re-analyzing a store, Git and Lizard are not used: the repository name, the traversed commits and the sampling
+        mode are the ones of the store, and repository_path is ignored.
+        Finally, it takes a list of analysis profiles (see utilities.AnalysisProfile) to be evaluated in a single traversal,
+        each of them producing its own datasets suffixed with its name. The SATD keywords, bug fix keywords and
+        keep_unsupported_files parameters are ignored when profiles are given.
+        The last parameter holds the glob patterns of the generated files (e.g. "*.min.js|package-lock.json"), which like
+        the binary files and the unsupported files whose raw diff exceeds max_unsupported_diff_size bytes (see below) get a
+        row with their line counts only: they are not analyzed and their diff is not parsed. In snapshot mode, the
+        generated files are not analyzed either.
+        To keep long analyses from running out of memory, it also takes the maximum resident set size in MB of the delver
+        process and of its file analysis processes (see watchdog.py), and the number of commits after which the file analysis
+        processes are restarted (0 disables both). When a file analysis process exceeds the memory limit, the file analysis
+        processes are restarted. When the delver process exceeds it, its caches are released and run() saves the current
+        data to disk as on a checkpoint, unless nb_commits_before_checkpoint is 0 (see _watch_memory).
+        The last parameter is the maximum size in bytes of the raw diff of the unsupported files reported when
+        keep_unsupported_files is set (0 disables the limit). Unlike max_analyzed_file_size, which counts the characters
+        of the analyzed source code, it is checked before the diff is decoded.
+        In a bulk analysis, the delver is also given the git slot (see orchestrator.GitSlot) to hold while git reads the
+        repository: while it lists the branches of a commit, diffs it and reads its files, and while it lists and reads the
+        files of a snapshot. The analysis of the files runs without holding it.
         """
-
+        
         self.repository_path = repository_path
                 
         try:
-            self.repository_name = Path(self.repository_path).parts[-1]
-            self.repository = Repository(path_to_repo=repository_path, num_workers = 1)
+            if facts_path:
+                self.repository = FactsRepository(facts_path)
+                self.repository_name = self.repository.repository_name
+                sampling_mode = self.repository.sampling_mode
+            else:
+                self.repository_name = Path(self.repository_path).parts[-1]
+                self.repository = open_repository(repository_path, repository_backend, first_parent,
+                                                  merge_commits == utilities.MergeCommits.SKIP)
         except Exception as ex:
             utilities._handle_error(ex)
         
@@ -66,135 +275,566 @@ class Delver:
         self.nb_commits_before_checkpoint = nb_commits_before_checkpoint        
         self.log = log        
         self.verbose = verbose
+        self.nb_analysis_processes = nb_analysis_processes
+        self.analysis_timeout = analysis_timeout
+        self.max_analyzed_file_size = max_analyzed_file_size
+        self.max_analyzed_line_length = max_analyzed_line_length
+        
+        if SATD_keywords is None or bugfix_keywords is None:
+            from config import config_params
+            
+            SATD_keywords = config_params["SATD_keywords"] if SATD_keywords is None else SATD_keywords
+            bugfix_keywords = config_params["bugfix_keywords"] if bugfix_keywords is None else bugfix_keywords
+        
+        self.SATD_keywords = SATD_keywords
+        self.bugfix_keywords = bugfix_keywords
+        self.normalized_output = normalized_output
+        self.author_ids = author_ids
+        self.merge_authors_by_email = merge_authors_by_email
+        self.sampling_mode = sampling_mode
+        self.sampling_size = sampling_size
+        self.sampling_seed = sampling_seed
+        self.aggregates = aggregates
+        self.branch_set_ids = branch_set_ids
+        self.branch_pattern = branch_pattern
+        self.repository_backend = repository_backend
+        self.methods_output = methods_output
+        self.method_change_types = method_change_types and methods_output == utilities.MethodsOutput.CHANGED_METHODS
+        self.snapshot_refs = snapshot_refs
+        self.first_parent = first_parent
+        self.merge_commits = merge_commits
+        self.facts_store = facts_store
+        self.facts_path = facts_path
+        self.profiles = profiles
+        self.generated_files = generated_files
+        self.max_worker_memory = max_worker_memory
+        self.worker_max_commits = worker_max_commits
+        self.max_unsupported_diff_size = max_unsupported_diff_size
+        
+        # Without git slot (i.e. outside bulk analyses), git is not limited.
+        self._git_slot = git_slot if git_slot is not None else nullcontext()
         
         self._commits_processed = 0
-        self._is_first_write = True
+        self._flush_requested = False
+        
+        # Set by run() when the rows can be saved to disk before the next checkpoint.
+        self._flush_enabled = False
+        self._written_datasets = set()
         
     
-    def run(self) -> List[DataSet]:
+    def iter_rows(self) -> Iterator[Record]:
         """
-        Main method of GitDelver. It traverses all the repository commits, files and methods, and returns a list of datasets
-        caontained in Pandas dataframes.
+        Streaming API of GitDelver. It traverses all the repository commits, files and methods and yields the records as the
+        traversal proceeds: for each commit, the MethodRecord, FileRecord and AnalysisErrorRecord records of its files, followed
+        by its CommitRecord. Nothing is accumulated, so the records can be filtered, aggregated or forwarded with constant memory.
+        In normalized output mode, NormalizedFileRecord and NormalizedMethodRecord records are yielded instead of FileRecord
+        and MethodRecord records. When author identifiers are enabled, an AuthorRecord is yielded for every new author before
+        the first record referencing it, and likewise a BranchSetRecord for every new set of branches when branch set
+        identifiers are enabled. In sampling mode, only the sampled commits are yielded and the Sampled* records,
+        which have an additional "SamplingWeight" field, replace the commit records and the denormalized file and method records.
+        When only the changed methods are produced with their change type, the *ChangedMethodRecord records, which have an
+        additional "MethodChangeType" field, replace the method records. The commits traversed (the whole history or the
+        first-parent chain of HEAD, with or without the merge commits) are set by first_parent and merge_commits.
         """
         
-        # Preparation of the datasets.
-        commits_columns = ["Repository", "Branches", "NbBranches", "CommitId", "Message", "Author", "DateTime", "Date", "HourOfDay",
-                           "Merge", "BugFix", "SATD", "NbModifiedFiles", "ModifiedFiles", "NbModifiedProdSourceFiles",
-                           "NbModifiedTestSourceFiles", "NbModifications", "NbInsertions", "NbDeletions"]
+        return self._iter_records(derived_columns = True)
+    
+    
+    def iter_profile_rows(self) -> Iterator[Tuple[str, Record]]:
+        """
+        Streaming API of the multi-profile analysis. It traverses the repository once and yields (profile name, record) pairs:
+        for each commit, the records of every analysis profile, in the order of the profiles. The records are the ones
+        of iter_rows.
+        """
         
-        files_columns = ["Repository", "Branches", "NbBranches", "OldFilePath", "FilePath", "FileName", "FileExtension", "FileType", 
-                         "ChangeType", "NbMethods", "NbMethodsChanged", "NLOC", "Complexity", "NlocDivByNbMethods", 
-                         "ComplexDivByNbMethods", "SATD", "SATDLine", "NbLinesAdded","NbLinesDeleted", "CommitId", "Author", "DateTime", 
-                         "Date", "HourOfDay"]
+        profile_names = [profile.name for profile in self._profiles()]
         
-        methods_columns = ["Repository", "Branches", "NbBranches", "OldFilePath", "FilePath", "FileName", "FileType", "MethodName", "NbParams", "NLOC", 
-                           "Complexity", "CommitId", "Author","DateTime", "Date", "HourOfDay"]
+        return ((profile_names[profile_index], record) for profile_index, record in self._iter_profile_records(derived_columns = True))
+    
+    
+    def iter_snapshot_rows(self) -> Iterator[Record]:
+        """
+        Streaming API of the snapshot mode. For each tag or branch matching snapshot_refs (from the oldest commit to the newest),
+        it yields the SnapshotMethodRecord (methods mode only), SnapshotFileRecord and AnalysisErrorRecord records of the files
+        of its tree, followed by its SnapshotRecord. Every unique blob is analyzed only once, its results being shared by
+        all the snapshots containing it. The files of a snapshot are read and analyzed in chunks of SNAPSHOT_FILES_PER_PROCESS
+        files per file analysis process, whose records are yielded before the next chunk is read.
+        """
         
-        analysis_errors_columns = ["Repository", "SkippedModificationFilePath", "SkippedModificationFileName", "CommitId"]
+        return self._iter_snapshot_records(derived_columns = True)
+    
+    
+    def _iter_snapshot_records(self, derived_columns: bool) -> Iterator[Record]:
+        """
+        Generator behind iter_snapshot_rows. See _iter_records for derived_columns.
+        """
         
-        commits_rows = []
-        files_rows = []
-        methods_rows = []
-        analysis_errors_rows = []
+        analysis_pool = FileAnalysisPool(self.SATD_keywords, self.nb_analysis_processes, self.analysis_timeout,
+                                         self.max_analyzed_file_size, self.max_analyzed_line_length)
         
-        SATD_keywords = config_params["SATD_keywords"]
-        bugfix_keywords = config_params["bugfix_keywords"]
+        is_generated = utilities.generated_file_filter(self.generated_files)
         
-        if self.log is not None:        
-            start_time = datetime.now()
-            self.log("Starting delving into {}. This operation may take several minutes/hours depending on the size of the repository...".format(self.repository_name.upper()))
-
-        # Process all the commits contained in the repository.
-        for commit in self.repository.traverse_commits():
-            
-            branches = str(commit.branches)
-            nb_branches = len(commit.branches)
-            commit_date = commit.author_date.date()
-            commit_hour_of_day = commit.author_date.time().hour
-            
-            list_of_file_names = []
-            
-            commit_nb_prod_files = 0
-            commit_nb_test_files = 0
-            
-            commit_contains_SATD = False
-            commit_is_bugfix = utilities.is_bugfix(bugfix_keywords, commit.msg)
-            
-            # Process all the files contained in the commit.
-            for file in commit.modified_files:
-                list_of_file_names.append(file.filename)
+        # Analysis results by (blob SHA, file name): Lizard picks its language reader from the file name.
+        analysis_results = {}
+        
+        chunk_size = max(1, self.nb_analysis_processes) * SNAPSHOT_FILES_PER_PROCESS
+        
+        try:
+            for snapshot in list_snapshots(self.repository_path, self.snapshot_refs):
+                # Listing the files of the snapshot runs git.
+                with self._git_slot:
+                    files = [(path, Path(path).name, blob) for path, blob in snapshot_files(snapshot)]
+                
+                files = [(path, file_name, blob, utilities.is_language_supported(file_name)) for path, file_name, blob in files]
                 
-                file_extension = Path(file.filename).suffix
+                snapshot_nb_files, snapshot_nb_methods, snapshot_nloc, snapshot_complexity = 0, 0, 0, 0
                 
-                if (self.keep_unsupported_files or file.language_supported):
-                    change_type = utilities.change_type_as_string(file.change_type)                
-                    file_type = utilities.get_file_type(file.filename)
+                # The files are read, analyzed and reported chunk by chunk, so that only the sources of a chunk are held in memory.
+                for chunk_start in range(0, len(files), chunk_size):
+                    chunk = files[chunk_start:chunk_start + chunk_size]
                     
-                    # Determine the type of the file.
-                    if (file_type == "Production"):
-                        commit_nb_prod_files += 1
-                        
-                    elif (file_type == "Test"):
-                        commit_nb_test_files += 1
+                    # Analyze the blobs of the chunk that were not analyzed before. Like the unsupported files, the generated
+                    # files get a row without analysis. Reading the blobs runs git, the analysis of the files does not.
+                    analysis_tasks = {}
                     
-                    # Determine if there is self-admitted technical debt.
-                    file_contains_SATD, SATDLine = utilities.is_SATD(SATD_keywords, file.diff_parsed)
-                    commit_contains_SATD = file_contains_SATD
+                    with self._git_slot:
+                        for path, file_name, blob, is_supported in chunk:
+                            key = (blob.hexsha, file_name)
+                            
+                            if is_supported and not is_generated(path, file_name) and key not in analysis_results and key not in analysis_tasks:
+                                analysis_tasks[key] = FileAnalysisTask(file_name, decode_source(blob.data_stream.read()), None, "")
                     
-                    # Create the methods dataset (process all the methods contained in the file).
-                    try:
-                        file_methods = file.methods
-                        nb_methods = len(file_methods)
+                    analysis_results.update(zip(analysis_tasks.keys(), analysis_pool.map(list(analysis_tasks.values()))))
+                    
+                    # The sources of the chunk are released before the next chunk is read.
+                    del analysis_tasks
+                    
+                    for path, file_name, blob, is_supported in chunk:
+                        if not (self.keep_unsupported_files or is_supported):
+                            continue
+                        
+                        analysis = analysis_results.get((blob.hexsha, file_name)) if is_supported and not is_generated(path, file_name) else None
+                        
+                        if analysis is not None and analysis.error:
+                            yield AnalysisErrorRecord(self.repository_name, path, file_name, snapshot.commit.hexsha, analysis.error)
+                            continue
+                        
+                        file_methods = analysis.methods if analysis is not None else []
+                        nloc = analysis.nloc if analysis is not None else None
+                        complexity = analysis.complexity if analysis is not None else None
+                        file_type = utilities.get_file_type(file_name) if derived_columns else None
+                        
+                        if (self.analysis_mode == utilities.AnalysisMode.COMMITS_FILES_METHODS):
+                            for method in file_methods:
+                                method_name = utilities.short_method_name(method.name) if derived_columns else method.name
+                                
+                                yield SnapshotMethodRecord(self.repository_name, snapshot.name, path, file_name, file_type, method_name,
+                                                           len(method.parameters), method.nloc, method.complexity)
+                        
+                        if not derived_columns:
+                            nloc_div_by_nb_methods, complex_div_by_nb_methods = None, None
+                        elif len(file_methods) > 0 and nloc is not None:
+                            nloc_div_by_nb_methods = round(nloc / len(file_methods), 2)
+                            complex_div_by_nb_methods = round(complexity / len(file_methods), 2)
+                        else:
+                            nloc_div_by_nb_methods, complex_div_by_nb_methods = 0.00, 0.00
                         
-                        file_changed_methods = file.changed_methods
-                    except:
-                        # RecursionError bug in Lizard library for some (obfuscated / uglified) JavaScript files => skip the files entirely and
-                        # add them to the dataset of errors.
-                        analysis_errors_rows.append((self.repository_name, file.old_path, file.filename, commit.hash))
-                        self.log("!!! Impossible to analyze the methods of file '{}' in commit {} from {}.Skipping file modification altogether...".format(file.filename, 
-                                                                                                                                                  commit.hash, self.repository_name.upper()))
+                        yield SnapshotFileRecord(self.repository_name, snapshot.name, path, file_name, Path(file_name).suffix, file_type,
+                                                 blob.hexsha, len(file_methods), nloc, complexity, nloc_div_by_nb_methods,
+                                                 complex_div_by_nb_methods)
+                        
+                        snapshot_nb_files += 1
+                        snapshot_nb_methods += len(file_methods)
+                        snapshot_nloc += nloc or 0
+                        snapshot_complexity += complexity or 0
+                
+                commit_date_time = snapshot.commit.committed_datetime
+                
+                yield SnapshotRecord(self.repository_name, snapshot.name, snapshot.commit.hexsha, commit_date_time, commit_date_time.date(),
+                                     snapshot_nb_files, snapshot_nb_methods, snapshot_nloc, snapshot_complexity)
+                
+                self._commits_processed += 1
+        finally:
+            analysis_pool.close()
+    
+    
+    def _iter_records(self, derived_columns: bool) -> Iterator[Record]:
+        """
+        Generator behind iter_rows: the records of the first analysis profile (see _iter_profile_records).
+        """
+        
+        return (record for profile_index, record in self._iter_profile_records(derived_columns) if profile_index == 0)
+    
+    
+    def _iter_profile_records(self, derived_columns: bool) -> Iterator[Tuple[int, Record]]:
+        """
+        Generator behind iter_profile_rows, yielding (profile index, record) pairs. The commits are traversed, diffed and
+        analyzed once for all the analysis profiles; only the SATD, the bug fixes and the selection of the unsupported files
+        are evaluated per profile. Without derived_columns, the columns derived from other columns of the same record
+        (FileType, NlocDivByNbMethods, ComplexDivByNbMethods and the short MethodName) are not computed per row: they hold None
+        (the long method name for MethodName) and are computed in batch by _derive_columns when the datasets are built. The
+        ChangeType column then holds the ModificationType value of the file, converted in batch too.
+        """
+        
+        commit_record_type, file_record_type, method_record_type = self._record_types()
+        
+        profiles = self._profiles()
+        profile_indexes = range(len(profiles))
+        
+        # The unsupported files are analyzed if at least one profile keeps them.
+        keep_unsupported_files = any(profile.keep_unsupported_files for profile in profiles)
+        
+        analysis_pool = FileAnalysisPool(profiles[0].SATD_keywords, self.nb_analysis_processes, self.analysis_timeout,
+                                         self.max_analyzed_file_size, self.max_analyzed_line_length)
+        
+        is_generated = utilities.generated_file_filter(self.generated_files)
+        
+        # Last parsed revision of every file, so that the "before" side of a modification is usually not parsed again.
+        parsed_revisions = ParsedRevisions()
+        
+        watchdog = MemoryWatchdog(self.max_worker_memory) if self.max_worker_memory > 0 else None
+        
+        if watchdog is not None and not watchdog.is_supported():
+            if self.log is not None:
+                self.log("!!! The memory of the processes cannot be watched on this platform. Continuing without watchdog...")
+            
+            watchdog = None
+        
+        # When re-analyzing a raw-facts store, the analysis results and the canonical identities of the authors come from the store.
+        replay = self.facts_path != ""
+        mailmap = self.repository.mailmap if replay else git_mailmap(self.repository_path)
+        
+        authors = AuthorDictionary(mailmap, self.merge_authors_by_email) if self.author_ids else None
+        
+        sampler = self._commit_sampler() if not replay else None
+        sampled = self.sampling_mode != utilities.SamplingMode.ALL_COMMITS
+        
+        facts_writer = None
+        
+        if self.facts_store and not replay:
+            facts_writer = FactsWriter(facts_store_path(self.csv_output_folder_path, self.repository_name), self.repository_name,
+                                       self.sampling_mode, mailmap)
+        
+        traversal_complete = False
+        
+        branch_sets = BranchSetDictionary() if self.branch_set_ids else None
+        filter_branches = branch_filter(self.branch_pattern) if self.branch_pattern else None
+        
+        # Stable identifiers of the logical files, following them through renames and copies.
+        file_identities = FileIdentities()
+        
+        try:
+            # Process all the commits contained in the repository.
+            for commit in self.repository.traverse_commits():
+                
+                # Commits left out of the sample are skipped before any expensive operation (branches, diffs).
+                if replay:
+                    sampling_weight = commit.sampling_weight
+                elif sampler is not None:
+                    sampling_weight = sampler.weight(commit.hash)
+                    
+                    if sampling_weight == 0:
                         continue
+                else:
+                    sampling_weight = None
+                
+                commit_suffix = (sampling_weight,) if sampled else ()
+                
+                # Listing the branches containing the commit runs git, so it is only done once per commit.
+                with self._git_slot:
+                    all_commit_branches = commit.branches
+                commit_branches = all_commit_branches
+                
+                if filter_branches is not None:
+                    commit_branches = set(filter_branches(commit_branches))
+                
+                nb_branches = len(commit_branches)
+                
+                if branch_sets is not None:
+                    branches = branch_sets.get_id(frozenset(commit_branches))
                     
-                    # Calculate derived metrics based on NLOC/Complexity and the number of methods.
-                    try:                    
-                        nloc_div_by_nb_methods = round(file.nloc / nb_methods, 2)
-                        complex_div_by_nb_methods = round(file.complexity / nb_methods, 2)
-                    except:
-                        nloc_div_by_nb_methods = 0.00
-                        complex_div_by_nb_methods = 0.00
+                    for branch_set_id, branch_list, nb_branch_set_branches in branch_sets.pop_new_branch_sets():
+                        for profile_index in profile_indexes:
+                            yield profile_index, BranchSetRecord(branch_set_id, branch_list, nb_branch_set_branches)
+                else:
+                    branches = utilities.branches_as_string(commit_branches)
+                commit_date = commit.author_date.date()
+                commit_hour_of_day = commit.author_date.time().hour
+                
+                if authors is not None:
+                    author = authors.get_id(commit.author.name, commit.author.email)
                     
-                    if (self.analysis_mode == utilities.AnalysisMode.COMMITS_FILES_METHODS):
-                        for method in file_methods:
-                            # Appends the data to the method dataset.
-                            methods_rows.append((self.repository_name, branches, nb_branches, file.old_path, file.new_path, method.filename, file_type,
-                                                 utilities.short_method_name(method.name), len(method.parameters), method.nloc,
-                                                 method.complexity, commit.hash, commit.author.name, commit.author_date, commit_date,
-                                                 commit_hour_of_day))
+                    for author_id, name, email in authors.pop_new_authors():
+                        for profile_index in profile_indexes:
+                            yield profile_index, AuthorRecord(author_id, name, email)
+                else:
+                    author = commit.author.name
+                
+                list_of_file_names = []
+                
+                # Commit attributes surrounding the specific values of the file and method records.
+                if self.normalized_output:
+                    row_prefix = ()
+                    row_suffix = (commit.hash,)
+                else:
+                    row_prefix = (self.repository_name, branches, nb_branches)
+                    row_suffix = (commit.hash, author, commit.author_date, commit_date, commit_hour_of_day, *commit_suffix)
+                
+                # Select the files to be analyzed and extract the data needed by the (possibly parallel) analysis.
+                analyzed_files = []
+                analysis_tasks = []
+                file_ids = []
+                
+                # Line counts of the analyzed files skipped early (by index in analyzed_files), which are not analyzed at all.
+                skipped_line_counts = {}
+                
+                # Diffing the commit and reading the files to be analyzed runs git, the analysis of the files does not.
+                with self._git_slot:
+                    # Computing the modified files diffs the commit, so it is only done once per commit.
+                    modified_files = commit.modified_files
+                    analyzed_indexes = []
+                    
+                    for index, file in enumerate(modified_files):
+                        list_of_file_names.append(file.filename)
+                        
+                        # The identities of all the files are tracked, so that renames of unsupported files are not missed.
+                        file_id = file_identities.get_id(file.old_path, file.new_path, file.change_type.name == "COPY")
+                        
+                        # The files of a raw-facts store were selected when the repository was mined.
+                        if replay:
+                            is_analyzed = file.analysis is not None
+                        else:
+                            is_analyzed = keep_unsupported_files or file.language_supported
+                        
+                        if is_analyzed:
+                            analyzed_files.append(file)
+                            analyzed_indexes.append(index)
+                            file_ids.append(file_id)
+                            
+                            if replay:
+                                continue
+                            
+                            raw_diff = file._c_diff.diff
+                            
+                            if is_skipped_early(raw_diff, file.language_supported, is_generated(file.new_path or file.old_path, file.filename),
+                                                self.max_unsupported_diff_size):
+                                skipped_line_counts[len(analyzed_files) - 1] = diff_line_counts(raw_diff)
+                            elif file.language_supported:
+                                analysis_tasks.append(self._analysis_task(file, parsed_revisions))
+                            else:
+                                analysis_tasks.append(FileAnalysisTask(file.filename, None, None, file.diff))
+                
+                if replay:
+                    analysis_results = [stored_analysis(file, profiles[0].SATD_keywords) for file in analyzed_files]
+                else:
+                    pool_results = iter(analysis_pool.map(analysis_tasks))
+                    analysis_results = [SKIPPED_FILE_RESULT if index in skipped_line_counts else next(pool_results)
+                                        for index in range(len(analyzed_files))]
+                    
+                    for index, (file, analysis) in enumerate(zip(analyzed_files, analysis_results)):
+                        if file.language_supported and index not in skipped_line_counts:
+                            parsed = ParsedSource(analysis.methods, analysis.nloc, analysis.complexity) if not analysis.error else None
+                            parsed_revisions.update(file.old_path, file.new_path, file.filename, _blob_sha(file._c_diff.b_blob), parsed)
                     
-                    # Appends the data to the file dataset.
-                    files_rows.append((self.repository_name, branches, nb_branches, file.old_path, file.new_path, file.filename, file_extension, file_type, change_type,
-                                       nb_methods, len(file_changed_methods), file.nloc, file.complexity, nloc_div_by_nb_methods, complex_div_by_nb_methods, 
-                                       file_contains_SATD, SATDLine, file.added_lines, file.deleted_lines, commit.hash, commit.author.name, commit.author_date, 
-                                       commit_date, commit_hour_of_day))
+                    self._watch_memory(analysis_pool, parsed_revisions, watchdog)
+                
+                if facts_writer is not None:
+                    facts_writer.write_commit(commit, all_commit_branches, sampling_weight, modified_files,
+                                              dict(zip(analyzed_indexes, analysis_results)),
+                                              {analyzed_indexes[index]: line_counts for index, line_counts in skipped_line_counts.items()})
+                
+                # The SATD of the other profiles is detected from the lines added to the files, extracted once.
+                if len(profiles) > 1:
+                    added_lines = [self._added_lines(file, analysis, replay) for file, analysis in zip(analyzed_files, analysis_results)]
+                else:
+                    added_lines = [None] * len(analyzed_files)
+                
+                for profile_index, profile in enumerate(profiles):
+                    commit_nb_prod_files = 0
+                    commit_nb_test_files = 0
+                    
+                    commit_contains_SATD = False
+                    commit_is_bugfix = utilities.is_bugfix(profile.bugfix_keywords, commit.msg)
+                    
+                    # Process all the files contained in the commit. Results come back in the original order.
+                    for index, (file, file_id, analysis, file_added_lines) in enumerate(zip(analyzed_files, file_ids, analysis_results, added_lines)):
+                        if not (profile.keep_unsupported_files or file.language_supported):
+                            continue
+                        
+                        # The SATD of the first profile was detected by the analysis.
+                        if profile_index > 0:
+                            analysis = with_SATD(analysis, file_added_lines, profile.SATD_keywords)
+                        
+                        file_extension = Path(file.filename).suffix
+                        change_type = utilities.change_type_as_string(file.change_type) if derived_columns else file.change_type
+                        file_type = utilities.get_file_type(file.filename)
+                        
+                        # Determine the type of the file.
+                        if (file_type == "Production"):
+                            commit_nb_prod_files += 1
+                        
+                        elif (file_type == "Test"):
+                            commit_nb_test_files += 1
+                        
+                        if not derived_columns:
+                            file_type = None
+                        
+                        # Determine if there is self-admitted technical debt.
+                        file_contains_SATD, SATDLine = analysis.contains_SATD, analysis.SATD_line
+                        commit_contains_SATD = file_contains_SATD
+                        
+                        if analysis.error:
+                            # Lizard errors (e.g. RecursionError for some obfuscated / uglified JavaScript files), analysis timeouts
+                            # and files exceeding the size limits => skip the files entirely and add them to the dataset of errors.
+                            yield profile_index, AnalysisErrorRecord(self.repository_name, file.old_path, file.filename, commit.hash, analysis.error)
+                            
+                            if self.log is not None and profile_index == 0:
+                                self.log("!!! Impossible to analyze the methods of file '{}' in commit {} from {}: {}. Skipping file modification altogether...".format(file.filename, 
+                                                                                                                                                          commit.hash, self.repository_name.upper(), analysis.error))
+                            continue
+                        
+                        file_methods = analysis.methods
+                        nb_methods = len(file_methods)
+                        
+                        # The line counts of the files skipped early come from their raw diff, which is not decoded.
+                        if index in skipped_line_counts:
+                            nb_added_lines, nb_deleted_lines = skipped_line_counts[index]
+                        else:
+                            nb_added_lines, nb_deleted_lines = file.added_lines, file.deleted_lines
+                        
+                        # Calculate derived metrics based on NLOC/Complexity and the number of methods.
+                        if not derived_columns:
+                            nloc_div_by_nb_methods = None
+                            complex_div_by_nb_methods = None
+                        elif nb_methods > 0 and analysis.nloc is not None:
+                            nloc_div_by_nb_methods = round(analysis.nloc / nb_methods, 2)
+                            complex_div_by_nb_methods = round(analysis.complexity / nb_methods, 2)
+                        else:
+                            nloc_div_by_nb_methods = 0.00
+                            complex_div_by_nb_methods = 0.00
+                        
+                        if (self.analysis_mode == utilities.AnalysisMode.COMMITS_FILES_METHODS):
+                            if self.methods_output == utilities.MethodsOutput.CHANGED_METHODS:
+                                produced_methods = analysis.changed_methods
+                            else:
+                                produced_methods = [(method, None) for method in file_methods]
+                            
+                            for method, method_change_type in produced_methods:
+                                method_name = utilities.short_method_name(method.name) if derived_columns else method.name
+                                method_suffix = (method_change_type,) if self.method_change_types else ()
+                                
+                                yield profile_index, method_record_type(*row_prefix, file_id, file.old_path, file.new_path, method.filename,
+                                                                        file_type, method_name, len(method.parameters), method.nloc,
+                                                                        method.complexity, *method_suffix, *row_suffix)
+                        
+                        yield profile_index, file_record_type(*row_prefix, file_id, file.old_path, file.new_path, file.filename, file_extension, file_type, change_type,
+                                                              nb_methods, analysis.nb_methods_changed, analysis.nloc, analysis.complexity, nloc_div_by_nb_methods, complex_div_by_nb_methods, 
+                                                              file_contains_SATD, SATDLine, nb_added_lines, nb_deleted_lines, *row_suffix)
+                    
+                    yield profile_index, commit_record_type(self.repository_name, branches, nb_branches, commit.hash, commit.msg, author, commit.author_date,
+                                                            commit_date, commit_hour_of_day, commit.merge, commit_is_bugfix, commit_contains_SATD, commit.files,
+                                                            "\n".join(list_of_file_names), commit_nb_prod_files, commit_nb_test_files, commit.lines,
+                                                            commit.insertions, commit.deletions, *commit_suffix)
+                
+                self._commits_processed += 1
             
-            # Appends the data to the commit dataset.
-            commits_rows.append((self.repository_name, branches, nb_branches, commit.hash, commit.msg, commit.author.name, commit.author_date,
-                                 commit_date, commit_hour_of_day, commit.merge, commit_is_bugfix, commit_contains_SATD, commit.files,
-                                 "\n".join(list_of_file_names), commit_nb_prod_files, commit_nb_test_files, commit.lines,
-                                 commit.insertions, commit.deletions))
+            traversal_complete = True
+        finally:
+            analysis_pool.close()
             
-            if (self._commits_processed > 0 and self.nb_commits_before_checkpoint > 0 and self._commits_processed % self.nb_commits_before_checkpoint == 0): 
+            if facts_writer is not None:
+                facts_writer.close(traversal_complete)
+    
+    
+    def run(self) -> List[DataSet]:
+        """
+        Main method of GitDelver. It traverses all the repository commits, files and methods, and returns a list of datasets
+        caontained in Pandas dataframes. It is built on top of iter_rows.
+        """
+        
+        commit_record_type, file_record_type, method_record_type = self._record_types()
+        
+        if self.snapshot_refs:
+            # In snapshot mode, a snapshot record closes the records of its snapshot like a commit record.
+            commit_record_type = SnapshotRecord
+        
+        # In snapshot mode, the records are not evaluated per profile.
+        profiles = self._profiles() if not self.snapshot_refs else self._profiles()[:1]
+        
+        # Preparation of the datasets of every profile. Tables are (name, rows, columns) triples, in the order of the produced datasets.
+        tables = []
+        profiles_rows_by_record_type = []
+        
+        for profile in profiles:
+            suffix = self._dataset_suffix(profile)
+            
+            profile_tables = [(self._dataset_name("commits_history") + suffix, [], list(commit_record_type._fields)),
+                              (self._dataset_name("files_history") + suffix, [], list(file_record_type._fields))]
+            
+            rows_by_record_type = {commit_record_type: profile_tables[0][1], file_record_type: profile_tables[1][1]}
+            
+            if (self.analysis_mode == utilities.AnalysisMode.COMMITS_FILES_METHODS):
+                profile_tables.append((self._dataset_name("methods_history") + suffix, [], list(method_record_type._fields)))
+                rows_by_record_type[method_record_type] = profile_tables[-1][1]
+            else:
+                # Method records are not produced in this mode: route them nowhere.
+                rows_by_record_type[method_record_type] = []
+            
+            if self.author_ids and not self.snapshot_refs:
+                profile_tables.append(("authors" + suffix, [], list(AuthorRecord._fields)))
+                rows_by_record_type[AuthorRecord] = profile_tables[-1][1]
+            
+            if self.branch_set_ids and not self.snapshot_refs:
+                profile_tables.append(("branch_sets" + suffix, [], list(BranchSetRecord._fields)))
+                rows_by_record_type[BranchSetRecord] = profile_tables[-1][1]
+            
+            profile_tables.append(("analysis_errors" + suffix, [], list(AnalysisErrorRecord._fields)))
+            rows_by_record_type[AnalysisErrorRecord] = profile_tables[-1][1]
+            
+            tables.extend(profile_tables)
+            profiles_rows_by_record_type.append(rows_by_record_type)
+        
+        # The aggregates are maintained during the whole traversal and only written at the end.
+        aggregators = [Aggregator() for profile in profiles] if self.aggregates and not self.snapshot_refs else None
+        
+        if self.log is not None:        
+            start_time = datetime.now()
+            self.log("Starting delving into {}. This operation may take several minutes/hours depending on the size of the repository...".format(self.repository_name.upper()))
+        
+        # The derived columns are computed in batch when the datasets are built (see _derive_columns).
+        if self.snapshot_refs:
+            records = ((0, record) for record in self._iter_snapshot_records(derived_columns = False))
+        else:
+            records = self._iter_profile_records(derived_columns = False)
+        
+        last_profile_index = len(profiles) - 1
+        
+        # The memory watchdog can bring the next checkpoint forward (see _watch_memory).
+        self._flush_enabled = self.nb_commits_before_checkpoint > 0
+        
+        for profile_index, record in records:
+            profiles_rows_by_record_type[profile_index][type(record)].append(record)
+            
+            if aggregators is not None:
+                aggregators[profile_index].add(record)
+            
+            if type(record) is not commit_record_type or profile_index != last_profile_index:
+                continue
+            
+            # The commit record of the last profile closes the records of its commit.
+            if (self.nb_commits_before_checkpoint > 0 and (self._flush_requested or
+                (self._commits_processed > 0 and self._commits_processed % self.nb_commits_before_checkpoint == 0))): 
                 # Generate intermediary datasets.
-                self._generate_dataset(commits_rows, commits_columns,
-                               files_rows, files_columns,
-                               methods_rows, methods_columns,
-                               analysis_errors_rows, analysis_errors_columns)
+                self._generate_dataset(tables)
                 
                 # Reset rows lists to free up memory.
-                commits_rows = []
-                files_rows = []
-                methods_rows = []
-                analysis_errors_rows = []
+                for rows_by_record_type in profiles_rows_by_record_type:
+                    for rows in rows_by_record_type.values():
+                        rows.clear()
+                
+                if self._flush_requested:
+                    self._flush_requested = False
+                    gc.collect()
                 
                 saved_to_disk_message = "Reached checkpoint and saved current data to disk. "
             else: saved_to_disk_message = ""
@@ -202,16 +842,15 @@ class Delver:
             # Prints progression messages if verbose mode is set.
             if (self._commits_processed > 0  and self._commits_processed % 10 == 0 and self.log is not None and self.verbose):
                 self.log("Processed {} commits from {}. {}Continuing...".format(self._commits_processed, self.repository_name.upper(), saved_to_disk_message), True)
-            
-            
-            self._commits_processed += 1  
         
+        self._flush_enabled = False
         
         # Generate the full final datasets.
-        datasets = self._generate_dataset(commits_rows, commits_columns,
-                               files_rows, files_columns,
-                               methods_rows, methods_columns,
-                               analysis_errors_rows, analysis_errors_columns)
+        if aggregators is not None:
+            for profile, aggregator in zip(profiles, aggregators):
+                tables.extend((name + self._dataset_suffix(profile), rows, columns) for name, rows, columns in aggregator.tables())
+        
+        datasets = self._generate_dataset(tables)
         
         if self.log is not None:
             end_time = datetime.now()
@@ -223,27 +862,199 @@ class Delver:
             return datasets
     
     
-    def _build_datasets_objects(self, commits_rows: List, commits_columns: List,
-                                   files_rows: List, files_columns: List,
-                                   methods_rows: List, methods_columns: List,
-                                   analysis_errors_rows: List, analysis_errors_columns: List) -> List[DataSet]:
+    def _watch_memory(self, analysis_pool: FileAnalysisPool, parsed_revisions: ParsedRevisions, watchdog: Optional[MemoryWatchdog]):
+        """
+        Restarts the file analysis processes every worker_max_commits commits, and whenever one of them exceeds the memory
+        limit of the watchdog. When the delver process exceeds it, the parsed revisions are dropped and run() is asked to
+        save the current data to disk. The rows cannot be saved when nb_commits_before_checkpoint is 0 (run() returns all
+        of them) or when they are streamed by iter_rows: they are then kept.
+        """
+        
+        if self.worker_max_commits > 0 and (self._commits_processed + 1) % self.worker_max_commits == 0:
+            # The pool starts new processes on its next use.
+            analysis_pool.close()
+        
+        if watchdog is None:
+            return
+        
+        exceeding_workers = watchdog.exceeding_workers()
+        
+        if exceeding_workers:
+            if self.log is not None:
+                self.log("!!! File analysis processes {} exceed {} MB while analyzing {}. Restarting them...".format(
+                    ", ".join("{} ({} MB)".format(*worker) for worker in exceeding_workers), watchdog.max_memory,
+                    self.repository_name.upper()))
+            
+            analysis_pool.close()
+        
+        delver_memory = watchdog.exceeding_delver()
+        
+        if delver_memory is not None:
+            parsed_revisions.clear()
+            gc.collect()
+            
+            if self._flush_enabled:
+                self._flush_requested = True
+            
+            if self.log is not None:
+                self.log("!!! The delver uses {} MB while analyzing {}. Releasing its caches{}...".format(
+                    delver_memory, self.repository_name.upper(),
+                    " and saving the current data to disk" if self._flush_enabled else
+                    " (the current data cannot be saved to disk before the end of the analysis)"))
+    
+    
+    def _record_types(self) -> Tuple[type, type, type]:
+        """
+        Returns the types of the commit, file and method records, which depend on the output, sampling and methods output modes.
+        In snapshot mode, the file and method records are the snapshot ones.
+        """
+        
+        if self.snapshot_refs:
+            return CommitRecord, SnapshotFileRecord, SnapshotMethodRecord
+        
+        sampled = self.sampling_mode != utilities.SamplingMode.ALL_COMMITS
+        
+        commit_record_type = SampledCommitRecord if sampled else CommitRecord
+        
+        if self.normalized_output:
+            file_record_type, method_record_type = NormalizedFileRecord, NormalizedMethodRecord
+        elif sampled:
+            file_record_type, method_record_type = SampledFileRecord, SampledMethodRecord
+        else:
+            file_record_type, method_record_type = FileRecord, MethodRecord
+        
+        if self.method_change_types:
+            method_record_type = CHANGED_METHOD_RECORD_TYPES[method_record_type]
+        
+        return commit_record_type, file_record_type, method_record_type
+    
+    
+    def _profiles(self) -> List[utilities.AnalysisProfile]:
+        """
+        Returns the analysis profiles: the ones given to the constructor, or a single unnamed profile made of the SATD keywords,
+        bug fix keywords and keep_unsupported_files parameters.
+        """
+        
+        if self.profiles:
+            return self.profiles
+        
+        return [utilities.AnalysisProfile("", self.SATD_keywords, self.bugfix_keywords, self.keep_unsupported_files)]
+    
+    
+    def _added_lines(self, file, analysis, replay: bool) -> Optional[List[str]]:
+        """
+        Returns the lines added to an analyzed file, from which its SATD is detected, or None if its SATD is not detected
+        (see is_SATD_detected).
+        """
+        
+        if replay:
+            return file.analysis["added_lines"]
+        
+        return [line for _, line in parse_diff(file.diff)["added"]] if is_SATD_detected(analysis) else None
+    
+    
+    def _dataset_suffix(self, profile: utilities.AnalysisProfile) -> str:
+        """
+        Returns the suffix of the names of the datasets of an analysis profile: "_" followed by its name when several
+        profiles are analyzed, nothing otherwise.
+        """
+        
+        return "_" + profile.name if self.profiles else ""
+    
+    
+    def _dataset_name(self, history_dataset_name: str) -> str:
         """
-        Builds the datasets collection. This method returns a list of datasets contained in Pandas dataframes.
+        Returns the name of a dataset, which is "snapshots", "snapshots_files" and "snapshots_methods" in snapshot mode
+        instead of "commits_history", "files_history" and "methods_history".
+        """
+        
+        if not self.snapshot_refs:
+            return history_dataset_name
+        
+        return {"commits_history": "snapshots", "files_history": "snapshots_files", "methods_history": "snapshots_methods"}[history_dataset_name]
+    
+    
+    def _commit_sampler(self) -> Optional[CommitSampler]:
+        """
+        Returns the commit sampler of the sampling mode, or None if all the commits are analyzed. In the COMMITS_PER_MONTH mode,
+        the sampler first needs a quick traversal reading only the commit hashes and dates.
+        """
+        
+        if self.sampling_mode == utilities.SamplingMode.ALL_COMMITS:
+            return None
+        
+        sampler = CommitSampler(self.sampling_mode, self.sampling_size, self.sampling_seed)
+        
+        if self.sampling_mode == utilities.SamplingMode.COMMITS_PER_MONTH:
+            sampler.prepare((commit.hash, commit.author_date.strftime("%Y-%m")) for commit in self.repository.traverse_commits())
+        
+        return sampler
+    
+    
+    def _analysis_task(self, file, parsed_revisions: ParsedRevisions) -> FileAnalysisTask:
+        """
+        Builds the analysis task of a supported modified file. Revisions already present in parsed_revisions
+        (checked by path and blob SHA) are reused and their content is not even read from Git.
+        """
+        
+        # PyDriller does not expose the blobs of a modified file, so they are taken from the underlying GitPython diff
+        # (or from the adapter mimicking it in the pygit2 backend).
+        diff = file._c_diff
+        
+        parsed = parsed_revisions.get(file.new_path, file.filename, _blob_sha(diff.b_blob))
+        parsed_before = parsed_revisions.get(file.old_path, file.filename, _blob_sha(diff.a_blob))
+        
+        source_code = decode_source(file.content) if parsed is None else None
+        source_code_before = decode_source(file.content_before) if parsed_before is None else None
+        
+        return FileAnalysisTask(file.filename, source_code, source_code_before, file.diff, parsed, parsed_before)
+    
+    
+    def _build_datasets_objects(self, tables: List[Tuple[str, List, List]]) -> List[DataSet]:
+        """
+        Builds the datasets collection from (name, rows, columns) tables. This method returns a list of datasets contained
+        in Pandas dataframes. The dataset of errors is only built if there were analysis problems.
 
         """
         
-        datasets = [DataSet("commits_history", pd.DataFrame(commits_rows, columns=commits_columns))]
+        import pandas as pd
         
-        datasets.append(DataSet("files_history", pd.DataFrame(files_rows, columns=files_columns)))
+        return [DataSet(name, self._derive_columns(pd.DataFrame(rows, columns=columns))) for name, rows, columns in tables
+                if not name.startswith("analysis_errors") or len(rows) > 0]
+    
+    
+    def _derive_columns(self, dataframe):
+        """
+        Computes in batch, with NumPy and Pandas vectorized operations, the derived columns of the files and methods datasets
+        left empty by _iter_records: FileType, NlocDivByNbMethods, ComplexDivByNbMethods (0 when there are no methods),
+        the short MethodName and the ChangeType strings. Other datasets are returned as is.
+        """
         
-        if (self.analysis_mode == utilities.AnalysisMode.COMMITS_FILES_METHODS):
-            datasets.append(DataSet("methods_history", pd.DataFrame(methods_rows, columns=methods_columns)))
+        if "FileType" not in dataframe.columns:
+            return dataframe
         
-        # Add the the dataset of errors if there were analysis problems. 
-        if len(analysis_errors_rows) > 0:
-            datasets.append(DataSet("analysis_errors", pd.DataFrame(analysis_errors_rows, columns=analysis_errors_columns)))
+        import numpy as np
         
-        return datasets
+        dataframe["FileType"] = utilities.get_file_types(dataframe["FileName"])
+        
+        if "ChangeType" in dataframe.columns:
+            dataframe["ChangeType"] = utilities.change_types_as_strings(dataframe["ChangeType"])
+        
+        if "MethodName" in dataframe.columns:
+            dataframe["MethodName"] = utilities.short_method_names(dataframe["MethodName"])
+        else:
+            nb_methods = dataframe["NbMethods"].to_numpy(dtype=float)
+            
+            for column, metric in [("NlocDivByNbMethods", "NLOC"), ("ComplexDivByNbMethods", "Complexity")]:
+                values = dataframe[metric].to_numpy(dtype=float, na_value=np.nan)
+                has_methods = (nb_methods > 0) & ~np.isnan(values)
+                
+                ratios = np.divide(values, nb_methods, out=np.zeros(len(dataframe)), where=has_methods)
+                
+                # Rounded like the round() of the records, which np.round does not always match (see round_ratios).
+                dataframe[column] = utilities.round_ratios(ratios)
+        
+        return dataframe
     
     
     def _produce_csv(self, datasets: List[DataSet]):
@@ -256,42 +1067,32 @@ class Delver:
             
             path = str(Path(self.csv_output_folder_path).joinpath("{}_{}.csv".format(self.repository_name, dataset.name)))
             
-            if (self.nb_commits_before_checkpoint > 0 and not self._is_first_write):
+            if (self.nb_commits_before_checkpoint > 0 and dataset.name in self._written_datasets):
                 # This is an intermediary write. Append to the file.
-                
-                if (self._is_first_write and Path(path).exists()):
-                    utilities._handle_error("File \"{}\" already exists. Aborting to avoid appending data to it...".format(path))
-                
                 try:
                     dataset.dataframe.to_csv(path, mode='a', header=False, index=False)
                 except Exception as ex:
                     utilities._handle_error(ex)
             else:
-                # This is the first write.
+                # This is the first write of the dataset (which may appear after the first checkpoint, e.g. analysis errors).
                 try:
                     dataset.dataframe.to_csv(path, index=False)
                     
-                    self._is_first_write = False
+                    self._written_datasets.add(dataset.name)
                     
                 except Exception as ex:
                     utilities._handle_error(ex)
         
     
     
-    def _generate_dataset(self, commits_rows: List, commits_columns: List,
-                                   files_rows: List, files_columns: List,
-                                   methods_rows: List, methods_columns: List,
-                                   analysis_errors_rows: List, analysis_errors_columns: List):
+    def _generate_dataset(self, tables: List[Tuple[str, List, List]]):
         """
         This method combines the generation of the dataset objects and the production of the CSV files.
 
         """
         
         # Build the datasets collection.
-        datasets = self._build_datasets_objects(commits_rows, commits_columns,
-                                                   files_rows, files_columns,
-                                                   methods_rows, methods_columns,
-                                                   analysis_errors_rows, analysis_errors_columns)
+        datasets = self._build_datasets_objects(tables)
         
         
         self._produce_csv(datasets)
@@ -300,4 +1101,3 @@ class Delver:
         if self.nb_commits_before_checkpoint == 0:
             # Useful only when nb_commits_before_checkpoint = 0. Mainly used for unit tests.
             return datasets
-        
\ No newline at end of file
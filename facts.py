@@ -0,0 +1,219 @@
+#    Copyright 2021 Nicolas Riquet
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
+This module contains the raw-facts store of GitDelver: a gzip-compressed JSON lines file holding everything the delver
+extracted from Git and Lizard for every traversed commit (commit metadata, numstat, modified files, Lizard results and the
+lines added to the files). The first line is a header describing the traversal; each following line holds the facts of a commit.
+
+A FactsRepository replays a store like a repository backend, so the delver recomputes all the datasets from it with new
+keywords or file type heuristics, without running Git or Lizard. Only the SATD is detected again, from the stored added lines.
+"""
+
+import gzip, json, os
+import utilities
+from analyzer import FileAnalysisResult, MethodMetrics, diff_line_counts, is_SATD_detected, parse_diff, with_SATD
+from collections import namedtuple
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+# Version of the format of the stores, checked when a store is opened.
+FACTS_FORMAT_VERSION = 1
+
+# Named tuples for the commits replayed from a store, with the attributes of the PyDriller commits used by the delver.
+# "sampling_weight" is None unless the store was written in a sampling mode.
+StoredCommit = namedtuple("StoredCommit", ["hash", "msg", "author", "author_date", "merge", "branches", "files", "lines",
+                                           "insertions", "deletions", "modified_files", "sampling_weight"])
+
+StoredAuthor = namedtuple("StoredAuthor", ["name", "email"])
+
+# Named tuple for the modified files replayed from a store. "analysis" holds the stored analysis facts (see stored_analysis),
+# or None if the file was not analyzed.
+StoredFile = namedtuple("StoredFile", ["old_path", "new_path", "filename", "change_type", "language_supported", "added_lines",
+                                       "deleted_lines", "analysis"])
+
+
+def facts_store_path(csv_output_folder_path: str, repository_name: str) -> str:
+    """
+    Returns the path to the raw-facts store of a repository.
+    """
+
+    return os.path.join(csv_output_folder_path, repository_name + "_facts.jsonl.gz")
+
+
+class FactsWriter:
+    """
+    Writes the raw-facts store of a repository as the delver traverses it. The store is written to a temporary file and only
+    replaces the previous store once the traversal is complete.
+    """
+
+    def __init__(self, facts_path: str, repository_name: str, sampling_mode, mailmap: Callable[[str, str], Tuple[str, str]]):
+        """
+        Constructor.
+
+        Takes the path to the store, the name of the repository, the sampling mode of the traversal and the function mapping
+        an author to their canonical identity (stored for every new author, so that author IDs can be computed without Git).
+        """
+
+        self.facts_path = facts_path
+        self._temporary_path = facts_path + ".tmp"
+        self._mailmap = mailmap
+        self._known_authors = set()
+        self._file = gzip.open(self._temporary_path, "wt", encoding="utf-8")
+
+        self._write({"format": FACTS_FORMAT_VERSION, "repository_name": repository_name, "sampling_mode": sampling_mode.name})
+
+
+    def write_commit(self, commit, branches, sampling_weight: Optional[int], modified_files: List,
+                     analyses: Dict[int, FileAnalysisResult], skipped_line_counts: Dict[int, Tuple[int, int]]):
+        """
+        Writes the facts of a commit: the commit itself, the branches containing it (unfiltered), its sampling weight,
+        its modified files and the analysis results of the analyzed ones (by index in modified_files). The diffs of the
+        files skipped early (see analyzer.is_skipped_early) and of the files not analyzed are not decoded: the line counts
+        of the former are given in skipped_line_counts (by index in modified_files), the ones of the latter are counted in
+        their raw diff.
+        """
+
+        author = (commit.author.name, commit.author.email)
+
+        facts = {"hash": commit.hash, "msg": commit.msg, "author": author, "author_date": commit.author_date.isoformat(),
+                 "merge": commit.merge, "branches": list(branches), "files": commit.files, "lines": commit.lines,
+                 "insertions": commit.insertions, "deletions": commit.deletions}
+
+        if author not in self._known_authors:
+            self._known_authors.add(author)
+            facts["mailmap"] = self._mailmap(*author)
+
+        if sampling_weight is not None:
+            facts["sampling_weight"] = sampling_weight
+
+        facts["modified_files"] = []
+
+        for index, file in enumerate(modified_files):
+            if index in skipped_line_counts:
+                added_lines, deleted_lines = skipped_line_counts[index]
+            elif index in analyses:
+                added_lines, deleted_lines = file.added_lines, file.deleted_lines
+            else:
+                added_lines, deleted_lines = diff_line_counts(file._c_diff.diff)
+
+            facts["modified_files"].append({"old_path": file.old_path, "new_path": file.new_path, "filename": file.filename,
+                                            "change_type": file.change_type.name, "language_supported": file.language_supported,
+                                            "added_lines": added_lines, "deleted_lines": deleted_lines,
+                                            "analysis": _analysis_facts(file, analyses[index]) if index in analyses else None})
+
+        self._write(facts)
+
+
+    def close(self, complete: bool):
+        """
+        Closes the store. It replaces the previous store if the traversal is complete, and is discarded otherwise.
+        """
+
+        self._file.close()
+
+        if complete:
+            os.replace(self._temporary_path, self.facts_path)
+        else:
+            os.remove(self._temporary_path)
+
+
+    def _write(self, facts: Dict):
+        self._file.write(json.dumps(facts, separators=(",", ":")) + "\n")
+
+
+def _analysis_facts(file, analysis: FileAnalysisResult) -> Dict:
+    """
+    Returns the facts of the analysis of a modified file. The lines added to the file are stored only when its SATD was
+    detected, i.e. unless it exceeded the analysis budget.
+    """
+
+    added_lines = [line for _, line in parse_diff(file.diff)["added"]] if is_SATD_detected(analysis) else None
+
+    return {"methods": [list(method) for method in analysis.methods], "nb_methods_changed": analysis.nb_methods_changed,
+            "nloc": analysis.nloc, "complexity": analysis.complexity, "error": analysis.error,
+            "changed_methods": [[list(method), change_type] for method, change_type in analysis.changed_methods],
+            "added_lines": added_lines}
+
+
+def stored_analysis(file: StoredFile, SATD_keywords: List[str]) -> FileAnalysisResult:
+    """
+    Returns the analysis result of a stored file, detecting its SATD with SATD_keywords.
+    """
+
+    analysis = file.analysis
+
+    result = FileAnalysisResult([MethodMetrics(*method) for method in analysis["methods"]], analysis["nb_methods_changed"],
+                                analysis["nloc"], analysis["complexity"], False, "", analysis["error"],
+                                [(MethodMetrics(*method), change_type) for method, change_type in analysis["changed_methods"]])
+
+    return with_SATD(result, analysis["added_lines"], SATD_keywords)
+
+
+class FactsRepository:
+    """
+    Repository replaying a raw-facts store, from the oldest commit to the newest.
+    """
+
+    def __init__(self, facts_path: str):
+        """
+        Constructor. Reads the header of the store.
+        """
+
+        self.facts_path = facts_path
+        self._canonical_authors = {}
+
+        with gzip.open(facts_path, "rt", encoding="utf-8") as facts_file:
+            header = json.loads(facts_file.readline())
+
+        if header.get("format") != FACTS_FORMAT_VERSION:
+            raise ValueError("Unsupported raw-facts store format in {}".format(facts_path))
+
+        self.repository_name = header["repository_name"]
+        self.sampling_mode = utilities.SamplingMode[header["sampling_mode"]]
+
+
+    def traverse_commits(self) -> Iterator[StoredCommit]:
+        """
+        Yields the stored commits.
+        """
+
+        from pydriller import ModificationType
+
+        with gzip.open(self.facts_path, "rt", encoding="utf-8") as facts_file:
+            facts_file.readline()
+
+            for line in facts_file:
+                facts = json.loads(line)
+                author = StoredAuthor(*facts["author"])
+
+                if "mailmap" in facts:
+                    self._canonical_authors[author] = tuple(facts["mailmap"])
+
+                modified_files = [StoredFile(file["old_path"], file["new_path"], file["filename"],
+                                             ModificationType[file["change_type"]], file["language_supported"],
+                                             file["added_lines"], file["deleted_lines"], file["analysis"])
+                                  for file in facts["modified_files"]]
+
+                yield StoredCommit(facts["hash"], facts["msg"], author, datetime.fromisoformat(facts["author_date"]),
+                                   facts["merge"], set(facts["branches"]), facts["files"], facts["lines"], facts["insertions"],
+                                   facts["deletions"], modified_files, facts.get("sampling_weight"))
+
+
+    def mailmap(self, name: str, email: str) -> Tuple[str, str]:
+        """
+        Returns the canonical identity of an author, as stored when the repository was mined.
+        """
+
+        return self._canonical_authors.get((name, email), (name, email))
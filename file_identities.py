@@ -0,0 +1,59 @@
+#    Copyright 2021 Nicolas Riquet
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
+This module contains the file identity table maintained by GitDelver during the traversal. Every logical file gets a stable
+integer identifier that follows it through renames and copies, so the history of a file is a simple group-by on its
+identifier instead of a self-join over the renames.
+"""
+
+from typing import Optional
+
+
+class FileIdentities:
+    """
+    Table mapping the current path of every known file to its identifier. Modifications must be submitted in the
+    traversal order.
+    """
+
+    def __init__(self):
+        """
+        Constructor.
+        """
+
+        self._ids_by_path = {}
+        self._nb_ids = 0
+
+
+    def get_id(self, old_path: Optional[str], new_path: Optional[str], is_copy: bool = False) -> int:
+        """
+        Returns the identifier of the file modified from old_path to new_path (None for added or deleted files) and updates
+        the table: an added file gets a new identifier, a renamed file keeps the identifier of its old path, a copied file
+        (is_copy) shares the identifier of the file it was copied from, and a deleted file is removed from the table.
+        A file whose old path is unknown (e.g. its addition was not traversed) gets a new identifier.
+        """
+
+        file_id = self._ids_by_path.get(old_path) if old_path is not None else None
+
+        if file_id is None:
+            file_id = self._nb_ids
+            self._nb_ids += 1
+
+        if old_path is not None and old_path != new_path and not is_copy:
+            self._ids_by_path.pop(old_path, None)
+
+        if new_path is not None:
+            self._ids_by_path[new_path] = file_id
+
+        return file_id
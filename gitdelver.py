@@ -15,16 +15,46 @@
 """
 This module contains the GitDelver console application. It basically reads the configuration parameters
 and then launches several processes, each running its own delver.
+
+Usage: python gitdelver.py [submit | work | status | reanalyze]. Without command, the repositories are mined on this machine only.
+The commands use the work queue located at queue_folder_path to mine a folder of repositories with several machines:
+"submit" adds a job for every repository, "work" starts workers processing the jobs until the queue is drained
+(run it on every machine), and "status" reports the progress and the failed jobs.
+The "reanalyze" command recomputes the datasets from the raw-facts stores of the CSV output folder (see facts_store).
 """
 
-import os
+import os, sys
 import multiprocessing as mp
 from datetime import datetime
+from functools import partial
 from pathlib import Path
+from typing import List
 from delver import Delver
 from config import config_params
+from result_cache import ResultCache, config_hash
+from work_queue import WorkQueue, run_worker
+import orchestrator
+import preparation
 import utilities
 
+# Names of the configuration parameters that must be set in config.py.
+REQUIRED_CONFIG_PARAMS = ["repo_path", "csv_output_folder_path", "keep_unsupported_files", "analysis_mode", "normalized_output", "author_ids",
+                          "merge_authors_by_email", "nb_processes",
+                          "nb_git_processes", "nb_analysis_processes", "analysis_timeout", "max_analyzed_file_size", "max_analyzed_line_length",
+                          "nb_commits_before_checkpoint", "verbose", "SATD_keywords", "bugfix_keywords", "use_result_cache",
+                          "sampling_mode", "sampling_size", "sampling_seed", "aggregates", "branch_set_ids", "branch_pattern",
+                          "queue_folder_path", "queue_lease_duration", "queue_max_attempts", "repository_backend", "methods_output",
+                          "method_change_types", "snapshot_refs", "first_parent", "merge_commits", "facts_store", "profiles",
+                          "generated_files", "repository_preparation", "prepare_copy", "max_worker_memory", "worker_max_commits",
+                          "max_unsupported_diff_size"]
+
+# Names of the configuration parameters influencing the produced datasets. Changing any of them invalidates the result cache.
+OUTPUT_CONFIG_PARAMS = ["keep_unsupported_files", "analysis_mode", "normalized_output", "author_ids", "merge_authors_by_email",
+                        "analysis_timeout", "max_analyzed_file_size", "max_analyzed_line_length", "SATD_keywords", "bugfix_keywords",
+                        "sampling_mode", "sampling_size", "sampling_seed", "aggregates", "branch_set_ids", "branch_pattern",
+                        "methods_output", "method_change_types", "snapshot_refs", "first_parent", "merge_commits", "facts_store",
+                        "profiles", "generated_files", "max_unsupported_diff_size"]
+
 
 def _check_config_params(params: config_params):
     """
@@ -33,19 +63,11 @@ def _check_config_params(params: config_params):
     """
 
     try:
-        params["repo_path"]
-        params["csv_output_folder_path"]
-        params["keep_unsupported_files"]
-        params["analysis_mode"]
-        params["nb_processes"]
-        params["nb_commits_before_checkpoint"]
-        params["verbose"]
-        params["SATD_keywords"]
-        params["bugfix_keywords"]        
+        for param in REQUIRED_CONFIG_PARAMS:
+            params[param]
     except:
-        utilities._handle_error(("Missing configuration parameter. All of the following should be set: repo_path," 
-                                " csv_output_folder_path, keep_unsupported_files, analysis_mode, nb_processes," 
-                                " nb_commits_before_checkpoint, verbose, SATD_keywords, bugfix_keywords."))
+        utilities._handle_error("Missing configuration parameter. All of the following should be set: {}.".format(
+                                ", ".join(REQUIRED_CONFIG_PARAMS)))
     
     list_of_path_vars = ["repo_path", "csv_output_folder_path"]
     
@@ -62,12 +84,36 @@ def _check_config_params(params: config_params):
                                         utilities.AnalysisMode.COMMITS_FILES_METHODS]):
         utilities._handle_error("Configuration parameter \"analysis_mode\" has an invalid value")
     
+    if not isinstance(params["normalized_output"], bool):
+        utilities._handle_error("Configuration parameter \"normalized_output\" has an invalid value")
+    
+    for author_var in ["author_ids", "merge_authors_by_email"]:
+        if not isinstance(params[author_var], bool):
+            utilities._handle_error("Configuration parameter \"{}\" has an invalid value".format(author_var))
+    
     if not isinstance(params["nb_processes"], int) or params["nb_processes"] <= 1:
         utilities._handle_error("Configuration parameter \"nb_processes\" has an invalid value")
+    
+    if not isinstance(params["nb_git_processes"], int) or params["nb_git_processes"] < 1:
+        utilities._handle_error("Configuration parameter \"nb_git_processes\" has an invalid value")
+    
+    if not isinstance(params["nb_analysis_processes"], int) or params["nb_analysis_processes"] < 1:
+        utilities._handle_error("Configuration parameter \"nb_analysis_processes\" has an invalid value")
+    
+    for budget_var in ["analysis_timeout", "max_analyzed_file_size", "max_analyzed_line_length", "max_unsupported_diff_size"]:
+        if not isinstance(params[budget_var], int) or params[budget_var] < 0:
+            utilities._handle_error("Configuration parameter \"{}\" has an invalid value".format(budget_var))
+        
+    if not isinstance(params["generated_files"], str):
+        utilities._handle_error("Configuration parameter \"generated_files\" has an invalid value")
         
     if not isinstance(params["nb_commits_before_checkpoint"], int) or params["nb_commits_before_checkpoint"] < 0:
         utilities._handle_error("Configuration parameter \"nb_commits_before_checkpoint\" has an invalid value")
     
+    for worker_var in ["max_worker_memory", "worker_max_commits"]:
+        if not isinstance(params[worker_var], int) or params[worker_var] < 0:
+            utilities._handle_error("Configuration parameter \"{}\" has an invalid value".format(worker_var))
+    
     if not isinstance(params["verbose"], bool):
         utilities._handle_error("Configuration parameter \"verbose\" has an invalid value")
     
@@ -76,12 +122,109 @@ def _check_config_params(params: config_params):
     
     if not all(isinstance(x, str) for x in params["bugfix_keywords"]):
         utilities._handle_error("Configuration parameter \"bugfix_keywords\" has invalid values")
+    
+    if not isinstance(params["use_result_cache"], bool):
+        utilities._handle_error("Configuration parameter \"use_result_cache\" has an invalid value")
+    
+    if params["sampling_mode"] not in list(utilities.SamplingMode):
+        utilities._handle_error("Configuration parameter \"sampling_mode\" has an invalid value")
+    
+    if not isinstance(params["sampling_size"], int) or params["sampling_size"] < 1:
+        utilities._handle_error("Configuration parameter \"sampling_size\" has an invalid value")
+    
+    if not isinstance(params["sampling_seed"], int):
+        utilities._handle_error("Configuration parameter \"sampling_seed\" has an invalid value")
+    
+    if not isinstance(params["aggregates"], bool):
+        utilities._handle_error("Configuration parameter \"aggregates\" has an invalid value")
+    
+    if not isinstance(params["branch_set_ids"], bool):
+        utilities._handle_error("Configuration parameter \"branch_set_ids\" has an invalid value")
+    
+    if not isinstance(params["branch_pattern"], str):
+        utilities._handle_error("Configuration parameter \"branch_pattern\" has an invalid value")
+    
+    if params["methods_output"] not in list(utilities.MethodsOutput):
+        utilities._handle_error("Configuration parameter \"methods_output\" has an invalid value")
+    
+    if not isinstance(params["method_change_types"], bool):
+        utilities._handle_error("Configuration parameter \"method_change_types\" has an invalid value")
+    
+    if params["method_change_types"] and params["methods_output"] != utilities.MethodsOutput.CHANGED_METHODS:
+        utilities._handle_error("Configuration parameter \"method_change_types\" requires \"methods_output\" to be MethodsOutput.CHANGED_METHODS")
+    
+    if not isinstance(params["snapshot_refs"], str):
+        utilities._handle_error("Configuration parameter \"snapshot_refs\" has an invalid value")
+    
+    if not isinstance(params["first_parent"], bool):
+        utilities._handle_error("Configuration parameter \"first_parent\" has an invalid value")
+    
+    if params["merge_commits"] not in list(utilities.MergeCommits):
+        utilities._handle_error("Configuration parameter \"merge_commits\" has an invalid value")
+    
+    if not isinstance(params["facts_store"], bool):
+        utilities._handle_error("Configuration parameter \"facts_store\" has an invalid value")
+    
+    _check_profiles(params["profiles"])
+    
+    if params["profiles"] and params["snapshot_refs"]:
+        utilities._handle_error("Configuration parameter \"profiles\" cannot be used with \"snapshot_refs\"")
+    
+    if params["repository_preparation"] not in list(utilities.RepositoryPreparation):
+        utilities._handle_error("Configuration parameter \"repository_preparation\" has an invalid value")
+    
+    if not isinstance(params["prepare_copy"], bool):
+        utilities._handle_error("Configuration parameter \"prepare_copy\" has an invalid value")
+    
+    if params["repository_backend"] not in list(utilities.RepositoryBackend):
+        utilities._handle_error("Configuration parameter \"repository_backend\" has an invalid value")
+    
+    if not isinstance(params["queue_folder_path"], str):
+        utilities._handle_error("Configuration parameter \"queue_folder_path\" has an invalid value")
+    
+    for queue_var in ["queue_lease_duration", "queue_max_attempts"]:
+        if not isinstance(params[queue_var], int) or params[queue_var] < 1:
+            utilities._handle_error("Configuration parameter \"{}\" has an invalid value".format(queue_var))
         
         
-def _go_delving(repo_path: str):
+def _check_profiles(profiles: List[utilities.AnalysisProfile]):
+    """
+    Checks the analysis profiles. Their names are used as suffixes of the dataset filenames, so they must be unique and
+    only contain letters, digits, "-" and "_".
+    """
+    
+    if not isinstance(profiles, list):
+        utilities._handle_error("Configuration parameter \"profiles\" has an invalid value")
+    
+    for profile in profiles:
+        if not isinstance(profile, utilities.AnalysisProfile) or not isinstance(profile.name, str) or \
+           not profile.name or not all(character.isalnum() or character in "-_" for character in profile.name) or \
+           not isinstance(profile.keep_unsupported_files, bool):
+            utilities._handle_error("Configuration parameter \"profiles\" has an invalid value")
+        
+        for keywords in [profile.SATD_keywords, profile.bugfix_keywords]:
+            if not isinstance(keywords, list) or not all(isinstance(keyword, str) for keyword in keywords):
+                utilities._handle_error("Configuration parameter \"profiles\" has an invalid value")
+    
+    if len({profile.name for profile in profiles}) != len(profiles):
+        utilities._handle_error("Configuration parameter \"profiles\" has duplicate profile names")
+        
+        
+def _nb_analysis_processes(nb_repository_processes: int) -> int:
+    """
+    Returns the number of file analysis processes each delver may use so that the total number of processes
+    (repository processes x file analysis processes) does not exceed the number of available virtual CPUs.
+    """
+    
+    return max(1, min(config_params["nb_analysis_processes"], mp.cpu_count() // nb_repository_processes))
+
+
+def _go_delving(repo_path: str, nb_repository_processes: int = 1, facts_path: str = "", git_slot: orchestrator.GitSlot = None):
     """
     This function is executed by every process started by the GitDelver console application. It reads
-    configuaration parameters and then starts one delver per process.
+    configuaration parameters and then starts one delver per process. If facts_path is set, the delver
+    re-analyzes this raw-facts store instead of mining repo_path. In bulk mode, the delver holds git_slot
+    while git reads the repository.
     """
 
     csv_output_folder_path = config_params["csv_output_folder_path"]
@@ -89,11 +232,195 @@ def _go_delving(repo_path: str):
     analysis_mode = config_params["analysis_mode"]
     nb_commits_before_checkpoint = config_params["nb_commits_before_checkpoint"]
     verbose = config_params["verbose"]
+    analysis_timeout = config_params["analysis_timeout"]
+    max_analyzed_file_size = config_params["max_analyzed_file_size"]
+    max_analyzed_line_length = config_params["max_analyzed_line_length"]
+    SATD_keywords = config_params["SATD_keywords"]
+    bugfix_keywords = config_params["bugfix_keywords"]
+    normalized_output = config_params["normalized_output"]
+    author_ids = config_params["author_ids"]
+    merge_authors_by_email = config_params["merge_authors_by_email"]
+    sampling_mode = config_params["sampling_mode"]
+    sampling_size = config_params["sampling_size"]
+    sampling_seed = config_params["sampling_seed"]
+    aggregates = config_params["aggregates"]
+    branch_set_ids = config_params["branch_set_ids"]
+    branch_pattern = config_params["branch_pattern"]
+    repository_backend = config_params["repository_backend"]
+    methods_output = config_params["methods_output"]
+    method_change_types = config_params["method_change_types"]
+    snapshot_refs = config_params["snapshot_refs"]
+    first_parent = config_params["first_parent"]
+    merge_commits = config_params["merge_commits"]
+    facts_store = config_params["facts_store"]
+    profiles = config_params["profiles"]
+    generated_files = config_params["generated_files"]
+    max_worker_memory = config_params["max_worker_memory"]
+    worker_max_commits = config_params["worker_max_commits"]
+    max_unsupported_diff_size = config_params["max_unsupported_diff_size"]
+    
+    # Raw-facts stores are re-analyzed without Git: there is no repository to prepare.
+    repository_preparation = config_params["repository_preparation"] if not facts_path else utilities.RepositoryPreparation.NONE
+    prepare_copy = config_params["prepare_copy"]
+    
+    nb_analysis_processes = _nb_analysis_processes(nb_repository_processes)
+    
+    with preparation.prepared_repository(repo_path, repository_preparation, prepare_copy, utilities._log, git_slot) as mined_repo_path:
+        gitdelver = Delver(mined_repo_path, csv_output_folder_path, keep_unsupported_files, analysis_mode, 
+                           nb_commits_before_checkpoint, utilities._log, verbose, nb_analysis_processes,
+                           analysis_timeout, max_analyzed_file_size, max_analyzed_line_length, SATD_keywords, bugfix_keywords,
+                           normalized_output, author_ids, merge_authors_by_email, sampling_mode, sampling_size, sampling_seed,
+                           aggregates, branch_set_ids, branch_pattern, repository_backend, methods_output, method_change_types,
+                           snapshot_refs, first_parent, merge_commits, facts_store, facts_path, profiles,
+                           generated_files, max_worker_memory, worker_max_commits, max_unsupported_diff_size, git_slot)
+        
+        gitdelver.run()
+
+
+def _main_dataset_name() -> str:
+    """
+    Returns the name of the main dataset produced for each repository, whose CSV file the result cache checks.
+    """
+    
+    if config_params["snapshot_refs"]:
+        return "snapshots"
+    
+    if config_params["profiles"]:
+        return "commits_history_" + config_params["profiles"][0].name
+    
+    return "commits_history"
+
+
+def _nb_repository_processes() -> int:
+    """
+    Returns the number of repositories processed at once on this machine: the nb_processes configuration parameter,
+    limited to the number of available virtual CPUs.
+    """
+    
+    nb_processes_config = config_params["nb_processes"]
+    nb_cores = mp.cpu_count()
+    
+    return nb_processes_config if (nb_processes_config >= 1 and nb_processes_config <= nb_cores) else nb_cores
+
+
+def _repositories(repo_path: str) -> List[str]:
+    """
+    Returns the paths to the repositories to be mined: repo_path itself if it is a single repository, otherwise its subfolders.
+    """
+    
+    if utilities.is_single_repository(repo_path):
+        return [repo_path]
+    
+    return [f.path for f in os.scandir(repo_path) if f.is_dir()]
+
+
+def _work_queue() -> WorkQueue:
+    """
+    Returns the work queue configured in config.py.
+    """
+    
+    if config_params["queue_folder_path"] == "":
+        utilities._handle_error("Configuration parameter \"queue_folder_path\" must be set to use the work queue")
+    
+    return WorkQueue(config_params["queue_folder_path"], config_params["queue_lease_duration"], config_params["queue_max_attempts"])
+
+
+def _queue_worker(nb_workers: int):
+    """
+    This function is executed by every worker process started by the "work" command. It processes the jobs of the work queue
+    until it is drained, each repository being mined in its own process.
+    """
+    
+    run_worker(_work_queue(), partial(_go_delving, nb_repository_processes = nb_workers), log = utilities._log,
+               mp_context = _mp_context())
+
+
+def _run_queue_command(command: str):
+    """
+    Runs a work queue command: "submit", "work" or "status".
+    """
+    
+    queue = _work_queue()
+    
+    if command == "submit":
+        nb_added_jobs = queue.submit(_repositories(config_params["repo_path"]))
+        utilities._log("{} jobs added to the work queue located at {}.".format(nb_added_jobs, config_params["queue_folder_path"]))
+        
+    elif command == "work":
+        nb_workers = _nb_repository_processes()
+        utilities._log("Starting {} workers on the work queue located at {}.".format(nb_workers, config_params["queue_folder_path"]))
+        
+        # The workers are not daemonic, so they can start the processes mining the repositories.
+        workers = [mp.Process(target=_queue_worker, args=(nb_workers,)) for _ in range(nb_workers)]
+        
+        for worker in workers:
+            worker.start()
+        
+        for worker in workers:
+            worker.join()
+        
+    elif command == "status":
+        statuses = queue.status()
+        
+        for status in ["completed", "running", "pending"]:
+            utilities._log("{} jobs {}.".format(sum(1 for job_status in statuses.values() if job_status == status), status))
+        
+        for repo_path, status in statuses.items():
+            if status.startswith("failed"):
+                utilities._log("!!! Job of {} {}.".format(repo_path, status))
+        
+    else:
+        utilities._handle_error("Unknown command \"{}\". Usage: python gitdelver.py [submit | work | status | reanalyze]".format(command))
+
+
+def _reanalyze_facts(facts_path: str, nb_repository_processes: int):
+    """
+    This function is executed by every process started by the "reanalyze" command. It re-analyzes a raw-facts store.
+    """
+    
+    _go_delving("", nb_repository_processes, facts_path)
+
+
+def _reanalyze():
+    """
+    Recomputes the datasets of every raw-facts store of the CSV output folder with the current configuration parameters
+    (e.g. new keywords), without running Git or Lizard.
+    """
+    
+    csv_output_folder_path = config_params["csv_output_folder_path"]
+    facts_paths = sorted(str(facts_path) for facts_path in Path(csv_output_folder_path).glob("*_facts.jsonl.gz"))
+    
+    if len(facts_paths) == 0:
+        utilities._handle_error("No raw-facts store found in {}. Mine the repositories with \"facts_store\" set to True first".format(csv_output_folder_path))
     
-    gitdelver = Delver(repo_path, csv_output_folder_path, keep_unsupported_files, analysis_mode, 
-                       nb_commits_before_checkpoint, utilities._log, verbose)
+    nb_processes = min(_nb_repository_processes(), len(facts_paths))
     
-    gitdelver.run()
+    utilities._log("Starting {} processes re-analyzing the {} raw-facts stores located at {}.".format(nb_processes, len(facts_paths), csv_output_folder_path))
+    
+    # Like in bulk mode, each store is re-analyzed in its own process, so a crash only fails its store.
+    statuses = orchestrator.run_bulk(partial(_reanalyze_facts, nb_repository_processes = nb_processes), facts_paths,
+                                     nb_processes, config_params["nb_git_processes"], utilities._log, _mp_context(),
+                                     check_repositories = False)
+    
+    nb_completed = sum(1 for status in statuses.values() if status == "completed")
+    
+    utilities._log("{} raw-facts stores out of {} re-analyzed successfully.".format(nb_completed, len(statuses)))
+
+
+def _mp_context() -> mp.context.BaseContext:
+    """
+    Returns the multiprocessing context used to start the processes running the delvers. Where available, the processes
+    are forked from a server process that has already imported the heavy dependencies (PyDriller, Pandas), so each
+    repository job starts fast.
+    """
+    
+    if "forkserver" not in mp.get_all_start_methods():
+        return mp.get_context()
+    
+    context = mp.get_context("forkserver")
+    context.set_forkserver_preload(["delver", "pydriller", "pandas", "lizard"])
+    
+    return context
 
 
 if __name__ == "__main__":
@@ -107,23 +434,47 @@ if __name__ == "__main__":
     
     repo_path = config_params["repo_path"]
     
-    if (utilities.is_single_repository(repo_path)):
+    if len(sys.argv) > 1 and sys.argv[1] == "reanalyze":
+        # Re-analysis of the raw-facts stores, without mining the repositories again.
+        
+        _reanalyze()
+        
+    elif len(sys.argv) > 1:
+        # Work queue command, to mine a folder of repositories with several machines.
+        
+        _run_queue_command(sys.argv[1])
+        
+    elif (utilities.is_single_repository(repo_path)):
         # The path given is a single repository.
         
         _go_delving(repo_path)
                 
     else:
         # The path given is a folder containing several repositories to be processed in bulk.
-        repositories_list = [f.path for f in os.scandir(repo_path) if f.is_dir()]
-            
-        nb_processes_config = config_params["nb_processes"]
-        nb_cores = mp.cpu_count()
-        nb_processes = nb_processes_config if (nb_processes_config >= 1 and nb_processes_config <= nb_cores) else nb_cores
+        repositories_list = _repositories(repo_path)
+        
+        nb_processes = _nb_repository_processes()
     
         utilities._log("Starting {} delving processes on the repositories located at {}.".format(nb_processes, repo_path))
         
-        pool = mp.Pool(nb_processes)
-        pool.map(_go_delving, repositories_list)
+        # Repositories whose refs and output-related configuration did not change since their last analysis are skipped.
+        result_cache = None
+        
+        if config_params["use_result_cache"]:
+            result_cache = ResultCache(config_params["csv_output_folder_path"],
+                                       config_hash({param: config_params[param] for param in OUTPUT_CONFIG_PARAMS}),
+                                       _main_dataset_name())
+        
+        # Each repository is processed in its own (non-daemonic) process, which can start its own pool of file analysis processes.
+        statuses = orchestrator.run_bulk(partial(_go_delving, nb_repository_processes = nb_processes), repositories_list,
+                                         nb_processes, config_params["nb_git_processes"], utilities._log, _mp_context(),
+                                         result_cache)
+        
+        nb_completed = sum(1 for status in statuses.values() if status == "completed")
+        nb_unchanged = sum(1 for status in statuses.values() if status == "unchanged")
+        
+        utilities._log("{} repositories out of {} processed successfully ({} unchanged repositories skipped).".format(
+                       nb_completed + nb_unchanged, len(statuses), nb_unchanged))
     
     end_time = datetime.now()
     utilities._log("Mining process completed in {}.".format(end_time - start_time))
\ No newline at end of file
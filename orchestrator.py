@@ -0,0 +1,328 @@
+#    Copyright 2021 Nicolas Riquet
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
+This module contains the asyncio orchestrator used by the GitDelver console application for bulk analyses.
+The delvers run in their own processes limited by the number of analysis processes. The git work of the whole analysis
+is limited by the number of git processes: the git slots are shared by the checks run by the orchestrator itself (as
+asynchronous subprocesses) and by the delver processes, which hold one while git reads their repository.
+Every repository is an asyncio task that can be cancelled, which kills its delver process.
+With a result cache, the repositories that did not change since their last successful analysis are skipped.
+Since every job runs in its own process, a job crashing or killed (e.g. by the OOM killer) only fails its repository,
+and the memory of a job is given back to the system when its repository is processed.
+"""
+
+import asyncio
+import multiprocessing as mp
+from contextlib import asynccontextmanager
+from result_cache import ResultCache
+from typing import Callable, Dict, List, Tuple
+
+# Interval, in seconds, at which the orchestrator checks whether a delver process has completed.
+_POLLING_INTERVAL = 0.2
+
+
+async def run_git(repo_path: str, *args: str) -> Tuple[int, str]:
+    """
+    Runs a git command on repo_path as an asynchronous subprocess and returns its exit code and its output.
+    The subprocess is killed if the calling task is cancelled.
+    """
+
+    process = await asyncio.create_subprocess_exec("git", "-C", repo_path, *args, stdout=asyncio.subprocess.PIPE,
+                                                   stderr=asyncio.subprocess.PIPE)
+
+    try:
+        stdout, stderr = await process.communicate()
+    except asyncio.CancelledError:
+        process.kill()
+        await process.wait()
+        raise
+
+    output = stdout if process.returncode == 0 else stderr
+
+    return process.returncode, output.decode("utf-8", "ignore").strip()
+
+
+class GitSlot:
+    """
+    One of the GitSlots of a bulk analysis, given to a job process. The job holds it (as a context manager) while git reads
+    its repository, so that at most the number of git slots of the analysis read repositories at the same time.
+    """
+
+    def __init__(self, semaphore, held):
+        """
+        Constructor.
+
+        Takes the semaphore of the GitSlots and the shared flag telling if the job process holds a slot.
+        """
+
+        self._semaphore = semaphore
+        self._held = held
+
+
+    def __enter__(self):
+        self._semaphore.acquire()
+        self._held.value = True
+
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._held.value = False
+        self._semaphore.release()
+
+
+    def release_if_held(self):
+        """
+        Gives back the slot held by a job process that died while holding it (e.g. killed by the OOM killer).
+        """
+
+        if self._held.value:
+            self._held.value = False
+            self._semaphore.release()
+
+
+class GitSlots:
+    """
+    Limit on the number of processes of a bulk analysis (the orchestrator and the job processes) running git at the same
+    time, to avoid I/O storms on shared storage.
+    """
+
+    def __init__(self, nb_slots: int, mp_context: mp.context.BaseContext):
+        """
+        Constructor.
+
+        Takes the number of slots and the multiprocessing context used to start the job processes.
+        """
+
+        self.mp_context = mp_context
+
+        self._semaphore = mp_context.BoundedSemaphore(nb_slots)
+
+
+    def job_slot(self) -> GitSlot:
+        """
+        Returns a new GitSlot, to be given to a job process when it is started.
+        """
+
+        return GitSlot(self._semaphore, self.mp_context.Value("b", False))
+
+
+    @asynccontextmanager
+    async def slot(self):
+        """
+        Asynchronous context manager holding a slot in the orchestrator, without blocking its event loop while waiting.
+        """
+
+        while not self._semaphore.acquire(False):
+            await asyncio.sleep(_POLLING_INTERVAL)
+
+        try:
+            yield
+        finally:
+            self._semaphore.release()
+
+
+class BulkOrchestrator:
+    """
+    Runs a job (typically a delver) on every repository of a list. Each repository first goes through a git stage
+    (checking that it is a valid repository) and then through an analysis stage running the job in a separate process.
+    The number of repositories prepared in advance is bounded, so the git stage never runs far ahead of the analysis stage.
+    """
+
+    def __init__(self, job: Callable[[str], None], nb_analysis_processes: int, nb_git_processes: int,
+                 log: Callable[[str], None] = None, mp_context: mp.context.BaseContext = None,
+                 result_cache: ResultCache = None, check_repositories: bool = True):
+        """
+        Constructor.
+
+        Takes the job to be run on every repository (a picklable function taking the repository path and, as "git_slot"
+        keyword argument, the GitSlot to hold while running git), the maximum number of concurrent analysis processes and
+        git processes, a logging function, the multiprocessing context used to start the analysis processes, the result
+        cache used to skip unchanged repositories (None disables it) and a boolean telling if the git stage should be run.
+        Without it, the job is given any path (e.g. a raw-facts store) and no GitSlot.
+        """
+
+        self.job = job
+        self.nb_analysis_processes = nb_analysis_processes
+        self.nb_git_processes = nb_git_processes
+        self.log = log
+        self.mp_context = mp_context if mp_context is not None else mp.get_context()
+        self.result_cache = result_cache
+        self.check_repositories = check_repositories
+
+        self._tasks = {}
+
+
+    async def run(self, repositories: List[str]) -> Dict[str, str]:
+        """
+        Processes all the repositories and returns the status of each of them ("completed", "unchanged", "cancelled",
+        or the reason of the failure).
+        """
+
+        self._git_slots = GitSlots(self.nb_git_processes, self.mp_context)
+        self._analysis_slots = asyncio.Semaphore(self.nb_analysis_processes)
+
+        # Repositories that went through the git stage and are waiting for an analysis slot.
+        self._prepared_slots = asyncio.Semaphore(self.nb_analysis_processes)
+
+        self._tasks = {repo_path: asyncio.ensure_future(self._process_repository(repo_path)) for repo_path in repositories}
+
+        try:
+            await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+        except asyncio.CancelledError:
+            self.cancel_all()
+            await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+            raise
+
+        statuses = {}
+
+        for repo_path, task in self._tasks.items():
+            if task.cancelled():
+                statuses[repo_path] = "cancelled"
+            elif task.exception() is not None:
+                statuses[repo_path] = "failed ({})".format(task.exception())
+            else:
+                statuses[repo_path] = task.result()
+
+        return statuses
+
+
+    def cancel(self, repo_path: str) -> bool:
+        """
+        Cancels the processing of a repository. Returns False if the repository is unknown or already processed.
+        """
+
+        task = self._tasks.get(repo_path)
+
+        return task.cancel() if task is not None else False
+
+
+    def cancel_all(self):
+        """
+        Cancels the processing of all the repositories.
+        """
+
+        for task in self._tasks.values():
+            task.cancel()
+
+
+    async def _process_repository(self, repo_path: str) -> str:
+        """
+        Runs the git stage and the analysis stage of a repository and returns its status.
+        """
+
+        if not self.check_repositories:
+            async with self._analysis_slots:
+                self._log("Dispatching {}.".format(repo_path))
+
+                return await self._analyze(repo_path)
+
+        async with self._prepared_slots:
+            async with self._git_slots.slot():
+                exit_code, output = await run_git(repo_path, "rev-parse", "--git-dir")
+
+            if exit_code != 0:
+                self._log("!!! Skipping {}, which is not a valid Git repository: {}".format(repo_path, output))
+                return "failed (invalid repository)"
+
+            fingerprint = await self._fingerprint(repo_path) if self.result_cache is not None else None
+
+            if self.result_cache is not None and self.result_cache.is_fresh(repo_path, fingerprint):
+                self._log("Skipping {}, which did not change since its last analysis.".format(repo_path))
+                return "unchanged"
+
+            await self._analysis_slots.acquire()
+
+        try:
+            self._log("Dispatching {}.".format(repo_path))
+
+            if self.result_cache is not None:
+                self.result_cache.invalidate(repo_path)
+
+            status = await self._analyze(repo_path)
+
+            if status == "completed" and self.result_cache is not None:
+                self.result_cache.store(repo_path, fingerprint)
+
+            return status
+        finally:
+            self._analysis_slots.release()
+
+
+    async def _fingerprint(self, repo_path: str) -> str:
+        """
+        Returns the fingerprint of a repository (tips of all its refs and configuration parameters), or None if its refs
+        cannot be listed.
+        """
+
+        async with self._git_slots.slot():
+            exit_code, output = await run_git(repo_path, "show-ref", "--head")
+
+        return self.result_cache.fingerprint(output) if exit_code == 0 else None
+
+
+    async def _analyze(self, repo_path: str) -> str:
+        """
+        Runs the job on a repository in a separate process and returns its status. The process is terminated if the
+        task is cancelled. The git slot of the process is given back if it dies while holding it.
+        """
+
+        git_slot = self._git_slots.job_slot() if self.check_repositories else None
+        kwargs = {"git_slot": git_slot} if git_slot is not None else {}
+
+        process = self.mp_context.Process(target=self.job, args=(repo_path,), kwargs=kwargs)
+        process.start()
+
+        try:
+            while process.is_alive():
+                await asyncio.sleep(_POLLING_INTERVAL)
+        except asyncio.CancelledError:
+            process.terminate()
+            process.join()
+            self._log("!!! Processing of {} cancelled.".format(repo_path))
+            raise
+        finally:
+            if git_slot is not None and not process.is_alive():
+                git_slot.release_if_held()
+
+        process.join()
+
+        if process.exitcode != 0:
+            self._log("!!! Processing of {} failed with exit code {}.".format(repo_path, process.exitcode))
+            return "failed (exit code {})".format(process.exitcode)
+
+        return "completed"
+
+
+    def _log(self, message: str):
+        """
+        Reports message through the logging function, if any.
+        """
+
+        if self.log is not None:
+            self.log(message)
+
+
+def run_bulk(job: Callable[[str], None], repositories: List[str], nb_analysis_processes: int, nb_git_processes: int,
+             log: Callable[[str], None] = None, mp_context: mp.context.BaseContext = None,
+             result_cache: ResultCache = None, check_repositories: bool = True) -> Dict[str, str]:
+    """
+    Runs job on all the repositories with a BulkOrchestrator and returns the status of each repository.
+    """
+
+    orchestrator = BulkOrchestrator(job, nb_analysis_processes, nb_git_processes, log, mp_context, result_cache,
+                                    check_repositories)
+
+    return asyncio.run(orchestrator.run(repositories))
@@ -0,0 +1,160 @@
+#    Copyright 2021 Nicolas Riquet
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
+This module contains the optional preparation stage run by the GitDelver console application before mining a repository.
+Git answers the object lookups and ancestry queries of the delver (e.g. listing the branches containing every commit) much
+faster when the repository has an up-to-date commit-graph, which stores the commits with their generation numbers, and
+well-packed objects. Mirrors often have neither.
+
+The stage can only check the repository, or write its commit-graph and multi-pack-index (after repacking its objects if
+asked to), either in place or in a temporary copy when the repository must not be modified. A probe timing a few typical
+git queries is run before and after the preparation.
+"""
+
+import os, shutil, subprocess, tempfile, time
+import utilities
+from collections import namedtuple
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Callable, Iterator, List
+
+# Named tuple describing the state of the object database of a repository.
+RepositoryState = namedtuple("RepositoryState", ["commit_graph", "multi_pack_index", "nb_packs", "nb_loose_objects"])
+
+
+def _git(repo_path: str, *args: str) -> str:
+    """
+    Runs a git command on repo_path and returns its output. Raises a CalledProcessError if the command fails.
+    """
+
+    return subprocess.run(["git", "-C", repo_path, *args], check=True, capture_output=True, text=True).stdout
+
+
+def repository_state(repo_path: str) -> RepositoryState:
+    """
+    Returns the state of the object database of a repository: whether it has a commit-graph (single file or chain of
+    split files) and a multi-pack-index, and its numbers of packs and loose objects.
+    """
+
+    objects_path = Path(repo_path, _git(repo_path, "rev-parse", "--git-path", "objects").strip())
+
+    counts = dict(line.split(": ") for line in _git(repo_path, "count-objects", "-v").splitlines())
+
+    commit_graph = objects_path.joinpath("info", "commit-graph").exists() or \
+                   objects_path.joinpath("info", "commit-graphs", "commit-graph-chain").exists()
+
+    return RepositoryState(commit_graph, objects_path.joinpath("pack", "multi-pack-index").exists(),
+                           int(counts["packs"]), int(counts["count"]))
+
+
+def probe_duration(repo_path: str) -> float:
+    """
+    Returns the number of seconds taken by a few git queries typical of the delver: walking all the commits, and listing
+    the branches containing the root commit of HEAD (an ancestry query over the whole history).
+    """
+
+    start_time = time.perf_counter()
+
+    _git(repo_path, "rev-list", "--all", "--count")
+
+    root_commits = _git(repo_path, "rev-list", "--max-parents=0", "HEAD").split()
+
+    if root_commits:
+        _git(repo_path, "branch", "--contains", root_commits[0])
+
+    return time.perf_counter() - start_time
+
+
+def prepare(repo_path: str, preparation: utilities.RepositoryPreparation) -> List[str]:
+    """
+    Prepares a repository for mining and returns the steps performed: repacking all its objects into a single pack
+    (RepositoryPreparation.REPACK only), then writing its commit-graph and, if it has packs, its multi-pack-index.
+    """
+
+    steps = []
+
+    if preparation == utilities.RepositoryPreparation.REPACK:
+        _git(repo_path, "repack", "-a", "-d", "-q")
+        steps.append("objects repacked")
+
+    _git(repo_path, "commit-graph", "write", "--reachable")
+    steps.append("commit-graph written")
+
+    # Git refuses to write a multi-pack-index without pack.
+    if repository_state(repo_path).nb_packs > 0:
+        _git(repo_path, "multi-pack-index", "write")
+        steps.append("multi-pack-index written")
+
+    return steps
+
+
+@contextmanager
+def prepared_repository(repo_path: str, preparation: utilities.RepositoryPreparation, copy: bool,
+                        log: Callable[[str], None], git_slot = None) -> Iterator[str]:
+    """
+    Context manager running the preparation stage on a repository and returning the path of the repository to be mined.
+    With RepositoryPreparation.CHECK, the state of the repository and the probe duration are only reported. With
+    RepositoryPreparation.WRITE or REPACK, the repository is prepared and the probe durations before and after the
+    preparation are reported. If copy is set, a temporary mirror of the repository (with the same name, so that the
+    datasets are named alike) is prepared and mined instead, and deleted afterwards. In a bulk analysis, the git slot of
+    the delver process (see orchestrator.GitSlot) is held during the preparation.
+    """
+
+    if preparation == utilities.RepositoryPreparation.NONE:
+        yield repo_path
+        return
+
+    repository_name = Path(repo_path).parts[-1]
+    mined_repo_path = repo_path
+    copy_folder_path = None
+
+    try:
+        with git_slot if git_slot is not None else nullcontext():
+            try:
+                if preparation == utilities.RepositoryPreparation.CHECK:
+                    state = repository_state(repo_path)
+
+                    log("Repository {}: commit-graph {}, multi-pack-index {}, {} packs and {} loose objects, probe {:.3f}s.".format(
+                        repository_name.upper(), "present" if state.commit_graph else "missing",
+                        "present" if state.multi_pack_index else "missing", state.nb_packs, state.nb_loose_objects,
+                        probe_duration(repo_path)))
+                else:
+                    if copy:
+                        copy_folder_path = tempfile.mkdtemp(prefix="gitdelver_")
+                        mined_repo_path = os.path.join(copy_folder_path, repository_name)
+
+                        # Local clones hardlink the object files when possible. Git never modifies them, so the original
+                        # repository is left untouched.
+                        subprocess.run(["git", "clone", "--mirror", "--quiet", repo_path, mined_repo_path], check=True,
+                                       capture_output=True)
+
+                    duration_before = probe_duration(mined_repo_path)
+
+                    start_time = time.perf_counter()
+                    steps = prepare(mined_repo_path, preparation)
+                    preparation_duration = time.perf_counter() - start_time
+
+                    log("Repository {} prepared{} in {:.3f}s ({}): probe {:.3f}s before, {:.3f}s after.".format(
+                        repository_name.upper(), " in a temporary copy" if copy else "", preparation_duration, ", ".join(steps),
+                        duration_before, probe_duration(mined_repo_path)))
+            except (subprocess.CalledProcessError, OSError) as ex:
+                # E.g. an empty or read-only repository: it is mined as is.
+                log("!!! Impossible to prepare repository {}: {}. Mining it as is...".format(repository_name.upper(), ex))
+                mined_repo_path = repo_path
+
+        yield mined_repo_path
+    finally:
+        if copy_folder_path is not None:
+            shutil.rmtree(copy_folder_path, ignore_errors=True)
@@ -0,0 +1,117 @@
+#    Copyright 2021 Nicolas Riquet
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
+This module contains the result cache used by the GitDelver console application for bulk analyses. Each repository is
+fingerprinted from the tips of all its refs and from the configuration parameters that influence the datasets. A repository
+whose fingerprint did not change since its last successful analysis is not analyzed again: its existing CSV files are reused.
+"""
+
+import hashlib, json, os
+from pathlib import Path
+from typing import Dict, Optional
+
+# Name of the file storing the fingerprints, in the CSV output folder.
+CACHE_FILE_NAME = "gitdelver_cache.json"
+
+# Version of the datasets format. Bumping it invalidates all the cached results.
+CACHE_VERSION = 3
+
+
+def config_hash(params: Dict) -> str:
+    """
+    Returns a hash of the configuration parameters influencing the datasets (e.g. analysis mode, keywords).
+    """
+
+    serialized = json.dumps({"version": CACHE_VERSION, "params": params}, sort_keys=True, default=str)
+
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """
+    Fingerprints of the repositories analyzed successfully, stored in the CSV output folder.
+    """
+
+    def __init__(self, csv_output_folder_path: str, config_hash: str, main_dataset_name: str = "commits_history"):
+        """
+        Constructor.
+
+        Takes the path to the folder containing the CSV files (where the fingerprints are also stored), the hash of
+        the configuration parameters (see config_hash) and the name of the dataset always produced by an analysis
+        ("snapshots" in snapshot mode), whose CSV file must exist for the results to be reused.
+        """
+
+        self.csv_output_folder_path = csv_output_folder_path
+        self.config_hash = config_hash
+        self.main_dataset_name = main_dataset_name
+        self.path = Path(csv_output_folder_path).joinpath(CACHE_FILE_NAME)
+
+        try:
+            with open(self.path, encoding="utf-8") as cache_file:
+                self._fingerprints = json.load(cache_file)
+        except (OSError, ValueError):
+            self._fingerprints = {}
+
+
+    def fingerprint(self, refs: str) -> str:
+        """
+        Returns the fingerprint of a repository from the list of its refs and their tips (output of "git show-ref --head").
+        """
+
+        return hashlib.sha256("{}\n{}".format(self.config_hash, refs).encode("utf-8")).hexdigest()
+
+
+    def is_fresh(self, repo_path: str, fingerprint: Optional[str]) -> bool:
+        """
+        Tells if the results of the repository are up to date: same fingerprint as the last successful analysis,
+        and its CSV files still exist.
+        """
+
+        repository_name = Path(repo_path).parts[-1]
+
+        return (fingerprint is not None and self._fingerprints.get(repository_name) == fingerprint and
+                Path(self.csv_output_folder_path).joinpath("{}_{}.csv".format(repository_name, self.main_dataset_name)).exists())
+
+
+    def invalidate(self, repo_path: str):
+        """
+        Forgets the fingerprint of a repository, whose results are about to be rewritten.
+        """
+
+        if self._fingerprints.pop(Path(repo_path).parts[-1], None) is not None:
+            self._save()
+
+
+    def store(self, repo_path: str, fingerprint: Optional[str]):
+        """
+        Records the fingerprint of a repository analyzed successfully.
+        """
+
+        if fingerprint is not None:
+            self._fingerprints[Path(repo_path).parts[-1]] = fingerprint
+            self._save()
+
+
+    def _save(self):
+        """
+        Writes the fingerprints to disk. The file is replaced atomically so an interrupted run never leaves it corrupted.
+        """
+
+        temporary_path = str(self.path) + ".tmp"
+
+        with open(temporary_path, "w", encoding="utf-8") as cache_file:
+            json.dump(self._fingerprints, cache_file, indent=1, sort_keys=True)
+
+        os.replace(temporary_path, self.path)
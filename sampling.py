@@ -0,0 +1,90 @@
+#    Copyright 2021 Nicolas Riquet
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
+This module contains the commit sampler used by GitDelver to analyze only a subset of the commits of huge histories.
+Every sampled commit gets a sampling weight (the number of commits it stands for), so that approximate statistics
+can be computed from the sampled datasets (e.g. weighted sums of churn or counts of modifications).
+"""
+
+import random
+from collections import defaultdict
+from typing import Iterable, Tuple
+from utilities import SamplingMode
+
+
+class CommitSampler:
+    """
+    Decides which commits are analyzed. Commits must be submitted in the traversal order.
+    """
+
+    def __init__(self, sampling_mode: SamplingMode, sampling_size: int, sampling_seed: int = 0):
+        """
+        Constructor.
+
+        Takes the sampling mode, the sampling size (N in "every Nth commit", "one commit in N" and "N commits per month")
+        and the seed of the random sampling modes.
+        """
+
+        self.sampling_mode = sampling_mode
+        self.sampling_size = sampling_size
+        self.sampling_seed = sampling_seed
+
+        self._random = random.Random(sampling_seed)
+        self._nb_commits = 0
+        self._weights_by_commit = None
+
+
+    def prepare(self, commits: Iterable[Tuple[str, str]]):
+        """
+        Draws the sampled commits of each month from the (commit hash, month) pairs of the whole traversal. This is only
+        needed in the COMMITS_PER_MONTH mode, where the number of commits of every month must be known in advance.
+        """
+
+        commits_by_month = defaultdict(list)
+
+        for commit_hash, month in commits:
+            commits_by_month[month].append(commit_hash)
+
+        self._weights_by_commit = {}
+
+        for month in sorted(commits_by_month):
+            month_commits = commits_by_month[month]
+            sampled_commits = self._random.sample(month_commits, min(self.sampling_size, len(month_commits)))
+
+            for commit_hash in sampled_commits:
+                self._weights_by_commit[commit_hash] = len(month_commits) / len(sampled_commits)
+
+
+    def weight(self, commit_hash: str) -> float:
+        """
+        Returns the sampling weight of the next commit of the traversal, or 0 if it is not sampled.
+        """
+
+        index = self._nb_commits
+        self._nb_commits += 1
+
+        if self.sampling_mode == SamplingMode.EVERY_NTH_COMMIT:
+            return float(self.sampling_size) if index % self.sampling_size == 0 else 0.0
+
+        if self.sampling_mode == SamplingMode.RANDOM_COMMITS:
+            return float(self.sampling_size) if self._random.random() * self.sampling_size < 1 else 0.0
+
+        if self.sampling_mode == SamplingMode.COMMITS_PER_MONTH:
+            if self._weights_by_commit is None:
+                raise RuntimeError("The commits must be prepared before sampling them per month")
+
+            return self._weights_by_commit.get(commit_hash, 0.0)
+
+        return 1.0
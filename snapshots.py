@@ -0,0 +1,65 @@
+#    Copyright 2021 Nicolas Riquet
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
+This module lists the snapshots mined by GitDelver in snapshot mode: the tags and branches of a repository matching a pattern,
+along with the files of their trees. The delver analyzes every file of every snapshot, but each unique blob only once.
+"""
+
+from branch_sets import branch_filter
+from collections import namedtuple
+from typing import Iterator, List, Tuple
+
+# Named tuple for a snapshot: the name of the tag or branch and the commit it points to (a GitPython commit).
+Snapshot = namedtuple("Snapshot", ["name", "commit"])
+
+# Mode of the tree entries that are symbolic links. Their blobs hold the link target, not source code.
+_SYMLINK_MODE = 0o120000
+
+
+def list_snapshots(repository_path: str, pattern: str) -> List[Snapshot]:
+    """
+    Returns the tags and local branches of the repository whose name matches pattern (glob patterns separated by "|",
+    e.g. "v*|main"), sorted by commit date. Tags pointing to something else than a commit are ignored.
+    """
+
+    import git
+
+    repository = git.Repo(repository_path)
+    matches = branch_filter(pattern)
+
+    snapshots = []
+
+    for ref in list(repository.tags) + list(repository.heads):
+        if not matches([ref.name]):
+            continue
+
+        try:
+            snapshots.append(Snapshot(ref.name, ref.commit))
+        except ValueError:
+            # Tag of a tree or of a blob.
+            continue
+
+    return sorted(snapshots, key=lambda snapshot: (snapshot.commit.committed_date, snapshot.name))
+
+
+def snapshot_files(snapshot: Snapshot) -> Iterator[Tuple[str, object]]:
+    """
+    Yields the (path, GitPython blob) pairs of the files of a snapshot, sorted by path. Submodules and symbolic links are skipped.
+    """
+
+    blobs = snapshot.commit.tree.traverse(predicate=lambda item, depth: item.type == "blob" and item.mode != _SYMLINK_MODE)
+
+    for blob in sorted(blobs, key=lambda blob: blob.path):
+        yield blob.path, blob
@@ -0,0 +1,69 @@
+#    Copyright 2021 Nicolas Riquet
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
+This module contains the unit tests for the "aggregates" module.
+"""
+
+import pytest
+from datetime import date
+from collections import namedtuple
+from aggregates import Aggregator, FileAggregate, AuthorAggregate, MonthAggregate
+
+# Minimal file and commit records, with the fields used by the aggregator.
+File = namedtuple("File", ["FileId", "FilePath", "ChangeType", "Complexity", "NbLinesAdded", "NbLinesDeleted"])
+Commit = namedtuple("Commit", ["CommitId", "Author", "Date", "NbModifiedFiles"])
+SampledCommit = namedtuple("SampledCommit", ["CommitId", "Author", "Date", "NbModifiedFiles", "SamplingWeight"])
+
+
+def test_aggregates_tables():
+    """
+    This unit test checks that the aggregator computes the per file, per author and per month rollups, the file
+    records being attributed to the commit record that follows them.
+    """
+
+    aggregator = Aggregator()
+
+    for record in [File(0, "A.java", "ADD", 5, 10, 0), File(1, "B.java", "ADD", 3, 20, 0), Commit("c1", "alice", date(2021, 1, 5), 2),
+                   File(0, "C.java", "RENAME", 7, 4, 2), Commit("c2", "bob", date(2021, 1, 20), 1),
+                   File(1, None, "DELETE", None, 0, 20), Commit("c3", "alice", date(2021, 2, 1), 1)]:
+        aggregator.add(record)
+
+    files, authors, months = [rows for _, rows, _ in aggregator.tables()]
+
+    assert files == [FileAggregate(0, "C.java", 2, 2, 14, 2, 7, 7, date(2021, 1, 5), date(2021, 1, 20)),
+                     FileAggregate(1, "B.java", 2, 1, 20, 20, 0, 0, date(2021, 1, 5), date(2021, 2, 1))]
+
+    assert authors == [AuthorAggregate("alice", 2, 3, 2, 30, 20, 5, date(2021, 1, 5), date(2021, 2, 1)),
+                       AuthorAggregate("bob", 1, 1, 1, 4, 2, 2, date(2021, 1, 20), date(2021, 1, 20))]
+
+    assert months == [MonthAggregate("2021-01", 2, 3, 2, 2, 34, 2, 10),
+                      MonthAggregate("2021-02", 1, 1, 1, 1, 0, 20, -3)]
+
+
+def test_aggregates_sampling_weights():
+    """
+    This unit test checks that the counts and sums are multiplied by the sampling weights.
+    """
+
+    aggregator = Aggregator()
+
+    aggregator.add(File(0, "A.java", "ADD", 5, 10, 0))
+    aggregator.add(SampledCommit("c1", "alice", date(2021, 1, 5), 1, 3.0))
+
+    files, authors, months = [rows for _, rows, _ in aggregator.tables()]
+
+    assert files[0].NbModifications == 3 and files[0].NbLinesAdded == 30
+    assert authors[0].NbCommits == 3
+    assert months[0].NbAuthors == 1
@@ -0,0 +1,382 @@
+#    Copyright 2021 Nicolas Riquet
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
+This module contains the unit tests for the "analyzer" module.
+"""
+
+import pytest, os, random, time, analyzer
+from config import config_params
+from typing import Callable, List
+
+SOURCE_CODE_BEFORE = """public class Employee {
+    public int getAge() {
+        return age;
+    }
+
+    public String getName() {
+        return name;
+    }
+}
+"""
+
+SOURCE_CODE = """public class Employee {
+    public int getAge() {
+        return age; // TODO: compute from birth date
+    }
+
+    public String getName() {
+        return name;
+    }
+
+    public void setName(String name) {
+        this.name = name;
+    }
+}
+"""
+
+DIFF = """@@ -3 +3 @@ public class Employee {
+-        return age;
++        return age; // TODO: compute from birth date
+@@ -8,0 +9,4 @@ public class Employee {
++
++    public void setName(String name) {
++        this.name = name;
++    }"""
+
+
+@pytest.fixture
+def analyzer_tasks_fixture() -> List[analyzer.FileAnalysisTask]:
+    """
+    This test fixture builds a list of analysis tasks for the same Java file modification.
+    """
+
+    return [analyzer.FileAnalysisTask("Employee{}.java".format(i), SOURCE_CODE, SOURCE_CODE_BEFORE, DIFF) for i in range(8)]
+
+
+def test_analyzer_parse_diff():
+    """
+    This unit test checks that parse_diff returns the added and deleted lines with their line numbers.
+    """
+
+    diff_parsed = analyzer.parse_diff(DIFF)
+
+    assert diff_parsed["deleted"] == [(3, "        return age;")]
+    assert diff_parsed["added"][0] == (3, "        return age; // TODO: compute from birth date")
+    assert [line[0] for line in diff_parsed["added"]] == [3, 9, 10, 11, 12]
+
+
+def test_analyzer_analyze_file(analyzer_tasks_fixture: Callable[[None], List[analyzer.FileAnalysisTask]]):
+    """
+    This unit test checks that analyze_file returns the expected methods, changed methods, metrics and SATD.
+    """
+
+    result = analyzer.analyze_file(analyzer_tasks_fixture[0], config_params["SATD_keywords"])
+
+    assert result.error == ""
+    assert [method.name for method in result.methods] == ["Employee::getAge", "Employee::getName", "Employee::setName"]
+    assert result.nb_methods_changed == 2
+    assert result.complexity == 3
+    assert result.contains_SATD is True
+
+
+def test_analyzer_changed_methods():
+    """
+    This unit test checks that changed_methods returns the methods touched on either side of the diff, once each,
+    with their change type.
+    """
+
+    def method(name: str, start_line: int, end_line: int) -> analyzer.MethodMetrics:
+        return analyzer.MethodMetrics(name, name + "()", "Employee.java", [], end_line - start_line + 1, 1, start_line, end_line)
+
+    methods_before = [method("getAge", 1, 3), method("getName", 5, 7), method("getId", 9, 11)]
+    methods = [method("getAge", 1, 3), method("getName", 5, 8), method("setName", 10, 12)]
+    diff_parsed = {"added": [(6, "x"), (7, "y"), (11, "z")], "deleted": [(6, "w"), (10, "v")]}
+
+    changed_methods = analyzer.changed_methods(methods, methods_before, diff_parsed)
+
+    assert [(method.name, change_type) for method, change_type in changed_methods] == [("getName", "MODIFY"), ("setName", "ADD"),
+                                                                                         ("getId", "DELETE")]
+    assert changed_methods[0][0].end_line == 8
+
+
+def test_analyzer_changed_line_ranges():
+    """
+    This unit test checks that changed_line_ranges merges consecutive changed lines into sorted ranges.
+    """
+
+    lines = [(line_number, "") for line_number in [12, 3, 4, 5, 9, 11, 20]]
+
+    assert analyzer.changed_line_ranges(lines) == ([3, 9, 11, 20], [5, 9, 12, 20])
+    assert analyzer.changed_line_ranges([]) == ([], [])
+
+
+def test_analyzer_touched_methods():
+    """
+    This unit test checks that touched_methods finds the same methods as checking every changed line against every method,
+    including nested methods.
+    """
+
+    rng = random.Random(0)
+
+    for _ in range(200):
+        methods = []
+
+        for index in range(rng.randint(0, 15)):
+            start_line = rng.randint(1, 100)
+            methods.append(analyzer.MethodMetrics("m{}".format(index), "m{}()".format(index), "f.java", [], 1, 1,
+                                                  start_line, start_line + rng.randint(0, 20)))
+
+        lines = [(line_number, "") for line_number in sorted(rng.sample(range(1, 130), rng.randint(0, 30)))]
+
+        expected = [method for method in methods if any(method.start_line <= line[0] <= method.end_line for line in lines)]
+
+        assert analyzer.touched_methods(methods, lines) == expected
+
+
+def test_analyzer_analyze_file_unsupported():
+    """
+    This unit test checks that analyze_file returns no metrics when no source code is provided (unsupported files).
+    """
+
+    task = analyzer.FileAnalysisTask("logo.png", None, None, "")
+
+    result = analyzer.analyze_file(task, config_params["SATD_keywords"])
+
+    assert result == analyzer.FileAnalysisResult([], 0, None, None, False, "", "", [])
+
+
+def test_analyzer_pool_keeps_order(analyzer_tasks_fixture: Callable[[None], List[analyzer.FileAnalysisTask]]):
+    """
+    This unit test checks that a pool with several processes returns the same results, in the same order,
+    as the sequential analysis.
+    """
+
+    sequential_pool = analyzer.FileAnalysisPool(config_params["SATD_keywords"], 1)
+    parallel_pool = analyzer.FileAnalysisPool(config_params["SATD_keywords"], 2)
+
+    try:
+        assert parallel_pool.map(analyzer_tasks_fixture) == sequential_pool.map(analyzer_tasks_fixture)
+    finally:
+        parallel_pool.close()
+
+
+def test_analyzer_exceeds_budget(analyzer_tasks_fixture: Callable[[None], List[analyzer.FileAnalysisTask]]):
+    """
+    This unit test checks that exceeds_budget reports files that are too large or contain overly long lines.
+    """
+
+    task = analyzer_tasks_fixture[0]
+    minified_task = analyzer.FileAnalysisTask("app.min.js", "var a=1;" * 1000, None, "")
+
+    assert analyzer.exceeds_budget(task, 0, 0) is None
+    assert analyzer.exceeds_budget(task, 10000, 100) is None
+    assert analyzer.exceeds_budget(task, 100, 0).startswith("File too large")
+    assert analyzer.exceeds_budget(minified_task, 0, 100).startswith("Line too long")
+
+
+def test_analyzer_pool_timeout(analyzer_tasks_fixture: Callable[[None], List[analyzer.FileAnalysisTask]]):
+    """
+    This unit test checks that a file whose analysis takes too long is reported as an error while the other files
+    are still analyzed.
+    """
+
+    slow_task = analyzer.FileAnalysisTask("slow.c", "int f(){return 1;}\n" * 100000, None, "")
+    tasks = [analyzer_tasks_fixture[0], slow_task, analyzer_tasks_fixture[1]]
+
+    pool = analyzer.FileAnalysisPool(config_params["SATD_keywords"], 1, timeout = 1)
+
+    try:
+        results = pool.map(tasks)
+    finally:
+        pool.close()
+
+    assert results[0].error == ""
+    assert results[1].error.startswith("Analysis timeout")
+    assert results[2].error == ""
+    assert len(results[2].methods) == 3
+
+
+def _crashing_analyze_file(task: analyzer.FileAnalysisTask, SATD_keywords: List[str]) -> analyzer.FileAnalysisResult:
+    """
+    Analysis function killing its process when it analyzes the file "crash.c".
+    """
+
+    if task.filename == "crash.c":
+        os._exit(1)
+
+    return _analyze_file(task, SATD_keywords)
+
+
+_analyze_file = analyzer.analyze_file
+
+
+@pytest.mark.parametrize("timeout", [0, 30])
+def test_analyzer_pool_crash(analyzer_tasks_fixture: Callable[[None], List[analyzer.FileAnalysisTask]], monkeypatch, timeout):
+    """
+    This unit test checks that a file whose analysis kills its worker process is reported as an error while the other
+    files are still analyzed, with and without timeout.
+    """
+
+    monkeypatch.setattr("analyzer.analyze_file", _crashing_analyze_file)
+
+    crash_task = analyzer.FileAnalysisTask("crash.c", "int f(){return 1;}\n", None, "")
+    tasks = [analyzer_tasks_fixture[0], crash_task, analyzer_tasks_fixture[1], analyzer_tasks_fixture[0]]
+
+    pool = analyzer.FileAnalysisPool(config_params["SATD_keywords"], 2, timeout = timeout)
+
+    try:
+        results = pool.map(tasks)
+        next_results = pool.map([analyzer_tasks_fixture[1]] * 2)
+    finally:
+        pool.close()
+
+    assert results[1].error == "Analysis process crashed"
+    assert [result.error for result in results[:1] + results[2:] + next_results] == [""] * 5
+    assert len(results[2].methods) == 3
+
+
+def _sleeping_analyze_file(task: analyzer.FileAnalysisTask, SATD_keywords: List[str]) -> analyzer.FileAnalysisResult:
+    """
+    Analysis function sleeping before analyzing the files whose name starts with "sleep", for the number of tenths of a
+    second that follows (e.g. 7 tenths for "sleep7.c").
+    """
+
+    if task.filename.startswith("sleep"):
+        time.sleep(int(task.filename[len("sleep"):-len(".c")]) / 10)
+
+    return _analyze_file(task, SATD_keywords)
+
+
+def test_analyzer_pool_timeout_per_task(analyzer_tasks_fixture: Callable[[None], List[analyzer.FileAnalysisTask]], monkeypatch):
+    """
+    This unit test checks that the timeout of a file is counted from the moment a worker process starts analyzing it:
+    files waiting behind slow files are not killed, even when all of them take longer than the timeout.
+    """
+
+    monkeypatch.setattr("analyzer.analyze_file", _sleeping_analyze_file)
+
+    slow_tasks = [analyzer.FileAnalysisTask("sleep7.c", "int f(){return 1;}\n", None, "")] * 4
+    hanging_task = analyzer.FileAnalysisTask("sleep300.c", "int f(){return 1;}\n", None, "")
+
+    pool = analyzer.FileAnalysisPool(config_params["SATD_keywords"], 1, timeout = 2)
+
+    try:
+        start_time = time.monotonic()
+        results = pool.map(slow_tasks + [hanging_task] + analyzer_tasks_fixture)
+    finally:
+        pool.close()
+
+    assert [result.error for result in results[:4]] == [""] * 4
+    assert results[4].error.startswith("Analysis timeout")
+    assert [result.error for result in results[5:]] == [""] * len(analyzer_tasks_fixture)
+    assert time.monotonic() - start_time < 20
+
+
+def test_analyzer_pool_worker_pids(analyzer_tasks_fixture: Callable[[None], List[analyzer.FileAnalysisTask]]):
+    """
+    This unit test checks that the worker processes report their PIDs when they start (the crash of a worker process is
+    checked by test_analyzer_pool_crash).
+    """
+
+    import multiprocessing as mp
+
+    pool = analyzer.FileAnalysisPool(config_params["SATD_keywords"], 2)
+
+    try:
+        pool.map(analyzer_tasks_fixture * 2)
+
+        deadline = time.monotonic() + 10
+
+        while not pool._worker_crashed() and len(pool._worker_pids) < 2 and time.monotonic() < deadline:
+            time.sleep(0.1)
+
+        assert not pool._worker_crashed()
+        assert len(pool._worker_pids) == 2 and pool._worker_pids <= {child.pid for child in mp.active_children()}
+    finally:
+        pool.close()
+
+
+def test_analyzer_analyze_file_reuses_parsed_revisions(analyzer_tasks_fixture: Callable[[None], List[analyzer.FileAnalysisTask]]):
+    """
+    This unit test checks that analyze_file gives the same results when the revisions have already been parsed
+    and their source code is not provided.
+    """
+
+    task = analyzer_tasks_fixture[0]
+
+    parsed = analyzer._analyze_methods(task.filename, task.source_code)
+    parsed_before = analyzer._analyze_methods(task.filename, task.source_code_before)
+
+    reused_task = analyzer.FileAnalysisTask(task.filename, None, None, task.diff, parsed, parsed_before)
+
+    assert analyzer.analyze_file(reused_task, config_params["SATD_keywords"]) == analyzer.analyze_file(task, config_params["SATD_keywords"])
+
+
+def test_analyzer_parsed_revisions():
+    """
+    This unit test checks that ParsedRevisions only returns a parsed revision for the same path, file name and blob SHA,
+    and follows renames and deletions.
+    """
+
+    parsed = analyzer.ParsedSource([], 10, 2)
+    parsed_revisions = analyzer.ParsedRevisions()
+
+    parsed_revisions.update(None, "src/Employee.java", "Employee.java", "sha1", parsed)
+
+    assert parsed_revisions.get("src/Employee.java", "Employee.java", "sha1") == parsed
+    assert parsed_revisions.get("src/Employee.java", "Employee.java", "sha2") is None
+    assert parsed_revisions.get("src/Employee.java", "Employee.cpp", "sha1") is None
+
+    parsed_revisions.update("src/Employee.java", "src/Person.java", "Person.java", "sha1", parsed)
+
+    assert parsed_revisions.get("src/Employee.java", "Employee.java", "sha1") is None
+    assert parsed_revisions.get("src/Person.java", "Person.java", "sha1") == parsed
+
+    parsed_revisions.update("src/Person.java", None, "Person.java", None, None)
+
+    assert parsed_revisions.get("src/Person.java", "Person.java", "sha1") is None
+
+
+def test_analyzer_is_skipped_early():
+    """
+    This unit test checks that is_skipped_early skips the binary files, the generated files and the unsupported files
+    whose diff is too large, without looking at their content.
+    """
+
+    diff = b"@@ -1 +1 @@\n-a\n+b\n"
+
+    assert not analyzer.is_skipped_early(diff, True, False, 10)
+    assert analyzer.is_skipped_early(b"Binary files a/logo.png and b/logo.png differ\n", False, False, 0)
+    assert analyzer.is_skipped_early(diff, True, True, 0)
+    assert analyzer.is_skipped_early(diff, False, False, 10)
+    assert not analyzer.is_skipped_early(diff, False, False, 0)
+    assert not analyzer.is_skipped_early(diff, False, False, 1000)
+
+
+def test_analyzer_diff_line_counts():
+    """
+    This unit test checks that diff_line_counts counts the added and deleted lines like PyDriller.
+    """
+
+    from pydriller.domain.commit import ModifiedFile
+
+    class Diff:
+        a_path, b_path, new_file, deleted_file, renamed_file = "f.txt", "f.txt", False, False, False
+        diff = b"@@ -1,3 +1,4 @@\n-a\n+b\r\n c\n+++x\n---y\n+\n-"
+
+    file = ModifiedFile(Diff())
+
+    assert analyzer.diff_line_counts(Diff.diff) == (file.added_lines, file.deleted_lines) == (3, 3)
+    assert analyzer.diff_line_counts(b"") == (0, 0)
@@ -0,0 +1,86 @@
+#    Copyright 2021 Nicolas Riquet
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
+This module contains the unit tests for the "authors" module.
+"""
+
+import pytest, os, authors
+from typing import Tuple
+
+# Canonical identities of a fake .mailmap file.
+MAILMAP = {("Jane D.", "jane@old-company.com"): ("Jane Doe", "jane@example.com")}
+
+
+def _fake_mailmap(name: str, email: str) -> Tuple[str, str]:
+    """
+    Mailmap function using the fake .mailmap file.
+    """
+
+    return MAILMAP.get((name, email), (name, email))
+
+
+def test_authors_dictionary_uses_mailmap():
+    """
+    This unit test checks that identities mapped to the same canonical identity get the same identifier.
+    """
+
+    author_dictionary = authors.AuthorDictionary(_fake_mailmap)
+
+    assert author_dictionary.get_id("Jane Doe", "jane@example.com") == 0
+    assert author_dictionary.get_id("John Smith", "john@example.com") == 1
+    assert author_dictionary.get_id("Jane D.", "jane@old-company.com") == 0
+    assert len(author_dictionary) == 2
+
+
+def test_authors_dictionary_merge_by_email():
+    """
+    This unit test checks that authors sharing an email address are only merged when merge_by_email is set.
+    """
+
+    author_dictionary = authors.AuthorDictionary()
+
+    assert author_dictionary.get_id("jdoe", "Jane@example.com") != author_dictionary.get_id("Jane Doe", "jane@example.com")
+
+    author_dictionary = authors.AuthorDictionary(merge_by_email = True)
+
+    assert author_dictionary.get_id("jdoe", "Jane@example.com") == author_dictionary.get_id("Jane Doe", "jane@example.com")
+
+
+def test_authors_dictionary_pop_new_authors():
+    """
+    This unit test checks that pop_new_authors only returns the authors created since the previous call.
+    """
+
+    author_dictionary = authors.AuthorDictionary(_fake_mailmap)
+
+    author_dictionary.get_id("Jane D.", "jane@old-company.com")
+
+    assert author_dictionary.pop_new_authors() == [(0, "Jane Doe", "jane@example.com")]
+
+    author_dictionary.get_id("Jane Doe", "jane@example.com")
+
+    assert author_dictionary.pop_new_authors() == []
+
+
+def test_authors_git_mailmap():
+    """
+    This unit test checks that git_mailmap returns the identity unchanged when the repository has no .mailmap entry for it.
+    """
+
+    repo_path = os.path.dirname(__file__) + "/test_repos/small_repo"
+
+    check_mailmap = authors.git_mailmap(repo_path)
+
+    assert check_mailmap("ishepard", "spadini.davide@gmail.com") == ("ishepard", "spadini.davide@gmail.com")
@@ -0,0 +1,197 @@
+#    Copyright 2021 Nicolas Riquet
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
+This module contains the unit tests for the "backends" module. The tests of the pygit2 backend are skipped if pygit2
+is not installed.
+"""
+
+import pytest, os, itertools, subprocess, backends
+from delver import Delver
+from utilities import AnalysisMode, RepositoryBackend
+
+
+@pytest.fixture
+def backends_repo_path_fixture() -> str:
+    """
+    This test fixture returns the path to the small test repository.
+    """
+
+    current_dir = os.path.dirname(__file__)
+
+    return current_dir + "/test_repos/small_repo"
+
+
+@pytest.fixture
+def backends_edge_cases_repo_path_fixture(tmp_path) -> str:
+    """
+    This test fixture creates a repository with the modifications the backends must handle alike: empty, binary
+    and executable files, files without final newline, renames, deletions, CRLF line endings and a merge commit.
+    """
+
+    # Distinct dates, so that the order of the commits does not depend on how ties are broken.
+    dates = iter("2021-01-0{}T12:00:00+01:00".format(day) for day in range(1, 10))
+
+    def git(*args: str):
+        date = next(dates) if args[0] in ["commit", "merge"] else "2021-01-01T12:00:00+01:00"
+        env = dict(os.environ, GIT_AUTHOR_DATE = date, GIT_COMMITTER_DATE = date)
+        subprocess.run(["git", "-C", str(tmp_path), *args], check=True, capture_output=True, env=env)
+
+    git("init", "-b", "main", ".")
+    git("config", "user.email", "author@example.com")
+    git("config", "user.name", "Author")
+
+    tmp_path.joinpath("main.py").write_text("a\nb\nc\n")
+    tmp_path.joinpath("no_newline.py").write_text("x")
+    tmp_path.joinpath("binary.dat").write_bytes(bytes(range(256)))
+    tmp_path.joinpath("renamed.py").write_text("".join("{}\n".format(i) for i in range(50)))
+    tmp_path.joinpath("deleted.py").write_text("k\n")
+    tmp_path.joinpath("empty.py").write_text("")
+    tmp_path.joinpath("crlf.py").write_bytes(b"l1\r\nl2\r\n")
+    git("add", "-A")
+    git("commit", "-m", "Initial commit")
+
+    tmp_path.joinpath("main.py").write_text("a\nB\nc\nd\n")
+    tmp_path.joinpath("no_newline.py").write_text("y")
+    tmp_path.joinpath("binary.dat").write_bytes(bytes(reversed(range(256))))
+    tmp_path.joinpath("crlf.py").write_bytes(b"+++x\r\n--y\r\n")
+    tmp_path.joinpath("empty.py").write_text("z\n")
+    os.chmod(tmp_path.joinpath("main.py"), 0o755)
+    git("mv", "renamed.py", "renamed_to.py")
+    tmp_path.joinpath("renamed_to.py").write_text("".join("{}\n".format(i) for i in range(51)))
+    git("rm", "-q", "deleted.py")
+    git("add", "-A")
+    git("commit", "-m", "Fix all the files")
+
+    git("checkout", "-b", "feature")
+    tmp_path.joinpath("feature.py").write_text("def feature():\n    return 1\n")
+    git("add", "feature.py")
+    git("commit", "-m", "Add a feature")
+    git("checkout", "main")
+    git("merge", "--no-ff", "feature", "-m", "Merge the feature")
+
+    return str(tmp_path)
+
+
+def test_backends_open_repository(backends_repo_path_fixture: str):
+    """
+    This unit test checks that open_repository returns a PyDriller repository by default.
+    """
+
+    from pydriller import Repository
+
+    assert isinstance(backends.open_repository(backends_repo_path_fixture), Repository)
+    assert isinstance(backends.open_repository(backends_repo_path_fixture, RepositoryBackend.PYDRILLER), Repository)
+
+
+def test_backends_patch_body():
+    """
+    This unit test checks that _patch_body removes the header of a patch like GitPython does.
+    """
+
+    header = b"diff --git a/f.py b/f.py\nindex 1111111..2222222 100644\n--- a/f.py\n+++ b/f.py\n"
+
+    assert backends._patch_body(header + b"@@ -1 +1 @@\n-a\n+b\n") == b"@@ -1 +1 @@\n-a\n+b\n"
+    assert backends._patch_body(b"diff --git a/b.dat b/b.dat\nindex 1..2 100644\nBinary files a/b.dat and b/b.dat differ\n") == \
+           b"Binary files a/b.dat and b/b.dat differ\n"
+    assert backends._patch_body(b"diff --git a/f.py b/f.py\nold mode 100644\nnew mode 100755\n") == b""
+
+
+@pytest.mark.parametrize("analysis_mode", list(AnalysisMode))
+def test_backends_pygit2_identical_datasets(tmp_path_factory, backends_repo_path_fixture: str, backends_edge_cases_repo_path_fixture: str,
+                                            analysis_mode: AnalysisMode):
+    """
+    This unit test checks that the pygit2 backend produces the same datasets as the PyDriller backend.
+    """
+
+    pytest.importorskip("pygit2")
+
+    csv_output_folder_path = str(tmp_path_factory.mktemp("datasets"))
+
+    for repo_path in [backends_repo_path_fixture, backends_edge_cases_repo_path_fixture]:
+        datasets = {backend: Delver(repo_path, csv_output_folder_path, nb_commits_before_checkpoint = 0, analysis_mode = analysis_mode,
+                                    log = None, repository_backend = backend).run()
+                    for backend in RepositoryBackend}
+
+        for pydriller_dataset, pygit2_dataset in zip(datasets[RepositoryBackend.PYDRILLER], datasets[RepositoryBackend.PYGIT2]):
+            assert pydriller_dataset.name == pygit2_dataset.name
+
+            # The lists of branches are compared as sets, their order being arbitrary.
+            for dataset in [pydriller_dataset, pygit2_dataset]:
+                if "Branches" in dataset.dataframe.columns:
+                    dataset.dataframe["Branches"] = dataset.dataframe["Branches"].map(lambda branches: sorted(eval(branches)))
+
+                # When all the dates share an offset, Pandas types the column with their time zone object. GitPython creates
+                # a new one per commit and they do not compare equal, even between two PyDriller runs: the dates are
+                # compared as objects instead.
+                if "DateTime" in dataset.dataframe.columns:
+                    dataset.dataframe["DateTime"] = dataset.dataframe["DateTime"].astype(object)
+
+            assert pydriller_dataset.dataframe.equals(pygit2_dataset.dataframe)
+
+
+def test_backends_pygit2_commits(backends_edge_cases_repo_path_fixture: str):
+    """
+    This unit test checks that the commits and modified files of the pygit2 backend have the same attributes as the
+    PyDriller ones.
+    """
+
+    pytest.importorskip("pygit2")
+
+    pydriller_commits = backends.open_repository(backends_edge_cases_repo_path_fixture).traverse_commits()
+    pygit2_commits = backends.open_repository(backends_edge_cases_repo_path_fixture, RepositoryBackend.PYGIT2).traverse_commits()
+
+    # The PyDriller commits are compared while the traversal runs: their stats and files are read from Git on demand,
+    # which is no longer possible once the traversal is over.
+    for pydriller_commit, pygit2_commit in itertools.zip_longest(pydriller_commits, pygit2_commits):
+        assert pydriller_commit is not None and pygit2_commit is not None
+        assert pydriller_commit.hash == pygit2_commit.hash
+
+        for attribute in ["msg", "author_date", "parents", "merge", "branches", "insertions", "deletions", "lines", "files"]:
+            assert getattr(pydriller_commit, attribute) == getattr(pygit2_commit, attribute)
+
+        assert pydriller_commit.author.name == pygit2_commit.author.name
+
+        assert len(pydriller_commit.modified_files) == len(pygit2_commit.modified_files)
+
+        for pydriller_file, pygit2_file in zip(pydriller_commit.modified_files, pygit2_commit.modified_files):
+            for attribute in ["old_path", "new_path", "filename", "change_type", "diff", "added_lines", "deleted_lines",
+                              "content", "content_before", "language_supported"]:
+                assert getattr(pydriller_file, attribute) == getattr(pygit2_file, attribute)
+
+
+@pytest.mark.parametrize("first_parent, skip_merges", [(False, True), (True, False), (True, True)])
+def test_backends_traversal_options(backends_edge_cases_repo_path_fixture: str, first_parent: bool, skip_merges: bool):
+    """
+    This unit test checks that the backends traverse the commits listed by "git rev-list" with the corresponding options.
+    """
+
+    args = ["git", "-C", backends_edge_cases_repo_path_fixture, "rev-list", "--reverse", "HEAD"]
+    args += ["--first-parent"] if first_parent else []
+    args += ["--no-merges"] if skip_merges else []
+
+    expected_hashes = subprocess.run(args, check=True, capture_output=True, text=True).stdout.split()
+
+    backends_to_check = [RepositoryBackend.PYDRILLER]
+
+    try:
+        import pygit2
+        backends_to_check.append(RepositoryBackend.PYGIT2)
+    except ImportError:
+        pass
+
+    for backend in backends_to_check:
+        repository = backends.open_repository(backends_edge_cases_repo_path_fixture, backend, first_parent, skip_merges)
+
+        assert [commit.hash for commit in repository.traverse_commits()] == expected_hashes
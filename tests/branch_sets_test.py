@@ -0,0 +1,49 @@
+#    Copyright 2021 Nicolas Riquet
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
+This module contains the unit tests for the "branch_sets" module.
+"""
+
+import pytest
+from branch_sets import BranchSetDictionary, branch_filter
+
+
+def test_branch_sets_filter():
+    """
+    This unit test checks that branch_filter keeps the branches matching one of the glob patterns.
+    """
+
+    branches = ["main", "master", "release/1.0", "release/2.0", "feature/login"]
+
+    assert branch_filter("main|release/*")(branches) == frozenset(["main", "release/1.0", "release/2.0"])
+    assert branch_filter("")(branches) == frozenset(branches)
+    assert branch_filter("develop")(branches) == frozenset()
+
+
+def test_branch_sets_dictionary():
+    """
+    This unit test checks that equal sets of branches get the same identifier and that pop_new_branch_sets only returns
+    the sets created since the previous call.
+    """
+
+    branch_sets = BranchSetDictionary()
+
+    assert branch_sets.get_id(frozenset(["main", "release/1.0"])) == 0
+    assert branch_sets.get_id(frozenset(["release/1.0", "main"])) == 0
+    assert branch_sets.get_id(frozenset()) == 1
+
+    assert branch_sets.pop_new_branch_sets() == [(0, "main\nrelease/1.0", 2), (1, "", 0)]
+    assert branch_sets.pop_new_branch_sets() == []
+    assert len(branch_sets) == 2
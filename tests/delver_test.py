@@ -24,10 +24,10 @@ Example structure: gitdelver/tests/test_repos/small_repo.
 """
 
 import pytest, os
-from delver import Delver
+from delver import Delver, CommitRecord, FileRecord, MethodRecord, denormalize
 import pandas as pd
 from typing import Callable, List
-import utilities
+import utilities, facts
 
 
 @pytest.fixture
@@ -123,7 +123,7 @@ def test_delver_run_files_dataset_shape(delver_COMMITS_FILES_METHODS_fixture: Ca
     
     test_pass = False
     
-    if (datasets[1].dataframe.shape == (6, 24)):
+    if (datasets[1].dataframe.shape == (6, 25)):
         test_pass = True
     
     assert test_pass is True
@@ -138,7 +138,623 @@ def test_delver_run_methods_dataset_shape(delver_COMMITS_FILES_METHODS_fixture:
     
     test_pass = False
     
-    if (datasets[2].dataframe.shape == (70, 16)):
+    if (datasets[2].dataframe.shape == (70, 17)):
         test_pass = True
     
-    assert test_pass is True
\ No newline at end of file
+    assert test_pass is True
+
+def test_delver_run_parallel_analysis_same_datasets(delver_COMMITS_FILES_METHODS_fixture: Callable[[None], List[pd.DataFrame]]):
+    """
+    This unit test checks that analyzing the files of the commits with several processes produces the same datasets
+    as the sequential analysis.
+    """
+    
+    current_dir = os.path.dirname(__file__)
+    repo_path = current_dir + "/test_repos/small_repo"
+    
+    delver = Delver(repo_path, analysis_mode = utilities.AnalysisMode.COMMITS_FILES_METHODS, nb_commits_before_checkpoint = 0,
+                    nb_analysis_processes = 2)
+    
+    datasets = delver.run()
+    
+    for dataset, expected_dataset in zip(datasets, delver_COMMITS_FILES_METHODS_fixture):
+        assert dataset.dataframe.equals(expected_dataset.dataframe)
+
+
+def test_delver_run_explicit_keywords():
+    """
+    This unit test checks that the keywords passed to Delver are used instead of the default ones from config.py.
+    """
+    
+    current_dir = os.path.dirname(__file__)
+    repo_path = current_dir + "/test_repos/small_repo"
+    
+    delver = Delver(repo_path, nb_commits_before_checkpoint = 0, SATD_keywords = [], bugfix_keywords = [])
+    
+    datasets = delver.run()
+    
+    assert not datasets[0].dataframe["BugFix"].any()
+    assert not datasets[0].dataframe["SATD"].any()
+    assert not datasets[1].dataframe["SATD"].any()
+
+
+
+def test_delver_iter_rows(delver_COMMITS_FILES_METHODS_fixture: Callable[[None], List[pd.DataFrame]]):
+    """
+    This unit test checks that iter_rows yields the same records as the datasets returned by run, each commit record
+    coming after the records of its files and methods.
+    """
+    
+    current_dir = os.path.dirname(__file__)
+    repo_path = current_dir + "/test_repos/small_repo"
+    
+    delver = Delver(repo_path, analysis_mode = utilities.AnalysisMode.COMMITS_FILES_METHODS, nb_commits_before_checkpoint = 0)
+    
+    records = list(delver.iter_rows())
+    
+    commits_records = [record for record in records if type(record) is CommitRecord]
+    files_records = [record for record in records if type(record) is FileRecord]
+    methods_records = [record for record in records if type(record) is MethodRecord]
+    
+    assert pd.DataFrame(commits_records).equals(delver_COMMITS_FILES_METHODS_fixture[0].dataframe)
+    assert pd.DataFrame(files_records).equals(delver_COMMITS_FILES_METHODS_fixture[1].dataframe)
+    assert pd.DataFrame(methods_records).equals(delver_COMMITS_FILES_METHODS_fixture[2].dataframe)
+    
+    assert type(records[-1]) is CommitRecord
+    
+    for index, record in enumerate(records):
+        if type(record) is not CommitRecord:
+            next_commit_record = next(r for r in records[index:] if type(r) is CommitRecord)
+            assert record.CommitId == next_commit_record.CommitId
+
+
+
+def test_delver_run_normalized_output(delver_COMMITS_FILES_METHODS_fixture: Callable[[None], List[pd.DataFrame]]):
+    """
+    This unit test checks that the normalized output mode does not repeat the commit attributes in the files and methods
+    datasets, and that denormalize rebuilds the usual datasets.
+    """
+    
+    current_dir = os.path.dirname(__file__)
+    repo_path = current_dir + "/test_repos/small_repo"
+    
+    delver = Delver(repo_path, analysis_mode = utilities.AnalysisMode.COMMITS_FILES_METHODS, nb_commits_before_checkpoint = 0,
+                    normalized_output = True)
+    
+    datasets = delver.run()
+    
+    assert datasets[0].dataframe.shape == (5, 19)
+    assert datasets[1].dataframe.shape == (6, 18)
+    assert datasets[2].dataframe.shape == (70, 10)
+    
+    for dataset, expected_dataset in zip(denormalize(datasets), delver_COMMITS_FILES_METHODS_fixture):
+        assert dataset.dataframe.equals(expected_dataset.dataframe)
+
+
+def test_delver_run_author_ids(delver_COMMITS_FILES_fixture: Callable[[None], List[pd.DataFrame]]):
+    """
+    This unit test checks that, when author IDs are enabled, the Author column contains integer identifiers described
+    in the authors dataset.
+    """
+    
+    current_dir = os.path.dirname(__file__)
+    repo_path = current_dir + "/test_repos/small_repo"
+    
+    delver = Delver(repo_path, analysis_mode = utilities.AnalysisMode.COMMITS_FILES, nb_commits_before_checkpoint = 0,
+                    author_ids = True)
+    
+    datasets = delver.run()
+    
+    assert [dataset.name for dataset in datasets] == ["commits_history", "files_history", "authors"]
+    
+    authors = datasets[2].dataframe
+    
+    assert authors.shape == (1, 3)
+    assert authors["Name"][0] == "ishepard"
+    assert set(datasets[0].dataframe["Author"]) == {0}
+    assert set(datasets[1].dataframe["Author"]) == {0}
+    
+    names = datasets[0].dataframe["Author"].map(authors.set_index("AuthorId")["Name"])
+    
+    assert names.equals(delver_COMMITS_FILES_fixture[0].dataframe["Author"])
+
+
+def test_delver_run_sampling(delver_COMMITS_FILES_fixture: Callable[[None], List[pd.DataFrame]]):
+    """
+    This unit test checks that the sampling mode only analyzes the sampled commits and adds their sampling weight.
+    """
+    
+    current_dir = os.path.dirname(__file__)
+    repo_path = current_dir + "/test_repos/small_repo"
+    
+    delver = Delver(repo_path, analysis_mode = utilities.AnalysisMode.COMMITS_FILES, nb_commits_before_checkpoint = 0,
+                    sampling_mode = utilities.SamplingMode.EVERY_NTH_COMMIT, sampling_size = 2)
+    
+    datasets = delver.run()
+    
+    commits = datasets[0].dataframe
+    expected_commits = delver_COMMITS_FILES_fixture[0].dataframe
+    
+    assert list(commits["CommitId"]) == list(expected_commits["CommitId"][::2])
+    assert list(commits["SamplingWeight"]) == [2, 2, 2]
+    assert datasets[1].dataframe.columns[-1] == "SamplingWeight"
+    assert set(datasets[1].dataframe["CommitId"]) <= set(commits["CommitId"])
+
+
+def test_delver_run_file_ids(delver_COMMITS_FILES_fixture: Callable[[None], List[pd.DataFrame]]):
+    """
+    This unit test checks that a renamed file keeps its FileId.
+    """
+    
+    files = delver_COMMITS_FILES_fixture[1].dataframe
+    
+    renamed_file = files[files["ChangeType"] == "RENAME"].iloc[0]
+    added_file = files[files["FilePath"] == renamed_file["OldFilePath"]].iloc[0]
+    
+    assert renamed_file["FileId"] == added_file["FileId"]
+    assert files.groupby("FileId")["FilePath"].nunique().max() == 2
+
+
+def test_delver_run_aggregates(delver_COMMITS_FILES_fixture: Callable[[None], List[pd.DataFrame]]):
+    """
+    This unit test checks that the aggregate datasets produced during the traversal match the rollups of the files dataset.
+    """
+    
+    current_dir = os.path.dirname(__file__)
+    repo_path = current_dir + "/test_repos/small_repo"
+    
+    delver = Delver(repo_path, analysis_mode = utilities.AnalysisMode.COMMITS_FILES, nb_commits_before_checkpoint = 0,
+                    aggregates = True)
+    
+    datasets = delver.run()
+    
+    assert [dataset.name for dataset in datasets[-3:]] == ["files_aggregates", "authors_aggregates", "months_aggregates"]
+    
+    files = delver_COMMITS_FILES_fixture[1].dataframe
+    files_aggregates = datasets[-3].dataframe.set_index("FileId")
+    
+    assert files_aggregates["NbLinesAdded"].equals(files.groupby("FileId")["NbLinesAdded"].sum())
+    assert files_aggregates["NbModifications"].equals(files.groupby("FileId").size())
+    assert datasets[-1].dataframe["NbCommits"].sum() == len(delver_COMMITS_FILES_fixture[0].dataframe)
+
+
+def test_delver_run_branch_set_ids():
+    """
+    This unit test checks that, when branch set IDs are enabled, the Branches column contains identifiers described
+    in the branch_sets dataset, and that the branch pattern limits the branches taken into account.
+    """
+    
+    current_dir = os.path.dirname(__file__)
+    repo_path = current_dir + "/test_repos/small_repo"
+    
+    delver = Delver(repo_path, analysis_mode = utilities.AnalysisMode.COMMITS_FILES, nb_commits_before_checkpoint = 0,
+                    branch_set_ids = True, branch_pattern = "master|release/*")
+    
+    datasets = delver.run()
+    
+    assert datasets[-1].name == "branch_sets"
+    assert list(datasets[-1].dataframe.itertuples(index=False, name=None)) == [(0, "master", 1)]
+    assert set(datasets[0].dataframe["Branches"]) == {0}
+    assert set(datasets[1].dataframe["NbBranches"]) == {1}
+
+
+def test_delver_run_changed_methods(delver_COMMITS_FILES_METHODS_fixture: Callable[[None], List[pd.DataFrame]]):
+    """
+    This unit test checks that, when only the changed methods are produced, the methods dataset has one row per changed
+    method, and that their change types are produced on demand, also in normalized output mode.
+    """
+    
+    current_dir = os.path.dirname(__file__)
+    repo_path = current_dir + "/test_repos/small_repo"
+    
+    delver = Delver(repo_path, analysis_mode = utilities.AnalysisMode.COMMITS_FILES_METHODS, nb_commits_before_checkpoint = 0,
+                    methods_output = utilities.MethodsOutput.CHANGED_METHODS)
+    
+    datasets = delver.run()
+    
+    assert datasets[1].dataframe.equals(delver_COMMITS_FILES_METHODS_fixture[1].dataframe)
+    assert datasets[2].dataframe.shape == (datasets[1].dataframe["NbMethodsChanged"].sum(), 17)
+    assert datasets[2].dataframe.shape[0] < delver_COMMITS_FILES_METHODS_fixture[2].dataframe.shape[0]
+    
+    delver = Delver(repo_path, analysis_mode = utilities.AnalysisMode.COMMITS_FILES_METHODS, nb_commits_before_checkpoint = 0,
+                    methods_output = utilities.MethodsOutput.CHANGED_METHODS, method_change_types = True)
+    
+    datasets_with_change_types = delver.run()
+    methods = datasets_with_change_types[2].dataframe
+    
+    assert list(methods.columns).index("MethodChangeType") == list(methods.columns).index("Complexity") + 1
+    assert methods.drop(columns="MethodChangeType").equals(datasets[2].dataframe)
+    assert methods["MethodChangeType"].value_counts().to_dict() == {"ADD": 27, "DELETE": 1, "MODIFY": 1}
+    
+    delver = Delver(repo_path, analysis_mode = utilities.AnalysisMode.COMMITS_FILES_METHODS, nb_commits_before_checkpoint = 0,
+                    methods_output = utilities.MethodsOutput.CHANGED_METHODS, method_change_types = True, normalized_output = True)
+    
+    for dataset, expected_dataset in zip(denormalize(delver.run()), datasets_with_change_types):
+        assert dataset.dataframe.equals(expected_dataset.dataframe)
+
+
+def test_delver_run_snapshots(monkeypatch):
+    """
+    This unit test checks that, in snapshot mode, the delver produces the snapshots datasets of the matching tags and
+    branches, analyzing every unique file content only once.
+    """
+    
+    import analyzer
+    
+    current_dir = os.path.dirname(__file__)
+    repo_path = current_dir + "/test_repos/small_repo"
+    
+    analyzed_files = []
+    map_tasks = analyzer.FileAnalysisPool.map
+    
+    def counting_map(pool, tasks):
+        analyzed_files.extend(task.filename for task in tasks)
+        return map_tasks(pool, tasks)
+    
+    monkeypatch.setattr(analyzer.FileAnalysisPool, "map", counting_map)
+    
+    delver = Delver(repo_path, analysis_mode = utilities.AnalysisMode.COMMITS_FILES_METHODS, nb_commits_before_checkpoint = 0,
+                    snapshot_refs = "v*|master")
+    
+    datasets = delver.run()
+    
+    assert [dataset.name for dataset in datasets] == ["snapshots", "snapshots_files", "snapshots_methods"]
+    assert list(datasets[0].dataframe["Snapshot"]) == ["v1.4", "master"]
+    assert list(datasets[0].dataframe["NbFiles"]) == [2, 3]
+    assert datasets[1].dataframe.shape == (5, 12)
+    assert datasets[2].dataframe.shape == (52, 9)
+    
+    # file2.java did not change between the two snapshots: it is only analyzed once.
+    assert sorted(analyzed_files) == ["file1.java", "file2.java", "file3.java", "file4.java"]
+    
+    files = datasets[1].dataframe.set_index(["Snapshot", "FilePath"])
+    
+    assert files.loc[("v1.4", "file2.java")].equals(files.loc[("master", "file2.java")])
+    assert list(datasets[0].dataframe["NbMethods"]) == [files.loc["v1.4"]["NbMethods"].sum(), files.loc["master"]["NbMethods"].sum()]
+    
+    iterated_files = [record for record in Delver(repo_path, snapshot_refs = "v*|master").iter_snapshot_rows()
+                      if type(record).__name__ == "SnapshotFileRecord"]
+    
+    assert pd.DataFrame(iterated_files).equals(datasets[1].dataframe)
+    
+    # The generated files are listed without being analyzed.
+    analyzed_files.clear()
+    
+    datasets = Delver(repo_path, nb_commits_before_checkpoint = 0, snapshot_refs = "v*|master", generated_files = "file2.*").run()
+    
+    generated_files = datasets[1].dataframe[datasets[1].dataframe["FilePath"] == "file2.java"]
+    
+    assert "file2.java" not in analyzed_files
+    assert len(generated_files) == 2 and generated_files["NbMethods"].eq(0).all() and generated_files["NLOC"].isna().all()
+    
+    # The files of a snapshot are read and analyzed chunk by chunk, with the same results.
+    analyzed_chunks = []
+    
+    def chunk_map(pool, tasks):
+        analyzed_chunks.append(len(tasks))
+        return map_tasks(pool, tasks)
+    
+    monkeypatch.setattr(analyzer.FileAnalysisPool, "map", chunk_map)
+    monkeypatch.setattr("delver.SNAPSHOT_FILES_PER_PROCESS", 1)
+    
+    chunked_datasets = Delver(repo_path, analysis_mode = utilities.AnalysisMode.COMMITS_FILES_METHODS, nb_commits_before_checkpoint = 0,
+                              snapshot_refs = "v*|master").run()
+    
+    assert sum(analyzed_chunks) == 4 and max(analyzed_chunks) == 1
+    
+    for dataset, chunked_dataset in zip(delver.run(), chunked_datasets):
+        assert dataset.dataframe.equals(chunked_dataset.dataframe)
+
+
+def test_delver_run_first_parent_and_merge_commits(tmp_path):
+    """
+    This unit test checks that the first-parent traversal leaves out the commits of the merged branches, and that the merge
+    commits are summarized (a commit row without file rows) or skipped.
+    """
+    
+    import subprocess
+    
+    def git(*args: str):
+        subprocess.run(["git", "-C", str(tmp_path), "-c", "user.name=Author", "-c", "user.email=author@example.com", *args],
+                       check=True, capture_output=True)
+    
+    git("init", "-b", "main", ".")
+    tmp_path.joinpath("main.py").write_text("def main():\n    return 0\n")
+    git("add", "main.py")
+    git("commit", "-m", "Initial commit")
+    git("checkout", "-b", "feature")
+    
+    for i in range(3):
+        tmp_path.joinpath("feature.py").write_text("def feature():\n    return {}\n".format(i))
+        git("add", "feature.py")
+        git("commit", "-m", "Feature step {}".format(i))
+    
+    git("checkout", "main")
+    git("merge", "--no-ff", "feature", "-m", "Merge the feature")
+    
+    def commits_and_files(**kwargs):
+        datasets = Delver(str(tmp_path), str(tmp_path.parent), nb_commits_before_checkpoint = 0, log = None, **kwargs).run()
+        
+        return datasets[0].dataframe, datasets[1].dataframe
+    
+    commits, files = commits_and_files()
+    
+    assert list(commits["Merge"]) == [False, False, False, False, True]
+    assert list(commits["NbInsertions"])[-1] == 2
+    assert len(files) == 4
+    
+    commits, files = commits_and_files(first_parent = True)
+    
+    assert list(commits["Message"]) == ["Initial commit", "Merge the feature"]
+    assert list(commits["NbInsertions"]) == [2, 2]
+    assert list(files["FileName"]) == ["main.py"]
+    
+    commits, files = commits_and_files(merge_commits = utilities.MergeCommits.SKIP)
+    
+    assert not commits["Merge"].any()
+    assert len(commits) == 4
+    assert len(files) == 4
+    
+    commits, files = commits_and_files(first_parent = True, merge_commits = utilities.MergeCommits.SKIP)
+    
+    assert list(commits["Message"]) == ["Initial commit"]
+
+
+@pytest.mark.parametrize("analysis_mode", [utilities.AnalysisMode.COMMITS_FILES, utilities.AnalysisMode.COMMITS_FILES_METHODS])
+def test_delver_run_profiles(tmp_path, analysis_mode: utilities.AnalysisMode):
+    """
+    This unit test checks that each analysis profile produces, in a single traversal, the datasets of a separate run with
+    its keywords and keep_unsupported_files setting, suffixed with its name.
+    """
+    
+    current_dir = os.path.dirname(__file__)
+    repo_path = current_dir + "/test_repos/small_repo"
+    
+    profiles = [utilities.AnalysisProfile("default", ["#todo"], ["fix"], False),
+                utilities.AnalysisProfile("wide", ["serious"], ["ooops", "first"], True)]
+    
+    output_params = dict(analysis_mode = analysis_mode, nb_commits_before_checkpoint = 0, log = None, author_ids = True,
+                         branch_set_ids = True, aggregates = True)
+    
+    datasets = Delver(repo_path, str(tmp_path), profiles = profiles, **output_params).run()
+    
+    expected_datasets = []
+    
+    for profile in profiles:
+        (tmp_path / profile.name).mkdir()
+        
+        for dataset in Delver(repo_path, str(tmp_path / profile.name), SATD_keywords = profile.SATD_keywords,
+                              bugfix_keywords = profile.bugfix_keywords, keep_unsupported_files = profile.keep_unsupported_files,
+                              **output_params).run():
+            expected_datasets.append((dataset.name + "_" + profile.name, dataset.dataframe))
+    
+    assert sorted(dataset.name for dataset in datasets) == sorted(name for name, _ in expected_datasets)
+    
+    dataframes = {dataset.name: dataset.dataframe for dataset in datasets}
+    
+    for name, dataframe in expected_datasets:
+        assert dataframes[name].equals(dataframe)
+    
+    assert dataframes["files_history_wide"]["SATD"].any() and not dataframes["files_history_default"]["SATD"].any()
+    assert dataframes["commits_history_wide"]["BugFix"].sum() > dataframes["commits_history_default"]["BugFix"].sum()
+    assert os.path.exists(tmp_path / "small_repo_commits_history_wide.csv")
+
+
+def test_delver_run_git_slot(tmp_path, monkeypatch):
+    """
+    This unit test checks that the delver holds its git slot twice per commit (listing its branches, then diffing it and
+    reading its files), and never while the files are analyzed.
+    """
+    
+    import analyzer
+    
+    current_dir = os.path.dirname(__file__)
+    repo_path = current_dir + "/test_repos/small_repo"
+    
+    class GitSlot:
+        nb_entries = 0
+        held = False
+        
+        def __enter__(self):
+            GitSlot.nb_entries += 1
+            GitSlot.held = True
+        
+        def __exit__(self, exc_type, exc_value, traceback):
+            GitSlot.held = False
+    
+    analyze = analyzer.FileAnalysisPool.map
+    
+    def analyze_without_git_slot(self, tasks):
+        assert not GitSlot.held
+        return analyze(self, tasks)
+    
+    monkeypatch.setattr(analyzer.FileAnalysisPool, "map", analyze_without_git_slot)
+    
+    datasets = Delver(repo_path, str(tmp_path), nb_commits_before_checkpoint = 0, log = None, git_slot = GitSlot()).run()
+    
+    assert GitSlot.nb_entries == 2 * len(datasets[0].dataframe)
+
+
+def test_delver_run_profiles_normalized_output(tmp_path):
+    """
+    This unit test checks that denormalize rebuilds the usual datasets of every analysis profile in normalized output mode.
+    """
+    
+    current_dir = os.path.dirname(__file__)
+    repo_path = current_dir + "/test_repos/small_repo"
+    
+    profiles = [utilities.AnalysisProfile("default", ["#todo"], ["fix"], False),
+                utilities.AnalysisProfile("wide", ["serious"], ["ooops", "first"], True)]
+    
+    output_params = dict(analysis_mode = utilities.AnalysisMode.COMMITS_FILES_METHODS, nb_commits_before_checkpoint = 0,
+                         log = None, profiles = profiles)
+    
+    datasets = Delver(repo_path, str(tmp_path), **output_params).run()
+    
+    (tmp_path / "normalized").mkdir()
+    
+    normalized_datasets = Delver(repo_path, str(tmp_path / "normalized"), normalized_output = True, **output_params).run()
+    
+    assert "Author" not in normalized_datasets[1].dataframe.columns
+    
+    for dataset, expected_dataset in zip(denormalize(normalized_datasets), datasets):
+        assert dataset.name == expected_dataset.name
+        assert dataset.dataframe.equals(expected_dataset.dataframe)
+    
+    with pytest.raises(ValueError):
+        denormalize(normalized_datasets[1:3])
+
+
+def test_delver_run_generated_and_binary_files(tmp_path, monkeypatch):
+    """
+    This unit test checks that the binary files, the generated files and the unsupported files with a large diff get a row
+    with their line counts only, without being analyzed.
+    """
+    
+    import subprocess, analyzer
+    
+    def git(*args: str):
+        subprocess.run(["git", "-C", str(tmp_path), "-c", "user.name=Author", "-c", "user.email=author@example.com", *args],
+                       check=True, capture_output=True)
+    
+    git("init", "-b", "main", ".")
+    
+    for content in ["1", "2"]:
+        tmp_path.joinpath("main.py").write_text("def main():\n    # todo\n    return {}\n".format(content))
+        tmp_path.joinpath("app.min.js").write_text("function a(){{return {}}}\n".format(content))
+        tmp_path.joinpath("package-lock.json").write_text("{{\"version\": \"{}\"}}\n// todo\n".format(content))
+        tmp_path.joinpath("data.csv").write_text("".join("{},{}\n".format(i, content) for i in range(200)))
+        tmp_path.joinpath("logo.png").write_bytes(bytes(range(256)) + content.encode())
+        git("add", "-A")
+        git("commit", "-m", "Commit {}".format(content))
+    
+    analyzed_file_names = []
+    analyze_file = analyzer.analyze_file
+    
+    def recording_analyze_file(task, SATD_keywords):
+        analyzed_file_names.append(task.filename)
+        
+        return analyze_file(task, SATD_keywords)
+    
+    monkeypatch.setattr("analyzer.analyze_file", recording_analyze_file)
+    
+    def files(**kwargs):
+        datasets = Delver(str(tmp_path), str(tmp_path.parent), keep_unsupported_files = True, nb_commits_before_checkpoint = 0,
+                          log = None, SATD_keywords = ["#todo", "//todo"], **kwargs).run()
+        
+        return datasets[1].dataframe.set_index(["CommitId", "FilePath"]).sort_index()
+    
+    analyzed_files = files()
+    
+    assert sorted(set(analyzed_file_names)) == ["app.min.js", "data.csv", "main.py", "package-lock.json"]
+    
+    # The size limit of the analyzed source code does not apply to the raw diffs of the unsupported files.
+    analyzed_file_names.clear()
+    files(max_analyzed_file_size = 1000)
+    
+    assert "data.csv" in analyzed_file_names
+    
+    # The diffs of the skipped files are not decoded, even to store their raw facts.
+    from pydriller.domain.commit import ModifiedFile
+    
+    decoded_file_names = []
+    decode_diff = ModifiedFile.diff.fget
+    
+    monkeypatch.setattr(ModifiedFile, "diff", property(lambda file: decoded_file_names.append(file.filename) or decode_diff(file)))
+    
+    analyzed_file_names.clear()
+    
+    skipped_files = files(generated_files = "*.min.js|package-lock.json", max_unsupported_diff_size = 1000, facts_store = True)
+    
+    assert set(analyzed_file_names) == {"main.py"}
+    assert set(decoded_file_names) == {"main.py"}
+    
+    replayed_datasets = Delver("", str(tmp_path.parent), keep_unsupported_files = True, nb_commits_before_checkpoint = 0, log = None,
+                               SATD_keywords = ["#todo", "//todo"], facts_path = facts.facts_store_path(str(tmp_path.parent), tmp_path.name)).run()
+    
+    replayed_files = replayed_datasets[1].dataframe.set_index(["CommitId", "FilePath"]).sort_index()
+    assert replayed_files.drop(columns = "DateTime").equals(skipped_files.drop(columns = "DateTime"))
+    
+    assert skipped_files[["NbLinesAdded", "NbLinesDeleted"]].equals(analyzed_files[["NbLinesAdded", "NbLinesDeleted"]])
+    assert skipped_files["SATD"].groupby(level="FilePath").any().to_dict() == \
+           {"app.min.js": False, "data.csv": False, "logo.png": False, "main.py": True, "package-lock.json": False}
+    assert analyzed_files["SATD"].sum() > skipped_files["SATD"].sum()
+    assert skipped_files.xs("app.min.js", level="FilePath")["NbMethods"].eq(0).all()
+
+
+def test_delver_run_memory_watchdog(tmp_path):
+    """
+    This unit test checks that the CSV files are the same when the memory watchdog saves the data to disk and restarts the
+    file analysis processes, which are also recycled every two commits, and that the watchdog does not report the delver
+    after every commit.
+    """
+    
+    current_dir = os.path.dirname(__file__)
+    repo_path = current_dir + "/test_repos/small_repo"
+    messages = []
+    
+    for folder, watch_params in [("normal", dict()), ("watched", dict(max_worker_memory = 1, worker_max_commits = 2))]:
+        (tmp_path / folder).mkdir()
+        
+        Delver(repo_path, str(tmp_path / folder), analysis_mode = utilities.AnalysisMode.COMMITS_FILES_METHODS,
+               nb_commits_before_checkpoint = 50, log = lambda message, *args: messages.append(message),
+               nb_analysis_processes = 2, **watch_params).run()
+    
+    delver_messages = [message for message in messages if message.startswith("!!! The delver uses")]
+    
+    assert 1 <= len(delver_messages) < 5
+    assert all(message.endswith("saving the current data to disk...") for message in delver_messages)
+    assert any(message.startswith("!!! File analysis processes") for message in messages)
+    assert sorted(os.listdir(tmp_path / "normal")) == sorted(os.listdir(tmp_path / "watched"))
+    
+    for file_name in os.listdir(tmp_path / "normal"):
+        assert pd.read_csv(tmp_path / "normal" / file_name).equals(pd.read_csv(tmp_path / "watched" / file_name))
+
+
+def test_delver_run_memory_watchdog_without_checkpoint():
+    """
+    This unit test checks that without checkpoint, the memory watchdog does not ask for saving the data to disk and says so.
+    """
+    
+    current_dir = os.path.dirname(__file__)
+    messages = []
+    
+    delver = Delver(current_dir + "/test_repos/small_repo", nb_commits_before_checkpoint = 0,
+                    log = lambda message, *args: messages.append(message), max_worker_memory = 1)
+    
+    assert len(delver.run()[0].dataframe) == 5
+    assert not delver._flush_requested
+    assert any(message.endswith("cannot be saved to disk before the end of the analysis)...") for message in messages)
+
+
+def test_delver_run_derived_columns_same_as_iter_rows(tmp_path):
+    """
+    This unit test checks that the columns derived in batch by run() hold the same values as the ones of the records of
+    iter_rows, including ratios whose rounding is sensitive to the method used (89 / 40 = 2.225 rounds to 2.23).
+    """
+    
+    import subprocess
+    
+    def git(*args: str):
+        subprocess.run(["git", "-C", str(tmp_path), "-c", "user.name=Author", "-c", "user.email=author@example.com", *args],
+                       check=True, capture_output=True)
+    
+    git("init", "-b", "main", ".")
+    
+    # 40 methods of 2 lines and 9 module level lines: 89 NLOC.
+    tmp_path.joinpath("functions.py").write_text("".join("def f{0}():\n    return {0}\n".format(i) for i in range(40)) +
+                                                 "".join("X{} = 1\n".format(i) for i in range(9)))
+    tmp_path.joinpath("test_functions.py").write_text("def test_f():\n    return 1\n")
+    git("add", "-A")
+    git("commit", "-m", "Add functions")
+    
+    git("rm", "-q", "test_functions.py")
+    git("commit", "-m", "Remove the tests")
+    
+    datasets = Delver(str(tmp_path), csv_output_folder_path = str(tmp_path), nb_commits_before_checkpoint = 0, log = None).run()
+    
+    file_records = [record for record in Delver(str(tmp_path), log = None).iter_rows() if type(record) is FileRecord]
+    
+    assert datasets[1].dataframe.equals(pd.DataFrame(file_records, columns = FileRecord._fields))
+    assert 2.23 in list(datasets[1].dataframe["NlocDivByNbMethods"])
+    assert list(datasets[1].dataframe["ChangeType"]) == ["ADD", "ADD", "DELETE"]
@@ -0,0 +1,158 @@
+#    Copyright 2021 Nicolas Riquet
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
+This module contains the unit tests for the "facts" module.
+"""
+
+import pytest, os, gzip, json, facts
+from delver import Delver
+import utilities
+
+
+@pytest.fixture
+def facts_repo_path_fixture() -> str:
+    """
+    This test fixture returns the path to the small test repository.
+    """
+
+    current_dir = os.path.dirname(__file__)
+
+    return current_dir + "/test_repos/small_repo"
+
+
+def _assert_same_datasets(datasets, other_datasets):
+    """
+    Checks that two lists of datasets are identical.
+    """
+
+    assert [dataset.name for dataset in datasets] == [dataset.name for dataset in other_datasets]
+
+    for dataset, other_dataset in zip(datasets, other_datasets):
+        assert dataset.dataframe.equals(other_dataset.dataframe)
+
+
+@pytest.mark.parametrize("output_params", [dict(),
+                                           dict(author_ids = True, branch_set_ids = True, aggregates = True),
+                                           dict(methods_output = utilities.MethodsOutput.CHANGED_METHODS, method_change_types = True,
+                                                normalized_output = True)])
+def test_facts_reanalysis_same_datasets(facts_repo_path_fixture: str, tmp_path, output_params):
+    """
+    This unit test checks that re-analyzing the raw-facts store of a repository produces the same datasets as mining it.
+    """
+
+    datasets = Delver(facts_repo_path_fixture, str(tmp_path), analysis_mode = utilities.AnalysisMode.COMMITS_FILES_METHODS,
+                      nb_commits_before_checkpoint = 0, log = None, facts_store = True, **output_params).run()
+
+    facts_path = facts.facts_store_path(str(tmp_path), "small_repo")
+
+    assert os.path.exists(facts_path)
+    assert not os.path.exists(facts_path + ".tmp")
+
+    reanalyzed_datasets = Delver("", str(tmp_path), analysis_mode = utilities.AnalysisMode.COMMITS_FILES_METHODS,
+                                 nb_commits_before_checkpoint = 0, log = None, facts_path = facts_path, **output_params).run()
+
+    _assert_same_datasets(datasets, reanalyzed_datasets)
+
+
+def test_facts_reanalysis_new_keywords(facts_repo_path_fixture: str, tmp_path, monkeypatch):
+    """
+    This unit test checks that re-analyzing a raw-facts store with other keywords produces the same datasets as mining the
+    repository with these keywords, without running Lizard.
+    """
+
+    SATD_keywords, bugfix_keywords = ["serious"], ["ooops"]
+
+    Delver(facts_repo_path_fixture, str(tmp_path), nb_commits_before_checkpoint = 0, log = None, facts_store = True).run()
+
+    (tmp_path / "mined").mkdir()
+
+    datasets = Delver(facts_repo_path_fixture, str(tmp_path / "mined"), nb_commits_before_checkpoint = 0, log = None,
+                      SATD_keywords = SATD_keywords, bugfix_keywords = bugfix_keywords).run()
+
+    def no_lizard(*args):
+        raise AssertionError("Lizard must not run when re-analyzing a raw-facts store")
+
+    monkeypatch.setattr("analyzer._analyze_methods", no_lizard)
+
+    reanalyzed_datasets = Delver("", str(tmp_path), nb_commits_before_checkpoint = 0, log = None, SATD_keywords = SATD_keywords,
+                                 bugfix_keywords = bugfix_keywords, facts_path = facts.facts_store_path(str(tmp_path), "small_repo")).run()
+
+    _assert_same_datasets(datasets, reanalyzed_datasets)
+
+    assert datasets[0].dataframe["BugFix"].any() and datasets[1].dataframe["SATD"].any()
+
+
+def test_facts_sampling(facts_repo_path_fixture: str, tmp_path):
+    """
+    This unit test checks that the raw-facts store of a sampled traversal only holds the sampled commits and their weights.
+    """
+
+    datasets = Delver(facts_repo_path_fixture, str(tmp_path), nb_commits_before_checkpoint = 0, log = None, facts_store = True,
+                      sampling_mode = utilities.SamplingMode.EVERY_NTH_COMMIT, sampling_size = 2).run()
+
+    repository = facts.FactsRepository(facts.facts_store_path(str(tmp_path), "small_repo"))
+
+    assert repository.repository_name == "small_repo"
+    assert repository.sampling_mode == utilities.SamplingMode.EVERY_NTH_COMMIT
+    assert [(commit.hash, commit.sampling_weight) for commit in repository.traverse_commits()] == \
+           list(zip(datasets[0].dataframe["CommitId"], datasets[0].dataframe["SamplingWeight"]))
+
+
+def test_facts_incomplete_traversal(facts_repo_path_fixture: str, tmp_path):
+    """
+    This unit test checks that the raw-facts store of an interrupted traversal is discarded.
+    """
+
+    rows = Delver(facts_repo_path_fixture, str(tmp_path), log = None, facts_store = True).iter_rows()
+    next(rows)
+    rows.close()
+
+    assert os.listdir(tmp_path) == []
+
+
+def test_facts_unsupported_format(tmp_path):
+    """
+    This unit test checks that a raw-facts store written in another format is rejected.
+    """
+
+    facts_path = str(tmp_path / "repo_facts.jsonl.gz")
+
+    with gzip.open(facts_path, "wt", encoding="utf-8") as facts_file:
+        facts_file.write(json.dumps({"format": facts.FACTS_FORMAT_VERSION + 1}) + "\n")
+
+    with pytest.raises(ValueError):
+        facts.FactsRepository(facts_path)
+
+
+def test_facts_reanalysis_profiles(facts_repo_path_fixture: str, tmp_path):
+    """
+    This unit test checks that re-analyzing a raw-facts store with analysis profiles produces the same datasets as mining the
+    repository with these profiles.
+    """
+
+    profiles = [utilities.AnalysisProfile("default", ["#todo"], ["fix"], False),
+                utilities.AnalysisProfile("serious", ["serious"], ["ooops"], False)]
+
+    Delver(facts_repo_path_fixture, str(tmp_path), nb_commits_before_checkpoint = 0, log = None, facts_store = True).run()
+
+    (tmp_path / "mined").mkdir()
+
+    datasets = Delver(facts_repo_path_fixture, str(tmp_path / "mined"), nb_commits_before_checkpoint = 0, log = None,
+                      profiles = profiles).run()
+
+    reanalyzed_datasets = Delver("", str(tmp_path), nb_commits_before_checkpoint = 0, log = None, profiles = profiles,
+                                 facts_path = facts.facts_store_path(str(tmp_path), "small_repo")).run()
+
+    _assert_same_datasets(datasets, reanalyzed_datasets)
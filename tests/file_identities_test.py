@@ -0,0 +1,61 @@
+#    Copyright 2021 Nicolas Riquet
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
+This module contains the unit tests for the "file_identities" module.
+"""
+
+import pytest
+from file_identities import FileIdentities
+
+
+def test_file_identities_follow_renames():
+    """
+    This unit test checks that a renamed file keeps its identifier and that its old path is released.
+    """
+
+    file_identities = FileIdentities()
+
+    assert file_identities.get_id(None, "src/A.java") == 0
+    assert file_identities.get_id(None, "src/B.java") == 1
+    assert file_identities.get_id("src/A.java", "src/C.java") == 0
+    assert file_identities.get_id("src/C.java", "src/C.java") == 0
+    assert file_identities.get_id(None, "src/A.java") == 2
+
+
+def test_file_identities_copies_and_deletions():
+    """
+    This unit test checks that a copied file shares the identifier of its source, which keeps it, and that a deleted
+    file is removed from the table.
+    """
+
+    file_identities = FileIdentities()
+
+    file_identities.get_id(None, "src/A.java")
+
+    assert file_identities.get_id("src/A.java", "src/A2.java", is_copy = True) == 0
+    assert file_identities.get_id("src/A.java", "src/A.java") == 0
+    assert file_identities.get_id("src/A.java", None) == 0
+    assert file_identities.get_id("src/A.java", "src/A.java") == 1
+
+
+def test_file_identities_unknown_path():
+    """
+    This unit test checks that a file whose old path is unknown gets a new identifier.
+    """
+
+    file_identities = FileIdentities()
+
+    assert file_identities.get_id("src/A.java", "src/A.java") == 0
+    assert file_identities.get_id("src/A.java", "src/A.java") == 0
@@ -18,7 +18,7 @@ This module contains the unit tests for the "gitdelver" module.
 
 import pytest, gitdelver
 from typing import Callable, Dict
-from utilities import AnalysisMode
+from utilities import AnalysisMode, AnalysisProfile, MergeCommits, MethodsOutput, RepositoryBackend, RepositoryPreparation, SamplingMode
 from pathlib import Path
 
 @pytest.fixture
@@ -37,7 +37,39 @@ def gitdelver_config_params_fixture() -> Dict[str, str]:
     "verbose": True,
     "SATD_keywords": ["//todo", "#todo", "//fixme", "#fixme", "//tofix", "#tofix",
                      "//hack", "#hack", "//workaround", "#workaround"],
-    "bugfix_keywords": ["fix", "solve", "bug", "defect", "problem"]
+    "bugfix_keywords": ["fix", "solve", "bug", "defect", "problem"],
+    "nb_analysis_processes": 1,
+    "analysis_timeout": 60,
+    "max_analyzed_file_size": 1000000,
+    "max_analyzed_line_length": 5000,
+    "nb_git_processes": 4,
+    "normalized_output": False,
+    "author_ids": False,
+    "merge_authors_by_email": False,
+    "use_result_cache": True,
+    "sampling_mode": SamplingMode.ALL_COMMITS,
+    "sampling_size": 10,
+    "sampling_seed": 0,
+    "aggregates": False,
+    "branch_set_ids": False,
+    "branch_pattern": "",
+    "queue_folder_path": "",
+    "queue_lease_duration": 600,
+    "queue_max_attempts": 3,
+    "repository_backend": RepositoryBackend.PYDRILLER,
+    "methods_output": MethodsOutput.ALL_METHODS,
+    "method_change_types": False,
+    "snapshot_refs": "",
+    "first_parent": False,
+    "merge_commits": MergeCommits.SUMMARIZE,
+    "facts_store": False,
+    "profiles": [],
+    "generated_files": "",
+    "repository_preparation": RepositoryPreparation.NONE,
+    "prepare_copy": False,
+    "max_worker_memory": 0,
+    "worker_max_commits": 1000,
+    "max_unsupported_diff_size": 1000000
     }
     
     return config_params
@@ -152,6 +184,358 @@ def test_check_config_params_missing_bugfix_keywords(gitdelver_config_params_fix
         gitdelver._check_config_params(config_params)
 
 
+def test_check_config_params_missing_nb_analysis_processes(gitdelver_config_params_fixture: Callable[[None], Dict[str, str]]):
+    """
+    This unit test checks that _check_config_params raises a SystemExit exception when nb_analysis_processes is missing.
+    """
+    
+    config_params = gitdelver_config_params_fixture.pop("nb_analysis_processes", None)
+    
+    with pytest.raises(SystemExit):
+        gitdelver._check_config_params(config_params)
+
+
+def test_check_config_params_missing_analysis_timeout(gitdelver_config_params_fixture: Callable[[None], Dict[str, str]]):
+    """
+    This unit test checks that _check_config_params raises a SystemExit exception when analysis_timeout is missing.
+    """
+    
+    config_params = gitdelver_config_params_fixture.pop("analysis_timeout", None)
+    
+    with pytest.raises(SystemExit):
+        gitdelver._check_config_params(config_params)
+
+
+def test_check_config_params_missing_max_analyzed_file_size(gitdelver_config_params_fixture: Callable[[None], Dict[str, str]]):
+    """
+    This unit test checks that _check_config_params raises a SystemExit exception when max_analyzed_file_size is missing.
+    """
+    
+    config_params = gitdelver_config_params_fixture.pop("max_analyzed_file_size", None)
+    
+    with pytest.raises(SystemExit):
+        gitdelver._check_config_params(config_params)
+
+
+def test_check_config_params_missing_max_analyzed_line_length(gitdelver_config_params_fixture: Callable[[None], Dict[str, str]]):
+    """
+    This unit test checks that _check_config_params raises a SystemExit exception when max_analyzed_line_length is missing.
+    """
+    
+    config_params = gitdelver_config_params_fixture.pop("max_analyzed_line_length", None)
+    
+    with pytest.raises(SystemExit):
+        gitdelver._check_config_params(config_params)
+
+
+def test_check_config_params_missing_nb_git_processes(gitdelver_config_params_fixture: Callable[[None], Dict[str, str]]):
+    """
+    This unit test checks that _check_config_params raises a SystemExit exception when nb_git_processes is missing.
+    """
+    
+    config_params = gitdelver_config_params_fixture.pop("nb_git_processes", None)
+    
+    with pytest.raises(SystemExit):
+        gitdelver._check_config_params(config_params)
+
+
+def test_check_config_params_missing_normalized_output(gitdelver_config_params_fixture: Callable[[None], Dict[str, str]]):
+    """
+    This unit test checks that _check_config_params raises a SystemExit exception when normalized_output is missing.
+    """
+    
+    config_params = gitdelver_config_params_fixture.pop("normalized_output", None)
+    
+    with pytest.raises(SystemExit):
+        gitdelver._check_config_params(config_params)
+
+
+def test_check_config_params_missing_author_ids(gitdelver_config_params_fixture: Callable[[None], Dict[str, str]]):
+    """
+    This unit test checks that _check_config_params raises a SystemExit exception when author_ids is missing.
+    """
+    
+    config_params = gitdelver_config_params_fixture.pop("author_ids", None)
+    
+    with pytest.raises(SystemExit):
+        gitdelver._check_config_params(config_params)
+
+
+def test_check_config_params_missing_merge_authors_by_email(gitdelver_config_params_fixture: Callable[[None], Dict[str, str]]):
+    """
+    This unit test checks that _check_config_params raises a SystemExit exception when merge_authors_by_email is missing.
+    """
+    
+    config_params = gitdelver_config_params_fixture.pop("merge_authors_by_email", None)
+    
+    with pytest.raises(SystemExit):
+        gitdelver._check_config_params(config_params)
+
+
+def test_check_config_params_missing_use_result_cache(gitdelver_config_params_fixture: Callable[[None], Dict[str, str]]):
+    """
+    This unit test checks that _check_config_params raises a SystemExit exception when use_result_cache is missing.
+    """
+    
+    config_params = gitdelver_config_params_fixture.pop("use_result_cache", None)
+    
+    with pytest.raises(SystemExit):
+        gitdelver._check_config_params(config_params)
+
+
+def test_check_config_params_missing_sampling_mode(gitdelver_config_params_fixture: Callable[[None], Dict[str, str]]):
+    """
+    This unit test checks that _check_config_params raises a SystemExit exception when sampling_mode is missing.
+    """
+    
+    config_params = gitdelver_config_params_fixture.pop("sampling_mode", None)
+    
+    with pytest.raises(SystemExit):
+        gitdelver._check_config_params(config_params)
+
+
+def test_check_config_params_missing_sampling_size(gitdelver_config_params_fixture: Callable[[None], Dict[str, str]]):
+    """
+    This unit test checks that _check_config_params raises a SystemExit exception when sampling_size is missing.
+    """
+    
+    config_params = gitdelver_config_params_fixture.pop("sampling_size", None)
+    
+    with pytest.raises(SystemExit):
+        gitdelver._check_config_params(config_params)
+
+
+def test_check_config_params_missing_sampling_seed(gitdelver_config_params_fixture: Callable[[None], Dict[str, str]]):
+    """
+    This unit test checks that _check_config_params raises a SystemExit exception when sampling_seed is missing.
+    """
+    
+    config_params = gitdelver_config_params_fixture.pop("sampling_seed", None)
+    
+    with pytest.raises(SystemExit):
+        gitdelver._check_config_params(config_params)
+
+
+def test_check_config_params_missing_aggregates(gitdelver_config_params_fixture: Callable[[None], Dict[str, str]]):
+    """
+    This unit test checks that _check_config_params raises a SystemExit exception when aggregates is missing.
+    """
+    
+    config_params = gitdelver_config_params_fixture.pop("aggregates", None)
+    
+    with pytest.raises(SystemExit):
+        gitdelver._check_config_params(config_params)
+
+
+def test_check_config_params_missing_branch_set_ids(gitdelver_config_params_fixture: Callable[[None], Dict[str, str]]):
+    """
+    This unit test checks that _check_config_params raises a SystemExit exception when branch_set_ids is missing.
+    """
+    
+    config_params = gitdelver_config_params_fixture.pop("branch_set_ids", None)
+    
+    with pytest.raises(SystemExit):
+        gitdelver._check_config_params(config_params)
+
+
+def test_check_config_params_missing_branch_pattern(gitdelver_config_params_fixture: Callable[[None], Dict[str, str]]):
+    """
+    This unit test checks that _check_config_params raises a SystemExit exception when branch_pattern is missing.
+    """
+    
+    config_params = gitdelver_config_params_fixture.pop("branch_pattern", None)
+    
+    with pytest.raises(SystemExit):
+        gitdelver._check_config_params(config_params)
+
+
+def test_check_config_params_missing_queue_folder_path(gitdelver_config_params_fixture: Callable[[None], Dict[str, str]]):
+    """
+    This unit test checks that _check_config_params raises a SystemExit exception when queue_folder_path is missing.
+    """
+    
+    config_params = gitdelver_config_params_fixture.pop("queue_folder_path", None)
+    
+    with pytest.raises(SystemExit):
+        gitdelver._check_config_params(config_params)
+
+
+def test_check_config_params_missing_queue_lease_duration(gitdelver_config_params_fixture: Callable[[None], Dict[str, str]]):
+    """
+    This unit test checks that _check_config_params raises a SystemExit exception when queue_lease_duration is missing.
+    """
+    
+    config_params = gitdelver_config_params_fixture.pop("queue_lease_duration", None)
+    
+    with pytest.raises(SystemExit):
+        gitdelver._check_config_params(config_params)
+
+
+def test_check_config_params_missing_queue_max_attempts(gitdelver_config_params_fixture: Callable[[None], Dict[str, str]]):
+    """
+    This unit test checks that _check_config_params raises a SystemExit exception when queue_max_attempts is missing.
+    """
+    
+    config_params = gitdelver_config_params_fixture.pop("queue_max_attempts", None)
+    
+    with pytest.raises(SystemExit):
+        gitdelver._check_config_params(config_params)
+
+
+def test_check_config_params_missing_repository_backend(gitdelver_config_params_fixture: Callable[[None], Dict[str, str]]):
+    """
+    This unit test checks that _check_config_params raises a SystemExit exception when repository_backend is missing.
+    """
+    
+    config_params = gitdelver_config_params_fixture.pop("repository_backend", None)
+    
+    with pytest.raises(SystemExit):
+        gitdelver._check_config_params(config_params)
+
+
+def test_check_config_params_missing_methods_output(gitdelver_config_params_fixture: Callable[[None], Dict[str, str]]):
+    """
+    This unit test checks that _check_config_params raises a SystemExit exception when methods_output is missing.
+    """
+    
+    config_params = gitdelver_config_params_fixture.pop("methods_output", None)
+    
+    with pytest.raises(SystemExit):
+        gitdelver._check_config_params(config_params)
+
+
+def test_check_config_params_missing_method_change_types(gitdelver_config_params_fixture: Callable[[None], Dict[str, str]]):
+    """
+    This unit test checks that _check_config_params raises a SystemExit exception when method_change_types is missing.
+    """
+    
+    config_params = gitdelver_config_params_fixture.pop("method_change_types", None)
+    
+    with pytest.raises(SystemExit):
+        gitdelver._check_config_params(config_params)
+
+
+def test_check_config_params_missing_snapshot_refs(gitdelver_config_params_fixture: Callable[[None], Dict[str, str]]):
+    """
+    This unit test checks that _check_config_params raises a SystemExit exception when snapshot_refs is missing.
+    """
+    
+    config_params = gitdelver_config_params_fixture.pop("snapshot_refs", None)
+    
+    with pytest.raises(SystemExit):
+        gitdelver._check_config_params(config_params)
+
+
+def test_check_config_params_missing_first_parent(gitdelver_config_params_fixture: Callable[[None], Dict[str, str]]):
+    """
+    This unit test checks that _check_config_params raises a SystemExit exception when first_parent is missing.
+    """
+    
+    config_params = gitdelver_config_params_fixture.pop("first_parent", None)
+    
+    with pytest.raises(SystemExit):
+        gitdelver._check_config_params(config_params)
+
+
+def test_check_config_params_missing_merge_commits(gitdelver_config_params_fixture: Callable[[None], Dict[str, str]]):
+    """
+    This unit test checks that _check_config_params raises a SystemExit exception when merge_commits is missing.
+    """
+    
+    config_params = gitdelver_config_params_fixture.pop("merge_commits", None)
+    
+    with pytest.raises(SystemExit):
+        gitdelver._check_config_params(config_params)
+
+
+def test_check_config_params_missing_facts_store(gitdelver_config_params_fixture: Callable[[None], Dict[str, str]]):
+    """
+    This unit test checks that _check_config_params raises a SystemExit exception when facts_store is missing.
+    """
+    
+    config_params = gitdelver_config_params_fixture.pop("facts_store", None)
+    
+    with pytest.raises(SystemExit):
+        gitdelver._check_config_params(config_params)
+
+
+def test_check_config_params_missing_profiles(gitdelver_config_params_fixture: Callable[[None], Dict[str, str]]):
+    """
+    This unit test checks that _check_config_params raises a SystemExit exception when profiles is missing.
+    """
+    
+    config_params = gitdelver_config_params_fixture.pop("profiles", None)
+    
+    with pytest.raises(SystemExit):
+        gitdelver._check_config_params(config_params)
+
+
+def test_check_config_params_missing_generated_files(gitdelver_config_params_fixture: Callable[[None], Dict[str, str]]):
+    """
+    This unit test checks that _check_config_params raises a SystemExit exception when generated_files is missing.
+    """
+    
+    config_params = gitdelver_config_params_fixture.pop("generated_files", None)
+    
+    with pytest.raises(SystemExit):
+        gitdelver._check_config_params(config_params)
+
+
+def test_check_config_params_missing_repository_preparation(gitdelver_config_params_fixture: Callable[[None], Dict[str, str]]):
+    """
+    This unit test checks that _check_config_params raises a SystemExit exception when repository_preparation is missing.
+    """
+    
+    config_params = gitdelver_config_params_fixture.pop("repository_preparation", None)
+    
+    with pytest.raises(SystemExit):
+        gitdelver._check_config_params(config_params)
+
+
+def test_check_config_params_missing_prepare_copy(gitdelver_config_params_fixture: Callable[[None], Dict[str, str]]):
+    """
+    This unit test checks that _check_config_params raises a SystemExit exception when prepare_copy is missing.
+    """
+    
+    config_params = gitdelver_config_params_fixture.pop("prepare_copy", None)
+    
+    with pytest.raises(SystemExit):
+        gitdelver._check_config_params(config_params)
+
+
+def test_check_config_params_missing_max_worker_memory(gitdelver_config_params_fixture: Callable[[None], Dict[str, str]]):
+    """
+    This unit test checks that _check_config_params raises a SystemExit exception when max_worker_memory is missing.
+    """
+    
+    config_params = gitdelver_config_params_fixture.pop("max_worker_memory", None)
+    
+    with pytest.raises(SystemExit):
+        gitdelver._check_config_params(config_params)
+
+
+def test_check_config_params_missing_worker_max_commits(gitdelver_config_params_fixture: Callable[[None], Dict[str, str]]):
+    """
+    This unit test checks that _check_config_params raises a SystemExit exception when worker_max_commits is missing.
+    """
+    
+    config_params = gitdelver_config_params_fixture.pop("worker_max_commits", None)
+    
+    with pytest.raises(SystemExit):
+        gitdelver._check_config_params(config_params)
+
+
+def test_check_config_params_missing_max_unsupported_diff_size(gitdelver_config_params_fixture: Callable[[None], Dict[str, str]]):
+    """
+    This unit test checks that _check_config_params raises a SystemExit exception when max_unsupported_diff_size is missing.
+    """
+    
+    config_params = gitdelver_config_params_fixture.pop("max_unsupported_diff_size", None)
+    
+    with pytest.raises(SystemExit):
+        gitdelver._check_config_params(config_params)
+
+
 def test_check_config_params_empty_repo_path(gitdelver_config_params_fixture: Callable[[None], Dict[str, str]]):
     """
     This unit test checks that _check_config_params raises a SystemExit exception when repo_path is empty.
@@ -291,5 +675,464 @@ def test_check_config_params_bugfix_keywords_wrong_type(gitdelver_config_params_
     
     config_params["bugfix_keywords"] = [1, 2]
     
+    with pytest.raises(SystemExit):
+        gitdelver._check_config_params(config_params)
+        
+
+def test_check_config_params_nb_analysis_processes_wrong_type(gitdelver_config_params_fixture: Callable[[None], Dict[str, str]]):
+    """
+    This unit test checks that _check_config_params raises a SystemExit exception when nb_analysis_processes is of the wrong type.
+    """
+    
+    config_params = gitdelver_config_params_fixture
+    
+    config_params["nb_analysis_processes"] = "test"
+    
+    with pytest.raises(SystemExit):
+        gitdelver._check_config_params(config_params)
+        
+
+def test_check_config_params_analysis_timeout_wrong_type(gitdelver_config_params_fixture: Callable[[None], Dict[str, str]]):
+    """
+    This unit test checks that _check_config_params raises a SystemExit exception when analysis_timeout is of the wrong type.
+    """
+    
+    config_params = gitdelver_config_params_fixture
+    
+    config_params["analysis_timeout"] = "test"
+    
+    with pytest.raises(SystemExit):
+        gitdelver._check_config_params(config_params)
+        
+
+def test_check_config_params_max_analyzed_file_size_wrong_type(gitdelver_config_params_fixture: Callable[[None], Dict[str, str]]):
+    """
+    This unit test checks that _check_config_params raises a SystemExit exception when max_analyzed_file_size is of the wrong type.
+    """
+    
+    config_params = gitdelver_config_params_fixture
+    
+    config_params["max_analyzed_file_size"] = "test"
+    
+    with pytest.raises(SystemExit):
+        gitdelver._check_config_params(config_params)
+        
+
+def test_check_config_params_max_analyzed_line_length_wrong_type(gitdelver_config_params_fixture: Callable[[None], Dict[str, str]]):
+    """
+    This unit test checks that _check_config_params raises a SystemExit exception when max_analyzed_line_length is of the wrong type.
+    """
+    
+    config_params = gitdelver_config_params_fixture
+    
+    config_params["max_analyzed_line_length"] = "test"
+    
+    with pytest.raises(SystemExit):
+        gitdelver._check_config_params(config_params)
+        
+
+def test_check_config_params_nb_git_processes_wrong_type(gitdelver_config_params_fixture: Callable[[None], Dict[str, str]]):
+    """
+    This unit test checks that _check_config_params raises a SystemExit exception when nb_git_processes is of the wrong type.
+    """
+    
+    config_params = gitdelver_config_params_fixture
+    
+    config_params["nb_git_processes"] = "test"
+    
+    with pytest.raises(SystemExit):
+        gitdelver._check_config_params(config_params)
+        
+
+def test_check_config_params_normalized_output_wrong_type(gitdelver_config_params_fixture: Callable[[None], Dict[str, str]]):
+    """
+    This unit test checks that _check_config_params raises a SystemExit exception when normalized_output is of the wrong type.
+    """
+    
+    config_params = gitdelver_config_params_fixture
+    
+    config_params["normalized_output"] = "test"
+    
+    with pytest.raises(SystemExit):
+        gitdelver._check_config_params(config_params)
+        
+
+def test_check_config_params_author_ids_wrong_type(gitdelver_config_params_fixture: Callable[[None], Dict[str, str]]):
+    """
+    This unit test checks that _check_config_params raises a SystemExit exception when author_ids is of the wrong type.
+    """
+    
+    config_params = gitdelver_config_params_fixture
+    
+    config_params["author_ids"] = "test"
+    
+    with pytest.raises(SystemExit):
+        gitdelver._check_config_params(config_params)
+        
+
+def test_check_config_params_merge_authors_by_email_wrong_type(gitdelver_config_params_fixture: Callable[[None], Dict[str, str]]):
+    """
+    This unit test checks that _check_config_params raises a SystemExit exception when merge_authors_by_email is of the wrong type.
+    """
+    
+    config_params = gitdelver_config_params_fixture
+    
+    config_params["merge_authors_by_email"] = "test"
+    
+    with pytest.raises(SystemExit):
+        gitdelver._check_config_params(config_params)
+        
+
+def test_check_config_params_use_result_cache_wrong_type(gitdelver_config_params_fixture: Callable[[None], Dict[str, str]]):
+    """
+    This unit test checks that _check_config_params raises a SystemExit exception when use_result_cache is of the wrong type.
+    """
+    
+    config_params = gitdelver_config_params_fixture
+    
+    config_params["use_result_cache"] = "test"
+    
+    with pytest.raises(SystemExit):
+        gitdelver._check_config_params(config_params)
+        
+
+def test_check_config_params_sampling_mode_wrong_type(gitdelver_config_params_fixture: Callable[[None], Dict[str, str]]):
+    """
+    This unit test checks that _check_config_params raises a SystemExit exception when sampling_mode is of the wrong type.
+    """
+    
+    config_params = gitdelver_config_params_fixture
+    
+    config_params["sampling_mode"] = "test"
+    
+    with pytest.raises(SystemExit):
+        gitdelver._check_config_params(config_params)
+        
+
+def test_check_config_params_sampling_size_wrong_type(gitdelver_config_params_fixture: Callable[[None], Dict[str, str]]):
+    """
+    This unit test checks that _check_config_params raises a SystemExit exception when sampling_size is of the wrong type.
+    """
+    
+    config_params = gitdelver_config_params_fixture
+    
+    config_params["sampling_size"] = 0
+    
+    with pytest.raises(SystemExit):
+        gitdelver._check_config_params(config_params)
+        
+
+def test_check_config_params_sampling_seed_wrong_type(gitdelver_config_params_fixture: Callable[[None], Dict[str, str]]):
+    """
+    This unit test checks that _check_config_params raises a SystemExit exception when sampling_seed is of the wrong type.
+    """
+    
+    config_params = gitdelver_config_params_fixture
+    
+    config_params["sampling_seed"] = "test"
+    
+    with pytest.raises(SystemExit):
+        gitdelver._check_config_params(config_params)
+        
+
+def test_check_config_params_aggregates_wrong_type(gitdelver_config_params_fixture: Callable[[None], Dict[str, str]]):
+    """
+    This unit test checks that _check_config_params raises a SystemExit exception when aggregates is of the wrong type.
+    """
+    
+    config_params = gitdelver_config_params_fixture
+    
+    config_params["aggregates"] = "test"
+    
+    with pytest.raises(SystemExit):
+        gitdelver._check_config_params(config_params)
+        
+
+def test_check_config_params_branch_set_ids_wrong_type(gitdelver_config_params_fixture: Callable[[None], Dict[str, str]]):
+    """
+    This unit test checks that _check_config_params raises a SystemExit exception when branch_set_ids is of the wrong type.
+    """
+    
+    config_params = gitdelver_config_params_fixture
+    
+    config_params["branch_set_ids"] = "test"
+    
+    with pytest.raises(SystemExit):
+        gitdelver._check_config_params(config_params)
+        
+
+def test_check_config_params_branch_pattern_wrong_type(gitdelver_config_params_fixture: Callable[[None], Dict[str, str]]):
+    """
+    This unit test checks that _check_config_params raises a SystemExit exception when branch_pattern is of the wrong type.
+    """
+    
+    config_params = gitdelver_config_params_fixture
+    
+    config_params["branch_pattern"] = 0
+    
+    with pytest.raises(SystemExit):
+        gitdelver._check_config_params(config_params)
+        
+
+def test_check_config_params_queue_folder_path_wrong_type(gitdelver_config_params_fixture: Callable[[None], Dict[str, str]]):
+    """
+    This unit test checks that _check_config_params raises a SystemExit exception when queue_folder_path is of the wrong type.
+    """
+    
+    config_params = gitdelver_config_params_fixture
+    
+    config_params["queue_folder_path"] = 0
+    
+    with pytest.raises(SystemExit):
+        gitdelver._check_config_params(config_params)
+        
+
+def test_check_config_params_queue_lease_duration_wrong_type(gitdelver_config_params_fixture: Callable[[None], Dict[str, str]]):
+    """
+    This unit test checks that _check_config_params raises a SystemExit exception when queue_lease_duration is of the wrong type.
+    """
+    
+    config_params = gitdelver_config_params_fixture
+    
+    config_params["queue_lease_duration"] = 0
+    
+    with pytest.raises(SystemExit):
+        gitdelver._check_config_params(config_params)
+        
+
+def test_check_config_params_queue_max_attempts_wrong_type(gitdelver_config_params_fixture: Callable[[None], Dict[str, str]]):
+    """
+    This unit test checks that _check_config_params raises a SystemExit exception when queue_max_attempts is of the wrong type.
+    """
+    
+    config_params = gitdelver_config_params_fixture
+    
+    config_params["queue_max_attempts"] = 0
+    
+    with pytest.raises(SystemExit):
+        gitdelver._check_config_params(config_params)
+        
+
+def test_check_config_params_repository_backend_wrong_type(gitdelver_config_params_fixture: Callable[[None], Dict[str, str]]):
+    """
+    This unit test checks that _check_config_params raises a SystemExit exception when repository_backend is of the wrong type.
+    """
+    
+    config_params = gitdelver_config_params_fixture
+    
+    config_params["repository_backend"] = "PYGIT2"
+    
+    with pytest.raises(SystemExit):
+        gitdelver._check_config_params(config_params)
+        
+
+def test_check_config_params_methods_output_wrong_type(gitdelver_config_params_fixture: Callable[[None], Dict[str, str]]):
+    """
+    This unit test checks that _check_config_params raises a SystemExit exception when methods_output is of the wrong type.
+    """
+    
+    config_params = gitdelver_config_params_fixture
+    
+    config_params["methods_output"] = "CHANGED_METHODS"
+    
+    with pytest.raises(SystemExit):
+        gitdelver._check_config_params(config_params)
+        
+
+def test_check_config_params_method_change_types_wrong_type(gitdelver_config_params_fixture: Callable[[None], Dict[str, str]]):
+    """
+    This unit test checks that _check_config_params raises a SystemExit exception when method_change_types is of the wrong type.
+    """
+    
+    config_params = gitdelver_config_params_fixture
+    
+    config_params["method_change_types"] = "True"
+    
+    with pytest.raises(SystemExit):
+        gitdelver._check_config_params(config_params)
+
+def test_check_config_params_method_change_types_without_changed_methods(gitdelver_config_params_fixture: Callable[[None], Dict[str, str]]):
+    """
+    This unit test checks that _check_config_params raises a SystemExit exception when method_change_types is set
+    while all the methods are produced.
+    """
+    
+    config_params = gitdelver_config_params_fixture
+    
+    config_params["method_change_types"] = True
+    
+    with pytest.raises(SystemExit):
+        gitdelver._check_config_params(config_params)
+    
+    config_params["methods_output"] = MethodsOutput.CHANGED_METHODS
+    
+    gitdelver._check_config_params(config_params)
+        
+
+def test_check_config_params_snapshot_refs_wrong_type(gitdelver_config_params_fixture: Callable[[None], Dict[str, str]]):
+    """
+    This unit test checks that _check_config_params raises a SystemExit exception when snapshot_refs is of the wrong type.
+    """
+    
+    config_params = gitdelver_config_params_fixture
+    
+    config_params["snapshot_refs"] = ["v*"]
+    
+    with pytest.raises(SystemExit):
+        gitdelver._check_config_params(config_params)
+        
+
+def test_check_config_params_first_parent_wrong_type(gitdelver_config_params_fixture: Callable[[None], Dict[str, str]]):
+    """
+    This unit test checks that _check_config_params raises a SystemExit exception when first_parent is of the wrong type.
+    """
+    
+    config_params = gitdelver_config_params_fixture
+    
+    config_params["first_parent"] = 1
+    
+    with pytest.raises(SystemExit):
+        gitdelver._check_config_params(config_params)
+        
+
+def test_check_config_params_merge_commits_wrong_type(gitdelver_config_params_fixture: Callable[[None], Dict[str, str]]):
+    """
+    This unit test checks that _check_config_params raises a SystemExit exception when merge_commits is of the wrong type.
+    """
+    
+    config_params = gitdelver_config_params_fixture
+    
+    config_params["merge_commits"] = 3
+    
+    with pytest.raises(SystemExit):
+        gitdelver._check_config_params(config_params)
+        
+
+def test_check_config_params_facts_store_wrong_type(gitdelver_config_params_fixture: Callable[[None], Dict[str, str]]):
+    """
+    This unit test checks that _check_config_params raises a SystemExit exception when facts_store is of the wrong type.
+    """
+    
+    config_params = gitdelver_config_params_fixture
+    
+    config_params["facts_store"] = 1
+    
+    with pytest.raises(SystemExit):
+        gitdelver._check_config_params(config_params)
+        
+
+def test_check_config_params_profiles_wrong_type(gitdelver_config_params_fixture: Callable[[None], Dict[str, str]]):
+    """
+    This unit test checks that _check_config_params raises a SystemExit exception when profiles is of the wrong type.
+    """
+    
+    config_params = gitdelver_config_params_fixture
+    
+    config_params["profiles"] = [AnalysisProfile("bad name", [], [], False)]
+    
+    with pytest.raises(SystemExit):
+        gitdelver._check_config_params(config_params)        
+
+def test_check_config_params_profiles_duplicate_names(gitdelver_config_params_fixture: Callable[[None], Dict[str, str]]):
+    """
+    This unit test checks that _check_config_params raises a SystemExit exception when two profiles have the same name.
+    """
+    
+    config_params = gitdelver_config_params_fixture
+    
+    config_params["profiles"] = [AnalysisProfile("strict", ["#todo"], ["fix"], False), AnalysisProfile("strict", [], [], True)]
+    
+    with pytest.raises(SystemExit):
+        gitdelver._check_config_params(config_params)
+        
+
+def test_check_config_params_profiles_with_snapshot_refs(gitdelver_config_params_fixture: Callable[[None], Dict[str, str]]):
+    """
+    This unit test checks that _check_config_params raises a SystemExit exception when profiles are used in snapshot mode.
+    """
+    
+    config_params = gitdelver_config_params_fixture
+    
+    config_params["profiles"] = [AnalysisProfile("strict", ["#todo"], ["fix"], False)]
+    config_params["snapshot_refs"] = "v*"
+    
+    with pytest.raises(SystemExit):
+        gitdelver._check_config_params(config_params)
+        
+
+def test_check_config_params_generated_files_wrong_type(gitdelver_config_params_fixture: Callable[[None], Dict[str, str]]):
+    """
+    This unit test checks that _check_config_params raises a SystemExit exception when generated_files is of the wrong type.
+    """
+    
+    config_params = gitdelver_config_params_fixture
+    
+    config_params["generated_files"] = ["*.min.js"]
+    
+    with pytest.raises(SystemExit):
+        gitdelver._check_config_params(config_params)
+        
+
+def test_check_config_params_repository_preparation_wrong_type(gitdelver_config_params_fixture: Callable[[None], Dict[str, str]]):
+    """
+    This unit test checks that _check_config_params raises a SystemExit exception when repository_preparation is of the wrong type.
+    """
+    
+    config_params = gitdelver_config_params_fixture
+    
+    config_params["repository_preparation"] = 3
+    
+    with pytest.raises(SystemExit):
+        gitdelver._check_config_params(config_params)
+        
+
+def test_check_config_params_prepare_copy_wrong_type(gitdelver_config_params_fixture: Callable[[None], Dict[str, str]]):
+    """
+    This unit test checks that _check_config_params raises a SystemExit exception when prepare_copy is of the wrong type.
+    """
+    
+    config_params = gitdelver_config_params_fixture
+    
+    config_params["prepare_copy"] = 1
+    
+    with pytest.raises(SystemExit):
+        gitdelver._check_config_params(config_params)
+        
+
+def test_check_config_params_max_worker_memory_wrong_type(gitdelver_config_params_fixture: Callable[[None], Dict[str, str]]):
+    """
+    This unit test checks that _check_config_params raises a SystemExit exception when max_worker_memory is of the wrong type.
+    """
+    
+    config_params = gitdelver_config_params_fixture
+    
+    config_params["max_worker_memory"] = "lots"
+    
+    with pytest.raises(SystemExit):
+        gitdelver._check_config_params(config_params)
+        
+
+def test_check_config_params_worker_max_commits_wrong_type(gitdelver_config_params_fixture: Callable[[None], Dict[str, str]]):
+    """
+    This unit test checks that _check_config_params raises a SystemExit exception when worker_max_commits is of the wrong type.
+    """
+    
+    config_params = gitdelver_config_params_fixture
+    
+    config_params["worker_max_commits"] = -1
+    
+    with pytest.raises(SystemExit):
+        gitdelver._check_config_params(config_params)
+        
+
+def test_check_config_params_max_unsupported_diff_size_wrong_type(gitdelver_config_params_fixture: Callable[[None], Dict[str, str]]):
+    """
+    This unit test checks that _check_config_params raises a SystemExit exception when max_unsupported_diff_size is of the wrong type.
+    """
+    
+    config_params = gitdelver_config_params_fixture
+    
+    config_params["max_unsupported_diff_size"] = "1MB"
+    
     with pytest.raises(SystemExit):
         gitdelver._check_config_params(config_params)
\ No newline at end of file
@@ -0,0 +1,190 @@
+#    Copyright 2021 Nicolas Riquet
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
+This module contains the unit tests for the "orchestrator" module.
+"""
+
+import pytest, os, time, asyncio, tempfile, orchestrator, result_cache
+from functools import partial
+
+
+def _successful_job(repo_path: str, git_slot: orchestrator.GitSlot = None):
+    """
+    Job doing nothing.
+    """
+
+
+def _failing_job(repo_path: str, git_slot: orchestrator.GitSlot = None):
+    """
+    Job exiting with an error.
+    """
+
+    os._exit(3)
+
+
+def _endless_job(repo_path: str, git_slot: orchestrator.GitSlot = None):
+    """
+    Job that never completes by itself.
+    """
+
+    time.sleep(60)
+
+
+def _exclusive_git_job(lock_path: str, repo_path: str, git_slot: orchestrator.GitSlot = None):
+    """
+    Job holding its git slot for a while, which fails if another job holds a slot at the same time.
+    """
+
+    with git_slot:
+        lock_file = os.open(lock_path, os.O_CREAT | os.O_EXCL)
+        time.sleep(0.5)
+        os.close(lock_file)
+        os.remove(lock_path)
+
+
+def _dying_git_job(repo_path: str, git_slot: orchestrator.GitSlot = None):
+    """
+    Job dying while it holds its git slot.
+    """
+
+    git_slot.__enter__()
+    os._exit(3)
+
+
+@pytest.fixture
+def orchestrator_repo_path_fixture() -> str:
+    """
+    This test fixture returns the path to the small test repository.
+    """
+
+    current_dir = os.path.dirname(__file__)
+
+    return current_dir + "/test_repos/small_repo"
+
+
+def test_orchestrator_run_git(orchestrator_repo_path_fixture: str):
+    """
+    This unit test checks that run_git returns the exit code and the output of the git command.
+    """
+
+    exit_code, output = asyncio.run(orchestrator.run_git(orchestrator_repo_path_fixture, "rev-list", "--count", "HEAD"))
+
+    assert exit_code == 0
+    assert output == "5"
+
+
+def test_orchestrator_run_bulk_statuses(orchestrator_repo_path_fixture: str):
+    """
+    This unit test checks that run_bulk reports completed repositories, failed jobs and invalid repositories.
+    """
+
+    with tempfile.TemporaryDirectory() as not_a_repository:
+        statuses = orchestrator.run_bulk(_successful_job, [orchestrator_repo_path_fixture, not_a_repository], 2, 1)
+
+        assert statuses[orchestrator_repo_path_fixture] == "completed"
+        assert statuses[not_a_repository] == "failed (invalid repository)"
+
+    statuses = orchestrator.run_bulk(_failing_job, [orchestrator_repo_path_fixture], 2, 1)
+
+    assert statuses[orchestrator_repo_path_fixture] == "failed (exit code 3)"
+
+
+def test_orchestrator_cancel(orchestrator_repo_path_fixture: str):
+    """
+    This unit test checks that cancelling a repository kills its process without waiting for the job to complete.
+    """
+
+    bulk_orchestrator = orchestrator.BulkOrchestrator(_endless_job, 1, 1)
+
+    async def run_and_cancel():
+        run_task = asyncio.ensure_future(bulk_orchestrator.run([orchestrator_repo_path_fixture]))
+        await asyncio.sleep(1)
+        assert bulk_orchestrator.cancel(orchestrator_repo_path_fixture) is True
+        return await run_task
+
+    start = time.time()
+    statuses = asyncio.run(run_and_cancel())
+
+    assert statuses[orchestrator_repo_path_fixture] == "cancelled"
+    assert time.time() - start < 30
+
+
+def test_orchestrator_skips_unchanged_repositories(orchestrator_repo_path_fixture: str):
+    """
+    This unit test checks that, with a result cache, a repository is only analyzed again if its results are missing
+    or if the configuration changed.
+    """
+
+    with tempfile.TemporaryDirectory() as csv_output_folder_path:
+        commits_csv_path = os.path.join(csv_output_folder_path, "small_repo_commits_history.csv")
+        open(commits_csv_path, "w").close()
+
+        def run_with_cache(config_hash: str):
+            cache = result_cache.ResultCache(csv_output_folder_path, config_hash)
+            return orchestrator.run_bulk(_successful_job, [orchestrator_repo_path_fixture], 2, 1, result_cache = cache)
+
+        assert run_with_cache("config1")[orchestrator_repo_path_fixture] == "completed"
+        assert run_with_cache("config1")[orchestrator_repo_path_fixture] == "unchanged"
+        assert run_with_cache("config2")[orchestrator_repo_path_fixture] == "completed"
+
+        os.remove(commits_csv_path)
+
+        assert run_with_cache("config2")[orchestrator_repo_path_fixture] == "completed"
+
+
+def test_orchestrator_without_repository_check(tmp_path):
+    """
+    This unit test checks that without the git stage, the job is run on any path and a crashing job only fails its path.
+    """
+
+    paths = [str(tmp_path / "first_facts.jsonl.gz"), str(tmp_path / "second_facts.jsonl.gz")]
+
+    statuses = orchestrator.run_bulk(_successful_job, paths, 2, 1, check_repositories = False)
+
+    assert statuses == {path: "completed" for path in paths}
+
+    statuses = orchestrator.run_bulk(_failing_job, paths, 2, 1, check_repositories = False)
+
+    assert statuses == {path: "failed (exit code 3)" for path in paths}
+
+
+def test_orchestrator_git_slots_shared_with_jobs(tmp_path, orchestrator_repo_path_fixture: str):
+    """
+    This unit test checks that the jobs do not hold more git slots at the same time than the number of git processes,
+    even when more jobs run at the same time.
+    """
+
+    repositories = [orchestrator_repo_path_fixture, orchestrator_repo_path_fixture + "_bare"]
+
+    statuses = orchestrator.run_bulk(partial(_exclusive_git_job, str(tmp_path / "lock")), repositories, 2, 1)
+
+    assert statuses == {repo_path: "completed" for repo_path in repositories}
+
+
+def test_orchestrator_releases_git_slot_of_dead_job(orchestrator_repo_path_fixture: str):
+    """
+    This unit test checks that the git slot held by a job dying is given back, so that the other repositories are
+    still processed.
+    """
+
+    repositories = [orchestrator_repo_path_fixture, orchestrator_repo_path_fixture + "_bare"]
+
+    bulk_orchestrator = orchestrator.BulkOrchestrator(_dying_git_job, 1, 1)
+
+    statuses = asyncio.run(asyncio.wait_for(bulk_orchestrator.run(repositories), 60))
+
+    assert statuses == {repo_path: "failed (exit code 3)" for repo_path in repositories}
+
+    assert bulk_orchestrator._git_slots._semaphore.acquire(False)
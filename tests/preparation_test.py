@@ -0,0 +1,106 @@
+#    Copyright 2021 Nicolas Riquet
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
+This module contains the unit tests for the "preparation" module.
+"""
+
+import pytest, os, subprocess, preparation
+from delver import Delver
+from utilities import RepositoryPreparation
+
+
+@pytest.fixture
+def preparation_repo_path_fixture(tmp_path) -> str:
+    """
+    This test fixture creates a repository with loose objects only, without commit-graph.
+    """
+
+    repo_path = tmp_path / "repo"
+    repo_path.mkdir()
+
+    def git(*args: str):
+        subprocess.run(["git", "-C", str(repo_path), "-c", "user.name=Author", "-c", "user.email=author@example.com",
+                        "-c", "gc.auto=0", *args], check=True, capture_output=True)
+
+    git("init", "-b", "main", ".")
+
+    for i in range(3):
+        repo_path.joinpath("main.py").write_text("def main():\n    return {}\n".format(i))
+        git("add", "main.py")
+        git("commit", "-m", "Commit {}".format(i))
+
+    return str(repo_path)
+
+
+def test_preparation_prepare(preparation_repo_path_fixture: str):
+    """
+    This unit test checks that prepare repacks the objects and writes the commit-graph and the multi-pack-index.
+    """
+
+    state = preparation.repository_state(preparation_repo_path_fixture)
+
+    assert not state.commit_graph and not state.multi_pack_index
+    assert state.nb_packs == 0 and state.nb_loose_objects == 9
+
+    assert preparation.prepare(preparation_repo_path_fixture, RepositoryPreparation.REPACK) == \
+           ["objects repacked", "commit-graph written", "multi-pack-index written"]
+
+    assert preparation.repository_state(preparation_repo_path_fixture) == preparation.RepositoryState(True, True, 1, 0)
+
+
+def test_preparation_prepared_copy(preparation_repo_path_fixture: str, tmp_path):
+    """
+    This unit test checks that a repository prepared in a temporary copy is left untouched, that the copy has the same
+    name and produces the same datasets, and that it is deleted afterwards.
+    """
+
+    messages = []
+
+    datasets = Delver(preparation_repo_path_fixture, str(tmp_path), nb_commits_before_checkpoint = 0, log = None).run()
+
+    with preparation.prepared_repository(preparation_repo_path_fixture, RepositoryPreparation.WRITE, True,
+                                         messages.append) as mined_repo_path:
+        assert mined_repo_path != preparation_repo_path_fixture
+        assert os.path.basename(mined_repo_path) == "repo"
+        assert preparation.repository_state(mined_repo_path).commit_graph
+
+        copy_datasets = Delver(mined_repo_path, str(tmp_path), nb_commits_before_checkpoint = 0, log = None).run()
+
+    assert not os.path.exists(mined_repo_path)
+    assert not preparation.repository_state(preparation_repo_path_fixture).commit_graph
+    assert len(messages) == 1 and "probe" in messages[0]
+
+    for dataset, copy_dataset in zip(datasets, copy_datasets):
+        assert dataset.dataframe.equals(copy_dataset.dataframe)
+
+
+def test_preparation_failure(tmp_path):
+    """
+    This unit test checks that a repository that cannot be prepared is mined as is, and that exceptions raised while
+    mining are not swallowed.
+    """
+
+    messages = []
+    empty_repo_path = str(tmp_path / "empty")
+    subprocess.run(["git", "init", "-q", empty_repo_path], check=True)
+
+    with preparation.prepared_repository(empty_repo_path, RepositoryPreparation.WRITE, False, messages.append) as mined_repo_path:
+        assert mined_repo_path == empty_repo_path
+
+    assert messages[0].startswith("!!! Impossible to prepare repository EMPTY")
+
+    with pytest.raises(ValueError):
+        with preparation.prepared_repository(empty_repo_path, RepositoryPreparation.CHECK, False, messages.append):
+            raise ValueError()
@@ -0,0 +1,83 @@
+#    Copyright 2021 Nicolas Riquet
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
+This module contains the unit tests for the "result_cache" module.
+"""
+
+import pytest, os, tempfile, result_cache
+from utilities import AnalysisMode
+
+
+def test_result_cache_config_hash():
+    """
+    This unit test checks that config_hash only depends on the values of the configuration parameters.
+    """
+
+    params = {"analysis_mode": AnalysisMode.COMMITS_FILES, "SATD_keywords": ["//todo"], "keep_unsupported_files": False}
+
+    assert result_cache.config_hash(params) == result_cache.config_hash(dict(reversed(list(params.items()))))
+    assert result_cache.config_hash(params) != result_cache.config_hash({**params, "analysis_mode": AnalysisMode.COMMITS_FILES_METHODS})
+    assert result_cache.config_hash(params) != result_cache.config_hash({**params, "SATD_keywords": ["//fixme"]})
+
+
+def test_result_cache_is_fresh():
+    """
+    This unit test checks that a repository is fresh only if its fingerprint was stored and its CSV files exist,
+    and that the fingerprints persist on disk.
+    """
+
+    with tempfile.TemporaryDirectory() as csv_output_folder_path:
+        cache = result_cache.ResultCache(csv_output_folder_path, "config")
+        fingerprint = cache.fingerprint("abc123 HEAD\nabc123 refs/heads/master")
+
+        assert not cache.is_fresh("/repos/my_repo", fingerprint)
+
+        cache.store("/repos/my_repo", fingerprint)
+
+        assert not cache.is_fresh("/repos/my_repo", fingerprint)
+
+        open(os.path.join(csv_output_folder_path, "my_repo_commits_history.csv"), "w").close()
+
+        assert cache.is_fresh("/repos/my_repo", fingerprint)
+        assert not cache.is_fresh("/repos/my_repo", cache.fingerprint("def456 HEAD\ndef456 refs/heads/master"))
+        assert not cache.is_fresh("/repos/my_repo", None)
+
+        reloaded_cache = result_cache.ResultCache(csv_output_folder_path, "config")
+
+        assert reloaded_cache.is_fresh("/repos/my_repo", fingerprint)
+        assert result_cache.ResultCache(csv_output_folder_path, "other config").fingerprint("abc123 HEAD") != cache.fingerprint("abc123 HEAD")
+
+        reloaded_cache.invalidate("/repos/my_repo")
+
+        assert not result_cache.ResultCache(csv_output_folder_path, "config").is_fresh("/repos/my_repo", fingerprint)
+
+
+def test_result_cache_main_dataset_name():
+    """
+    This unit test checks that is_fresh looks for the CSV file of the main dataset (e.g. "snapshots" in snapshot mode).
+    """
+
+    with tempfile.TemporaryDirectory() as csv_output_folder_path:
+        cache = result_cache.ResultCache(csv_output_folder_path, "config", "snapshots")
+        fingerprint = cache.fingerprint("abc123 HEAD\nabc123 refs/tags/v1.0")
+        cache.store("/repos/my_repo", fingerprint)
+
+        open(os.path.join(csv_output_folder_path, "my_repo_commits_history.csv"), "w").close()
+
+        assert not cache.is_fresh("/repos/my_repo", fingerprint)
+
+        open(os.path.join(csv_output_folder_path, "my_repo_snapshots.csv"), "w").close()
+
+        assert cache.is_fresh("/repos/my_repo", fingerprint)
@@ -0,0 +1,75 @@
+#    Copyright 2021 Nicolas Riquet
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
+This module contains the unit tests for the "sampling" module.
+"""
+
+import pytest
+from sampling import CommitSampler
+from utilities import SamplingMode
+
+# (commit hash, month) pairs of a fake history: 6 commits in January, 2 in February.
+COMMITS = [("c{}".format(i), "2021-01") for i in range(6)] + [("c6", "2021-02"), ("c7", "2021-02")]
+
+
+def _weights(sampler: CommitSampler) -> list:
+    """
+    Returns the sampling weights of the commits of the fake history.
+    """
+
+    return [sampler.weight(commit_hash) for commit_hash, _ in COMMITS]
+
+
+def test_sampling_every_nth_commit():
+    """
+    This unit test checks that the EVERY_NTH_COMMIT mode samples one commit every N commits with a weight of N.
+    """
+
+    assert _weights(CommitSampler(SamplingMode.EVERY_NTH_COMMIT, 3)) == [3, 0, 0, 3, 0, 0, 3, 0]
+
+
+def test_sampling_random_commits():
+    """
+    This unit test checks that the RANDOM_COMMITS mode gives the same sample for the same seed.
+    """
+
+    weights = _weights(CommitSampler(SamplingMode.RANDOM_COMMITS, 2, 42))
+
+    assert weights == _weights(CommitSampler(SamplingMode.RANDOM_COMMITS, 2, 42))
+    assert set(weights) <= {0, 2}
+
+
+def test_sampling_commits_per_month():
+    """
+    This unit test checks that the COMMITS_PER_MONTH mode samples N commits per month, weighted by the number
+    of commits of the month.
+    """
+
+    sampler = CommitSampler(SamplingMode.COMMITS_PER_MONTH, 3, 42)
+    sampler.prepare(COMMITS)
+
+    weights = _weights(sampler)
+
+    assert sorted(weights[:6]) == [0, 0, 0, 2, 2, 2]
+    assert weights[6:] == [1, 1]
+    assert sum(weights) == len(COMMITS)
+
+
+def test_sampling_all_commits():
+    """
+    This unit test checks that the ALL_COMMITS mode samples every commit with a weight of 1.
+    """
+
+    assert _weights(CommitSampler(SamplingMode.ALL_COMMITS, 10)) == [1] * len(COMMITS)
@@ -0,0 +1,54 @@
+#    Copyright 2021 Nicolas Riquet
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
+This module contains the unit tests for the "snapshots" module.
+"""
+
+import pytest, os, snapshots
+
+
+@pytest.fixture
+def snapshots_repo_path_fixture() -> str:
+    """
+    This test fixture returns the path to the small test repository.
+    """
+
+    current_dir = os.path.dirname(__file__)
+
+    return current_dir + "/test_repos/small_repo"
+
+
+def test_snapshots_list_snapshots(snapshots_repo_path_fixture: str):
+    """
+    This unit test checks that list_snapshots returns the tags and branches matching the pattern, sorted by commit date.
+    """
+
+    assert [snapshot.name for snapshot in snapshots.list_snapshots(snapshots_repo_path_fixture, "v*")] == ["v1.4"]
+    assert [snapshot.name for snapshot in snapshots.list_snapshots(snapshots_repo_path_fixture, "master|v*")] == ["v1.4", "master"]
+    assert snapshots.list_snapshots(snapshots_repo_path_fixture, "release/*") == []
+
+    master = snapshots.list_snapshots(snapshots_repo_path_fixture, "master")[0]
+
+    assert master.commit.hexsha == "da39b1326dbc2edfe518b90672734a08f3c13458"
+
+
+def test_snapshots_snapshot_files(snapshots_repo_path_fixture: str):
+    """
+    This unit test checks that snapshot_files returns the files of the tree of a snapshot, sorted by path.
+    """
+
+    tag = snapshots.list_snapshots(snapshots_repo_path_fixture, "v1.4")[0]
+
+    assert [path for path, blob in snapshots.snapshot_files(tag)] == ["file1.java", "file2.java"]
@@ -216,6 +216,60 @@ def test_short_method_name_contains_double_colon_no():
 
 
 
+
+def test_get_file_types():
+    """
+    This unit test checks that get_file_types returns the same types as get_file_type for a series of file names.
+    """
+    
+    import pandas as pd
+    
+    file_names = pd.Series(["Employee.java", "EmployeeTest.java", "test_employee.py", "Contest.java"])
+    
+    assert list(utilities.get_file_types(file_names)) == [utilities.get_file_type(file_name) for file_name in file_names]
+
+
+def test_short_method_names():
+    """
+    This unit test checks that short_method_names returns the same names as short_method_name for a series of method names.
+    """
+    
+    import pandas as pd
+    
+    method_names = pd.Series(["myclass::mymethod", "myclass_mymethod", "ns::myclass::mymethod"])
+    
+    assert list(utilities.short_method_names(method_names)) == [utilities.short_method_name(name) for name in method_names]
+
+
+def test_change_types_as_strings():
+    """
+    This unit test checks that change_types_as_strings returns the same strings as change_type_as_string for a series of
+    ModificationType values.
+    """
+    
+    import pandas as pd
+    from pydriller import ModificationType
+    
+    change_types = pd.Series([ModificationType.ADD, ModificationType.MODIFY, ModificationType.ADD, ModificationType.RENAME])
+    
+    assert list(utilities.change_types_as_strings(change_types)) == [utilities.change_type_as_string(change_type)
+                                                                     for change_type in change_types]
+    assert len(utilities.change_types_as_strings(pd.Series([], dtype=object))) == 0
+
+
+def test_round_ratios():
+    """
+    This unit test checks that round_ratios rounds the ratios exactly like round(ratio, 2), including the ratios whose
+    product by 100 falls on a half (e.g. 89 / 40 = 2.225 or 2.675).
+    """
+    
+    import numpy as np
+    
+    ratios = np.concatenate([np.arange(20000) / 1000, np.arange(20000) / 800, np.arange(1, 2000) / np.arange(1, 2000)[::-1],
+                             np.array([89 / 40, 2.675, 0.125, 0.375, 0.0])])
+    
+    assert list(utilities.round_ratios(ratios)) == [round(ratio, 2) for ratio in ratios.tolist()]
+
 def test_is_single_repository_no():
     """
     This unit test checks that is_single_repository returns False when repo_path does not point to a single
@@ -252,4 +306,27 @@ def test_is_single_repository_bare_yes():
 
     single_regular_repo = current_dir + "/test_repos/small_repo_bare"
     
-    assert utilities.is_single_repository(single_regular_repo) is True
\ No newline at end of file
+    assert utilities.is_single_repository(single_regular_repo) is True
+
+def test_generated_file_filter():
+    """
+    This unit test checks that generated_file_filter matches the paths and names of the files against the glob patterns.
+    """
+    
+    is_generated = utilities.generated_file_filter("*.min.js|package-lock.json|vendor/*")
+    
+    assert is_generated("web/app.min.js", "app.min.js")
+    assert is_generated("web/package-lock.json", "package-lock.json")
+    assert is_generated("vendor/lib/lib.c", "lib.c")
+    assert not is_generated("web/app.js", "app.js")
+    assert not utilities.generated_file_filter("")("web/app.min.js", "app.min.js")
+
+
+def test_branches_as_string():
+    """
+    This unit test checks that branches_as_string lists the branches like a Python set, in a deterministic order.
+    """
+    
+    assert utilities.branches_as_string({"release", "main"}) == utilities.branches_as_string(["main", "release"]) == "{'main', 'release'}"
+    assert utilities.branches_as_string({""}) == str({""})
+    assert utilities.branches_as_string(set()) == str(set())
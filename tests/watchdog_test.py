@@ -0,0 +1,73 @@
+#    Copyright 2021 Nicolas Riquet
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
+This module contains the unit tests for the "watchdog" module.
+"""
+
+import pytest, os, time, watchdog
+import multiprocessing as mp
+
+
+pytestmark = pytest.mark.skipif(watchdog.process_memory(os.getpid()) is None,
+                                reason="The memory of the processes cannot be read on this platform")
+
+
+def test_watchdog_process_memory():
+    """
+    This unit test checks that process_memory returns the memory of a running process, and None for an unknown process.
+    """
+
+    assert watchdog.process_memory(os.getpid()) > 0
+    assert watchdog.process_memory(-1) is None
+
+
+def test_watchdog_exceeding_delver():
+    """
+    This unit test checks that the watchdog reports the current process when it exceeds the limit, and only reports it
+    again once it grew by a tenth of the limit.
+    """
+
+    memory_watchdog = watchdog.MemoryWatchdog(10)
+
+    assert memory_watchdog.exceeding_delver() > 10
+    assert memory_watchdog.exceeding_delver() is None
+
+    # Bytes written page by page are resident, unlike zeroed allocations.
+    allocation = b"x" * (20 * 1024 * 1024)
+
+    assert memory_watchdog.exceeding_delver() > 10
+    assert watchdog.MemoryWatchdog(1024 * 1024).exceeding_delver() is None
+
+    del allocation
+
+
+def test_watchdog_exceeding_workers():
+    """
+    This unit test checks that the watchdog reports the child processes exceeding the limit.
+    """
+
+    process = mp.get_context("spawn").Process(target=time.sleep, args=(5,))
+    process.start()
+
+    try:
+        # Waits for the child process to load Python.
+        while (watchdog.process_memory(process.pid) or 0) < 5:
+            time.sleep(0.05)
+
+        assert process.pid in [pid for pid, memory in watchdog.MemoryWatchdog(1).exceeding_workers()]
+        assert watchdog.MemoryWatchdog(1024 * 1024).exceeding_workers() == []
+    finally:
+        process.terminate()
+        process.join()
@@ -0,0 +1,213 @@
+#    Copyright 2021 Nicolas Riquet
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
+This module contains the unit tests for the "work_queue" module.
+"""
+
+import pytest, os, signal, time, tempfile, work_queue
+import multiprocessing as mp
+from pathlib import Path
+
+
+def _marking_job(repo_path: str):
+    """
+    Job creating a marker file in the repository folder.
+    """
+
+    Path(repo_path).joinpath("processed_{}".format(os.getpid())).touch()
+
+
+def _failing_job(repo_path: str):
+    """
+    Job exiting with an error.
+    """
+
+    os._exit(3)
+
+
+def _killing_job(repo_path: str):
+    """
+    Job killing its worker process without processing the repository, as if the machine of the worker crashed.
+    """
+
+    time.sleep(0.5)
+    os.kill(os.getppid(), signal.SIGKILL)
+
+
+def _drain_queue_and_die(queue_folder_path: str):
+    """
+    Worker process dying while processing its first job.
+    """
+
+    work_queue.run_worker(work_queue.WorkQueue(queue_folder_path, lease_duration = 1), _killing_job)
+
+
+def _drain_queue(queue_folder_path: str):
+    """
+    Worker process draining the queue with the marking job.
+    """
+
+    work_queue.run_worker(work_queue.WorkQueue(queue_folder_path), _marking_job)
+
+
+def _expire_lease(queue: work_queue.WorkQueue, job: work_queue.Job):
+    """
+    Makes the lease of a job look older than the lease duration, as if its worker died.
+    """
+
+    lock_path = Path(queue.queue_folder_path).joinpath("locks", job.job_id + ".lock")
+    expired_time = time.time() - queue.lease_duration - 10
+    os.utime(lock_path, (expired_time, expired_time))
+
+
+def test_work_queue_submit_claim_complete():
+    """
+    This unit test checks that submitted repositories are claimed once each, that submitting them again adds nothing,
+    and that completed jobs are reported as such.
+    """
+
+    with tempfile.TemporaryDirectory() as queue_folder_path:
+        queue = work_queue.WorkQueue(queue_folder_path)
+
+        assert queue.submit(["/repos/a", "/repos/b"]) == 2
+        assert queue.submit(["/repos/a"]) == 0
+
+        job_a = queue.claim("worker1")
+        job_b = queue.claim("worker2")
+
+        assert {job_a.repo_path, job_b.repo_path} == {"/repos/a", "/repos/b"}
+        assert job_a.attempt == 1
+        assert queue.claim("worker3") is None
+        assert set(queue.status().values()) == {"running"}
+
+        queue.complete(job_a)
+
+        assert queue.status()[job_a.repo_path] == "completed"
+        assert queue.status()[job_b.repo_path] == "running"
+
+
+def test_work_queue_fail_and_retry():
+    """
+    This unit test checks that a failed job is retried until it reaches the maximum number of attempts,
+    and is then reported as failed.
+    """
+
+    with tempfile.TemporaryDirectory() as queue_folder_path:
+        queue = work_queue.WorkQueue(queue_folder_path, max_attempts = 2)
+        queue.submit(["/repos/a"])
+
+        job = queue.claim("worker1")
+        queue.fail(job, "exit code 3")
+
+        assert queue.status()["/repos/a"] == "pending"
+
+        job = queue.claim("worker2")
+
+        assert job.attempt == 2
+
+        queue.fail(job, "exit code 4")
+
+        assert queue.status()["/repos/a"] == "failed (exit code 4)"
+        assert queue.claim("worker3") is None
+
+
+def test_work_queue_lease_expiry():
+    """
+    This unit test checks that the job of a dead worker is claimed again once its lease expired, and that the dead worker
+    cannot renew the lease anymore.
+    """
+
+    with tempfile.TemporaryDirectory() as queue_folder_path:
+        queue = work_queue.WorkQueue(queue_folder_path, lease_duration = 60, max_attempts = 2)
+        queue.submit(["/repos/a"])
+
+        job = queue.claim("worker1")
+
+        assert queue.claim("worker2") is None
+        assert queue.renew(job, "worker1") is True
+
+        _expire_lease(queue, job)
+        new_job = queue.claim("worker2")
+
+        assert new_job.repo_path == "/repos/a"
+        assert new_job.attempt == 2
+        assert queue.renew(job, "worker1") is False
+        assert queue.renew(new_job, "worker2") is True
+
+        # The lease expired on the last attempt: the job is reported as failed.
+        _expire_lease(queue, new_job)
+
+        assert queue.claim("worker3") is None
+        assert queue.status()["/repos/a"] == "failed (lease expired)"
+
+
+def test_work_queue_run_worker():
+    """
+    This unit test checks that several worker processes drain the queue, each repository being processed exactly once,
+    and that run_worker reports the failing jobs.
+    """
+
+    with tempfile.TemporaryDirectory() as queue_folder_path, tempfile.TemporaryDirectory() as repos_folder_path:
+        repositories = [os.path.join(repos_folder_path, "repo{}".format(i)) for i in range(6)]
+
+        for repo_path in repositories:
+            os.mkdir(repo_path)
+
+        queue = work_queue.WorkQueue(queue_folder_path)
+        queue.submit(repositories)
+
+        workers = [mp.Process(target=_drain_queue, args=(queue_folder_path,)) for _ in range(3)]
+
+        for worker in workers:
+            worker.start()
+
+        for worker in workers:
+            worker.join()
+
+        assert all(len(os.listdir(repo_path)) == 1 for repo_path in repositories)
+        assert set(queue.status().values()) == {"completed"}
+
+    with tempfile.TemporaryDirectory() as queue_folder_path:
+        queue = work_queue.WorkQueue(queue_folder_path, max_attempts = 2)
+        queue.submit(["/repos/a"])
+
+        assert work_queue.run_worker(queue, _failing_job) == 0
+        assert queue.status()["/repos/a"] == "failed (exit code 3)"
+
+
+def test_work_queue_run_worker_dead_worker():
+    """
+    This unit test checks that a running worker does not stop while another worker holds a lease, and processes the job
+    of that worker once it died and its lease expired.
+    """
+
+    with tempfile.TemporaryDirectory() as queue_folder_path, tempfile.TemporaryDirectory() as repo_path:
+        queue = work_queue.WorkQueue(queue_folder_path, lease_duration = 1)
+        queue.submit([repo_path])
+
+        dying_worker = mp.Process(target=_drain_queue_and_die, args=(queue_folder_path,))
+        dying_worker.start()
+
+        while queue.status()[repo_path] != "running":
+            time.sleep(0.05)
+
+        assert work_queue.run_worker(queue, _marking_job) == 1
+
+        dying_worker.join()
+
+        assert dying_worker.exitcode == -signal.SIGKILL
+        assert len(os.listdir(repo_path)) == 1
+        assert queue.status()[repo_path] == "completed"
+        assert queue._read_job(queue._job_id(repo_path))["errors"] == ["lease expired"]
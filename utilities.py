@@ -17,9 +17,11 @@ This module contains all utility types and functions used by GitDelver.
 """
 
 import sys
+from collections import namedtuple
+from fnmatch import fnmatchcase
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Tuple
+from typing import Callable, Iterable, List, Dict, Tuple
 from enum import Enum
 
 class AnalysisMode(Enum):
@@ -30,6 +32,59 @@ class AnalysisMode(Enum):
     COMMITS_FILES_METHODS = 2
 
 
+class SamplingMode(Enum):
+    """
+    Used to set the commits to be analyzed: all of them, every Nth commit, a random sample of about one commit in N
+    (with a fixed seed), or N random commits per month.
+    """
+    ALL_COMMITS = 1
+    EVERY_NTH_COMMIT = 2
+    RANDOM_COMMITS = 3
+    COMMITS_PER_MONTH = 4
+
+
+class MethodsOutput(Enum):
+    """
+    Used to set the methods produced in the methods dataset for every modified file: all its methods (full snapshot)
+    or only the methods changed by the modification.
+    """
+    ALL_METHODS = 1
+    CHANGED_METHODS = 2
+
+
+class RepositoryBackend(Enum):
+    """
+    Used to set the library walking the commits and diffing them: PyDriller (GitPython, git subprocesses) or pygit2 (libgit2, in-process).
+    """
+    PYDRILLER = 1
+    PYGIT2 = 2
+
+
+class RepositoryPreparation(Enum):
+    """
+    Used to set the preparation stage run before mining each repository: none, a check of its commit-graph and packs, or
+    writing its commit-graph and multi-pack-index (after repacking its objects with REPACK).
+    """
+    NONE = 1
+    CHECK = 2
+    WRITE = 3
+    REPACK = 4
+
+
+class MergeCommits(Enum):
+    """
+    Used to set how merge commits are mined: summarized (a commit row with the Merge flag and the line counts against the
+    first parent, without file rows) or skipped altogether (left out of the traversal).
+    """
+    SUMMARIZE = 1
+    SKIP = 2
+
+
+# Named tuple for an analysis profile: the settings evaluated per profile when several profiles are analyzed in a single
+# traversal (see the profiles parameter of the Delver). The name of the profile suffixes the names of its datasets.
+AnalysisProfile = namedtuple("AnalysisProfile", ["name", "SATD_keywords", "bugfix_keywords", "keep_unsupported_files"])
+
+
 def get_file_type(file_name: str) -> str:
     """
     Returns "test" if file_name contains the string "test" else returns "Production".
@@ -43,6 +98,50 @@ def get_file_type(file_name: str) -> str:
     return result
 
 
+def get_file_types(file_names):
+    """
+    Vectorized version of get_file_type: takes a Pandas series of file names and returns the series of their types.
+    """
+
+    return file_names.str.contains("test|Test", regex=True).map({True: "Test", False: "Production"}).astype(file_names.dtype)
+
+
+def branches_as_string(branches: Iterable[str]) -> str:
+    """
+    Returns the list of branches of the Branches column: the branches in the notation of a Python set, sorted so that the
+    column does not depend on the order in which the branches were listed (e.g. "{'main', 'release'}").
+    """
+
+    branches = sorted(branches)
+
+    return "{" + ", ".join(repr(branch) for branch in branches) + "}" if branches else str(set())
+
+
+def generated_file_filter(generated_files: str) -> Callable[[str, str], bool]:
+    """
+    Returns a function telling if a file is generated, given its path and its name: the path or the name matches one of the
+    glob patterns separated by "|" in generated_files (e.g. "*.min.js|package-lock.json|vendor/*"). No file is generated
+    if the pattern is empty.
+    """
+
+    patterns = [pattern.strip() for pattern in generated_files.split("|") if pattern.strip()]
+
+    def is_generated(file_path: str, file_name: str) -> bool:
+        return any(fnmatchcase(file_path, pattern) or fnmatchcase(file_name, pattern) for pattern in patterns)
+
+    return is_generated
+
+
+def is_language_supported(file_name: str) -> bool:
+    """
+    Returns True if the language of file_name can be analyzed by Lizard, the same way as PyDriller's ModifiedFile.language_supported.
+    """
+
+    import lizard_languages
+
+    return lizard_languages.get_reader_for(file_name) is not None
+
+
 def keyword_match_found(keywords_list: List[str], string: str) -> bool:
     """
     Returns True if one of the words in keywords_list is present in string else returns False.
@@ -78,28 +177,55 @@ def is_SATD(SATD_keywords: List[str], dict_of_modified_lines: Dict[str, List[tup
     return False, ""
 
 
+# Lookup table from the members of PyDriller's ModificationType enum (as strings) to the values of the ChangeType column.
+CHANGE_TYPES = {"ModificationType." + name: name for name in ["ADD", "COPY", "RENAME", "DELETE", "MODIFY", "UNKNOWN"]}
+
+
 def change_type_as_string(modification_type_enum_value: Enum) -> str:
     """
     Returns a string representing the value of PyDriller's ModificationType enum. 
     PyDriller does not make this enum publicly available to the outside world.
     """
     
-    change_type = ""
-    
-    if (str(modification_type_enum_value) == "ModificationType.ADD"):
-        change_type = "ADD"
-    elif (str(modification_type_enum_value) == "ModificationType.COPY"):
-        change_type = "COPY"
-    elif (str(modification_type_enum_value) == "ModificationType.RENAME"):
-        change_type = "RENAME"
-    elif (str(modification_type_enum_value) == "ModificationType.DELETE"):
-        change_type = "DELETE"
-    elif (str(modification_type_enum_value) == "ModificationType.MODIFY"):
-        change_type = "MODIFY"
-    elif (str(modification_type_enum_value) == "ModificationType.UNKNOWN"):
-        change_type = "UNKNOWN"
-    
-    return change_type
+    return CHANGE_TYPES.get(str(modification_type_enum_value), "")
+
+
+def change_types_as_strings(change_types):
+    """
+    Vectorized version of change_type_as_string: takes a Pandas series of ModificationType values and returns the series
+    of their strings. Each distinct value is only converted once.
+    """
+
+    if len(change_types) == 0:
+        return change_types
+
+    return change_types.map({change_type: change_type_as_string(change_type) for change_type in change_types.unique()})
+
+
+def round_ratios(ratios):
+    """
+    Vectorized version of round(ratio, 2): takes a NumPy array of floats and returns them rounded to 2 decimals, exactly
+    like round() does. np.round rounds the ratios multiplied by 100, and this product can fall on a half (e.g. 2.225 * 100
+    gives 222.5) while the ratio itself is slightly above or below it (2.225 is stored as 2.22500000000000008882). The
+    rounding error of the product is computed exactly (Dekker's product) to break these ties the way round() does.
+    """
+
+    import numpy as np
+
+    scaled = ratios * 100
+
+    # Exact rounding error of the product: the exact value of ratios * 100 is scaled + error.
+    split = ratios * 134217729.0
+    high = split - (split - ratios)
+    low = ratios - high
+    error = (high * 100 - scaled) + low * 100
+
+    floor = np.floor(scaled)
+    is_half = (scaled - floor) == 0.5
+
+    rounded = np.where(is_half & (error > 0), floor + 1, np.where(is_half & (error < 0), floor, np.rint(scaled)))
+
+    return rounded / 100
 
 
 def short_method_name(method_name: str) -> str:
@@ -114,6 +240,15 @@ def short_method_name(method_name: str) -> str:
     return method_name.split("::",1)[1] 
 
 
+def short_method_names(method_names):
+    """
+    Vectorized version of short_method_name: takes a Pandas series of long method names and returns the series of
+    their short names.
+    """
+
+    return method_names.str.split("::", n=1).str[-1].astype(method_names.dtype)
+
+
 def is_single_repository(repo_path: str) -> bool:
     """
     This function returns True if repo_path points to a single repository (regular or bare) rather than a
@@ -0,0 +1,103 @@
+#    Copyright 2021 Nicolas Riquet
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
+This module contains the memory watchdog of the delver. Long analyses make the processes grow steadily (GitPython object
+caches, Lizard state, rows waiting for the next checkpoint), until the OOM killer takes one of them out. The watchdog
+reports the processes whose resident set size exceeds a limit, so that the delver can restart its file analysis processes
+or save its rows to disk before that happens.
+
+The two kinds of processes are watched differently. A file analysis process starts small again once restarted. The delver
+process cannot restart, and CPython rarely gives the memory it freed back to the system: its resident set size barely
+drops after its rows were saved, so it is only reported again once it grew by a tenth of the limit since it was last
+reported, instead of on every check.
+
+The resident set size is read from /proc, so the watchdog only works on Linux. It is disabled on other platforms.
+"""
+
+import os
+import multiprocessing as mp
+from typing import List, Optional, Tuple
+
+
+def process_memory(pid: int) -> Optional[int]:
+    """
+    Returns the resident set size of a process in MB, or None if it cannot be read.
+    """
+
+    try:
+        with open("/proc/{}/statm".format(pid)) as statm_file:
+            nb_resident_pages = int(statm_file.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+
+    return nb_resident_pages * os.sysconf("SC_PAGE_SIZE") // (1024 * 1024)
+
+
+class MemoryWatchdog:
+    """
+    Watches the resident set size of the current process and of its child processes.
+    """
+
+    def __init__(self, max_memory: int):
+        """
+        Constructor.
+
+        Takes the maximum resident set size of a process, in MB.
+        """
+
+        self.max_memory = max_memory
+
+        self._delver_threshold = max_memory
+
+
+    def is_supported(self) -> bool:
+        """
+        Tells if the resident set size of the processes can be read on this platform.
+        """
+
+        return process_memory(os.getpid()) is not None
+
+
+    def exceeding_workers(self) -> List[Tuple[int, int]]:
+        """
+        Returns the (PID, resident set size in MB) pairs of the child processes (i.e. the file analysis processes) exceeding
+        the limit.
+        """
+
+        exceeding_workers = []
+
+        for child in mp.active_children():
+            memory = process_memory(child.pid)
+
+            if memory is not None and memory > self.max_memory:
+                exceeding_workers.append((child.pid, memory))
+
+        return exceeding_workers
+
+
+    def exceeding_delver(self) -> Optional[int]:
+        """
+        Returns the resident set size in MB of the current process (i.e. the delver) if it exceeds the limit and grew by a
+        tenth of the limit since it was last reported, else None.
+        """
+
+        memory = process_memory(os.getpid())
+
+        if memory is None or memory <= self._delver_threshold:
+            return None
+
+        self._delver_threshold = memory + max(1, self.max_memory // 10)
+
+        return memory
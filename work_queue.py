@@ -0,0 +1,391 @@
+#    Copyright 2021 Nicolas Riquet
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
+This module contains the work queue used by the GitDelver console application to mine a folder of repositories with
+several machines. The queue is a directory (typically on an NFS mount shared by all the machines) only relying on atomic
+file system operations (exclusive creation and rename), so no server is needed:
+
+* jobs/<job id>.json: one file per repository job (repository path, number of attempts, errors).
+* locks/<job id>.lock: lease of the worker processing the job. The lease expires if its modification time is older than
+  the lease duration, which happens when a worker dies: the job is then claimed again by another worker.
+* done/<job id>: marker of the completed jobs.
+* failed/<job id>.json: report of the jobs that failed on all their attempts.
+
+The clocks of the machines sharing the queue must be synchronized (e.g. with NTP).
+"""
+
+import hashlib, json, os, socket, time
+import multiprocessing as mp
+from collections import namedtuple
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+# Named tuple for a job claimed by a worker.
+Job = namedtuple("Job", ["job_id", "repo_path", "attempt"])
+
+# Interval, in seconds, at which a worker checks its job process and renews its lease.
+_POLLING_INTERVAL = 0.2
+
+# Maximum interval, in seconds, at which a worker without job polls the queue while other workers hold leases.
+_IDLE_INTERVAL = 1
+
+
+def default_worker_id() -> str:
+    """
+    Returns an identifier of the current worker process, unique across the machines sharing a queue.
+    """
+
+    return "{}-{}".format(socket.gethostname(), os.getpid())
+
+
+class WorkQueue:
+    """
+    Directory-based queue of repository jobs with leases and retries.
+    """
+
+    def __init__(self, queue_folder_path: str, lease_duration: int = 600, max_attempts: int = 3):
+        """
+        Constructor.
+
+        Takes the path to the queue folder (created if needed), the duration in seconds after which the lease of a worker
+        that did not renew it expires, and the number of attempts after which a job is reported as failed.
+        """
+
+        self.queue_folder_path = queue_folder_path
+        self.lease_duration = lease_duration
+        self.max_attempts = max_attempts
+
+        for folder in ["jobs", "locks", "done", "failed"]:
+            self._path(folder).mkdir(parents=True, exist_ok=True)
+
+
+    def submit(self, repositories: List[str]) -> int:
+        """
+        Adds a job for every repository not already in the queue and returns the number of added jobs.
+        """
+
+        nb_added_jobs = 0
+
+        for repo_path in repositories:
+            job_path = self._path("jobs", self._job_id(repo_path) + ".json")
+            temporary_path = job_path.with_name("{}.{}.tmp".format(job_path.name, default_worker_id()))
+            temporary_path.write_text(json.dumps({"repo_path": repo_path, "attempts": 0, "errors": []}), encoding="utf-8")
+
+            # Linking never replaces an existing job, and the job file appears fully written.
+            try:
+                os.link(temporary_path, job_path)
+                nb_added_jobs += 1
+            except FileExistsError:
+                pass
+            finally:
+                temporary_path.unlink()
+
+        return nb_added_jobs
+
+
+    def claim(self, worker_id: str) -> Optional[Job]:
+        """
+        Claims a pending job (or a job whose lease expired) for worker_id. Returns None if there is nothing left to claim.
+        """
+
+        for job_id in self._job_ids():
+            if self._path("done", job_id).exists() or self._path("failed", job_id + ".json").exists():
+                continue
+
+            lock_path = self._path("locks", job_id + ".lock")
+            lease_expired = False
+
+            if lock_path.exists():
+                if not self._break_expired_lease(lock_path, worker_id):
+                    continue
+
+                lease_expired = True
+
+            try:
+                with open(lock_path, "x", encoding="utf-8") as lock_file:
+                    lock_file.write(worker_id)
+            except FileExistsError:
+                # Another worker was faster.
+                continue
+
+            # The job may have been completed (or reported) and its lease released since it was checked above.
+            if self._path("done", job_id).exists() or self._path("failed", job_id + ".json").exists():
+                lock_path.unlink()
+                continue
+
+            job = self._read_job(job_id)
+
+            if lease_expired:
+                # The worker processing the job died (or lost access to the queue) during its previous attempt.
+                job["errors"].append("lease expired")
+
+            if job["attempts"] >= self.max_attempts:
+                # The previous attempts all failed or expired: report the job instead of running it again.
+                self._write_job(job_id, job)
+                self._report_failure(job_id, job, "lease expired")
+                lock_path.unlink()
+                continue
+
+            job["attempts"] += 1
+            self._write_job(job_id, job)
+
+            return Job(job_id, job["repo_path"], job["attempts"])
+
+        return None
+
+
+    def renew(self, job: Job, worker_id: str) -> bool:
+        """
+        Renews the lease of a job. Returns False if the worker lost the lease (it expired and was claimed by another worker),
+        in which case it must stop processing the job.
+        """
+
+        lock_path = self._path("locks", job.job_id + ".lock")
+
+        try:
+            if lock_path.read_text(encoding="utf-8") != worker_id:
+                return False
+
+            os.utime(lock_path)
+        except OSError:
+            return False
+
+        return True
+
+
+    def complete(self, job: Job):
+        """
+        Marks a job as completed and releases its lease.
+        """
+
+        self._path("done", job.job_id).touch()
+        self._release(job)
+
+
+    def fail(self, job: Job, reason: str):
+        """
+        Records the failure of an attempt of a job and releases its lease. The job is retried until it reaches the
+        maximum number of attempts, then it is reported in the failed folder.
+        """
+
+        job_data = self._read_job(job.job_id)
+        job_data["errors"].append(reason)
+        self._write_job(job.job_id, job_data)
+
+        if job_data["attempts"] >= self.max_attempts:
+            self._report_failure(job.job_id, job_data, reason)
+
+        self._release(job)
+
+
+    def is_drained(self) -> bool:
+        """
+        Tells if every job of the queue is either completed or reported as failed.
+        """
+
+        return all(self._path("done", job_id).exists() or self._path("failed", job_id + ".json").exists()
+                   for job_id in self._job_ids())
+
+
+    def status(self) -> Dict[str, str]:
+        """
+        Returns the status of every job ("pending", "running", "completed" or "failed (<last error>)"), by repository path.
+        """
+
+        statuses = {}
+
+        for job_id in self._job_ids():
+            job = self._read_job(job_id)
+            failure_path = self._path("failed", job_id + ".json")
+
+            if self._path("done", job_id).exists():
+                status = "completed"
+            elif failure_path.exists():
+                status = "failed ({})".format(json.loads(failure_path.read_text(encoding="utf-8"))["reason"])
+            elif self._path("locks", job_id + ".lock").exists():
+                status = "running"
+            else:
+                status = "pending"
+
+            statuses[job["repo_path"]] = status
+
+        return statuses
+
+
+    def _break_expired_lease(self, lock_path: Path, worker_id: str) -> bool:
+        """
+        Removes the lock of a job if its lease expired. Returns True if the lock was removed.
+        """
+
+        try:
+            if time.time() - lock_path.stat().st_mtime <= self.lease_duration:
+                return False
+
+            # Renaming is atomic: only one worker breaks the lease.
+            broken_lock_path = lock_path.with_name("{}.{}.expired".format(lock_path.name, worker_id))
+            os.rename(lock_path, broken_lock_path)
+        except OSError:
+            return False
+
+        is_expired = time.time() - broken_lock_path.stat().st_mtime > self.lease_duration
+
+        if not is_expired:
+            # The lock was renewed or replaced between the check and the rename: put it back, unless a new lock exists.
+            try:
+                os.link(broken_lock_path, lock_path)
+            except OSError:
+                pass
+
+        broken_lock_path.unlink()
+
+        return is_expired
+
+
+    def _release(self, job: Job):
+        """
+        Removes the lock of a job.
+        """
+
+        try:
+            self._path("locks", job.job_id + ".lock").unlink()
+        except FileNotFoundError:
+            pass
+
+
+    def _report_failure(self, job_id: str, job: Dict, reason: str):
+        """
+        Writes the failure report of a job.
+        """
+
+        report = {"repo_path": job["repo_path"], "attempts": job["attempts"], "reason": reason, "errors": job["errors"]}
+
+        self._write_atomically(self._path("failed", job_id + ".json"), report)
+
+
+    def _read_job(self, job_id: str) -> Dict:
+        """
+        Reads the file of a job.
+        """
+
+        return json.loads(self._path("jobs", job_id + ".json").read_text(encoding="utf-8"))
+
+
+    def _write_job(self, job_id: str, job: Dict):
+        """
+        Writes the file of a job. Only the worker holding the lease of the job writes it.
+        """
+
+        self._write_atomically(self._path("jobs", job_id + ".json"), job)
+
+
+    def _write_atomically(self, path: Path, content: Dict):
+        """
+        Writes a JSON file through a temporary file, so readers never see a partially written file.
+        """
+
+        temporary_path = path.with_name("{}.{}.tmp".format(path.name, default_worker_id()))
+        temporary_path.write_text(json.dumps(content), encoding="utf-8")
+        os.replace(temporary_path, path)
+
+
+    def _job_ids(self) -> List[str]:
+        """
+        Returns the identifiers of all the jobs of the queue, in a stable order.
+        """
+
+        return sorted(job_path.stem for job_path in self._path("jobs").iterdir() if job_path.suffix == ".json")
+
+
+    def _job_id(self, repo_path: str) -> str:
+        """
+        Returns the identifier of the job of a repository: its name followed by a hash of its path.
+        """
+
+        return "{}-{}".format(Path(repo_path).name, hashlib.sha1(repo_path.encode("utf-8")).hexdigest()[:8])
+
+
+    def _path(self, *parts: str) -> Path:
+        """
+        Returns the path to a file or folder of the queue.
+        """
+
+        return Path(self.queue_folder_path).joinpath(*parts)
+
+
+def run_worker(queue: WorkQueue, job: Callable[[str], None], worker_id: str = None, log: Callable[[str], None] = None,
+               mp_context: mp.context.BaseContext = None) -> int:
+    """
+    Claims and processes jobs until the queue is drained, and returns the number of jobs completed by this worker.
+    Each job (a picklable function taking the repository path) runs in a separate process while the worker renews its lease;
+    the process is terminated if the lease is lost. While other workers still hold leases, the worker keeps polling the
+    queue, so that it claims the jobs of the workers dying in the meantime once their leases expire.
+    """
+
+    worker_id = worker_id if worker_id is not None else default_worker_id()
+    mp_context = mp_context if mp_context is not None else mp.get_context()
+    renew_interval = max(_POLLING_INTERVAL, queue.lease_duration / 4)
+
+    nb_completed_jobs = 0
+    waiting = False
+
+    while True:
+        claimed_job = queue.claim(worker_id)
+
+        if claimed_job is None:
+            if queue.is_drained():
+                return nb_completed_jobs
+
+            if log is not None and not waiting:
+                log("Worker {} waiting for the jobs leased by other workers...".format(worker_id))
+
+            waiting = True
+            time.sleep(min(renew_interval, _IDLE_INTERVAL))
+            continue
+
+        waiting = False
+
+        if log is not None:
+            log("Worker {} processing {} (attempt {}).".format(worker_id, claimed_job.repo_path, claimed_job.attempt))
+
+        process = mp_context.Process(target=job, args=(claimed_job.repo_path,))
+        process.start()
+
+        last_renewal = time.time()
+        lease_lost = False
+
+        while process.is_alive():
+            time.sleep(_POLLING_INTERVAL)
+
+            if time.time() - last_renewal >= renew_interval:
+                last_renewal = time.time()
+
+                if not queue.renew(claimed_job, worker_id):
+                    lease_lost = True
+                    process.terminate()
+                    break
+
+        process.join()
+
+        if lease_lost:
+            if log is not None:
+                log("!!! Worker {} lost the lease of {}. Abandoning it...".format(worker_id, claimed_job.repo_path))
+        elif process.exitcode == 0:
+            queue.complete(claimed_job)
+            nb_completed_jobs += 1
+        else:
+            queue.fail(claimed_job, "exit code {}".format(process.exitcode))
+
+            if log is not None:
+                log("!!! Processing of {} failed with exit code {}.".format(claimed_job.repo_path, process.exitcode))